@@ -0,0 +1,7 @@
+# arxiv_common/__init__.py
+"""
+Code shared by the arXiv crawlers and the semantic-similarity pipeline: the rate-limited
+async arXiv fetcher, its HTTP response cache, the query planner, the local metadata store,
+the PDF text backends and the parsed-PDF cache; the CPU encode executor and length-bucketed
+batching; and the run profiler, synthetic corpora and helpers used by the benchmarks.
+"""
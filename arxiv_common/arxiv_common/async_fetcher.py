@@ -0,0 +1,306 @@
+# arxiv_common/async_fetcher.py
+
+import asyncio
+import math
+import random
+import re
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import xml.etree.ElementTree as ET
+from collections import deque
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import arxiv
+from arxiv_common.http_cache import HttpCache
+
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+ARXIV_NS = "{http://arxiv.org/schemas/atom}"
+OPENSEARCH_NS = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+class TokenBucket:
+    """
+    Rate limiter for coroutines sharing one API quota.
+
+    Tokens refill at `rate` per second up to `capacity`. A caller that finds the bucket
+    empty reserves the next token and sleeps until it is due, so waiting callers are
+    served in arrival order and the bucket can be shared across event loops.
+    """
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+# arXiv asks API clients to make no more than one request every three seconds.
+# Every fetcher in the process shares this bucket unless given its own.
+ARXIV_RATE_LIMITER = TokenBucket(rate=1 / 3, capacity=1)
+
+# Response cache used by fetchers that are not given one explicitly; None disables caching.
+_default_http_cache: Optional[HttpCache] = None
+
+def set_default_http_cache(cache: Optional[HttpCache]):
+    """Installs the HttpCache used by every AsyncArxivFetcher created without its own cache."""
+    global _default_http_cache
+    _default_http_cache = cache
+
+def _parse_datetime(value: Optional[str]) -> datetime:
+    if not value:
+        return datetime.min.replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+
+def _entry_to_result(entry: ET.Element) -> arxiv.Result:
+    """Builds an `arxiv.Result` from one Atom <entry>, mirroring what the arxiv package does."""
+    primary = entry.find(f"{ARXIV_NS}primary_category")
+    return arxiv.Result(
+        entry_id=entry.findtext(f"{ATOM_NS}id", "").strip(),
+        updated=_parse_datetime(entry.findtext(f"{ATOM_NS}updated")),
+        published=_parse_datetime(entry.findtext(f"{ATOM_NS}published")),
+        title=re.sub(r'\s+', ' ', entry.findtext(f"{ATOM_NS}title", "")).strip(),
+        authors=[arxiv.Result.Author(author.findtext(f"{ATOM_NS}name", "").strip())
+                 for author in entry.findall(f"{ATOM_NS}author")],
+        summary=entry.findtext(f"{ATOM_NS}summary", "").strip(),
+        comment=entry.findtext(f"{ARXIV_NS}comment", ""),
+        journal_ref=entry.findtext(f"{ARXIV_NS}journal_ref", ""),
+        doi=entry.findtext(f"{ARXIV_NS}doi", ""),
+        primary_category=primary.get('term', "") if primary is not None else "",
+        categories=[category.get('term') for category in entry.findall(f"{ATOM_NS}category")],
+        links=[arxiv.Result.Link(link.get('href'), title=link.get('title'),
+                                 rel=link.get('rel'), content_type=link.get('type'))
+               for link in entry.findall(f"{ATOM_NS}link")]
+    )
+
+def parse_feed(body: bytes) -> Tuple[int, List[arxiv.Result]]:
+    """
+    Parses an arXiv API Atom feed.
+
+    Args:
+        body (bytes): The raw feed.
+
+    Returns:
+        A tuple of (total number of results for the query, results on this page).
+    """
+    root = ET.fromstring(body)
+    total = int(root.findtext(f"{OPENSEARCH_NS}totalResults", "0"))
+    entries = root.findall(f"{ATOM_NS}entry")
+    # Malformed queries come back as a single entry whose id points at the error docs.
+    if len(entries) == 1 and "/api/errors" in entries[0].findtext(f"{ATOM_NS}id", ""):
+        raise ValueError(f"arXiv API error: {entries[0].findtext(f'{ATOM_NS}summary', '').strip()}")
+    return total, [_entry_to_result(entry) for entry in entries]
+
+class AsyncArxivFetcher:
+    """
+    Streams arXiv search results page by page.
+
+    Up to `prefetch` page requests are kept in flight ahead of the page being parsed, all
+    gated by the shared token bucket, so request spacing is set by the rate limit rather
+    than by a fixed sleep after each response. `base_url` can point at a local stub server
+    that serves canned Atom feeds.
+
+    With an HttpCache (passed in, or installed with `set_default_http_cache`), fresh
+    responses are served from disk without waiting for the rate limiter, and stale ones
+    are revalidated with a conditional request.
+
+    Failed requests are retried up to `max_retries` times, waiting `backoff` seconds
+    doubled on every attempt (with jitter, at most `max_backoff`, or longer if the server
+    sends Retry-After) before going back to the rate limiter.
+    """
+    def __init__(
+        self,
+        base_url: str = ARXIV_API_URL,
+        page_size: int = 100,
+        prefetch: int = 2,
+        limiter: Optional[TokenBucket] = None,
+        max_retries: int = 3,
+        timeout: float = 30.0,
+        cache: Optional[HttpCache] = None,
+        backoff: float = 3.0,
+        max_backoff: float = 60.0,
+    ):
+        self.base_url = base_url
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.limiter = limiter or ARXIV_RATE_LIMITER
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.cache = cache if cache is not None else _default_http_cache
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def _page_url(self, query: str, start: int, size: int, sort_by: str) -> str:
+        params = {
+            "search_query": query,
+            "start": start,
+            "max_results": size,
+            "sortBy": sort_by,
+            "sortOrder": "descending",
+        }
+        return f"{self.base_url}?{urllib.parse.urlencode(params)}"
+
+    def _http_get(self, url: str, conditional: Optional[Dict[str, str]] = None) -> Tuple[bytes, Optional[Tuple[Optional[str], Optional[str]]]]:
+        """
+        Returns the body and, for a new response, its (ETag, Last-Modified) validators;
+        the validators are None when a 304 reply revalidated the cached body.
+        """
+        request = urllib.request.Request(url, headers={"User-Agent": "arxiv-similarity-pipeline", **(conditional or {})})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read(), (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and self.cache is not None:
+                return self.cache.revalidated_body(url), None
+            raise
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Exponential backoff with jitter, raised to the server's Retry-After if it sent one."""
+        delay = random.uniform(0.5, 1.0) * min(self.max_backoff, self.backoff * 2 ** attempt)
+        retry_after = (error.headers or {}).get("Retry-After") if isinstance(error, urllib.error.HTTPError) else None
+        if retry_after and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        return delay
+
+    async def _fetch_page(self, query: str, start: int, size: int, total: Optional[int], sort_by: str) -> Tuple[int, List[arxiv.Result]]:
+        url = self._page_url(query, start, size, sort_by)
+        for attempt in range(self.max_retries + 1):
+            try:
+                body, conditional = (await asyncio.to_thread(self.cache.lookup, url)) if self.cache is not None else (None, {})
+                validators = None
+                if body is None:
+                    await self.limiter.acquire()
+                    body, validators = await asyncio.to_thread(self._http_get, url, conditional)
+                page_total, results = await asyncio.to_thread(parse_feed, body)
+            except (OSError, ET.ParseError) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._retry_delay(attempt, e)
+                print(f"arXiv request failed ({e}); retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                continue
+            # arXiv occasionally returns an empty page in the middle of a result set. Only
+            # pages that parsed (not API error feeds) and are complete are cached.
+            expected = total if total is not None else page_total
+            usable = bool(results) or start >= expected
+            if usable and validators is not None and self.cache is not None:
+                await asyncio.to_thread(self.cache.store, url, body, *validators)
+            if usable or attempt == self.max_retries:
+                return page_total, results
+            if self.cache is not None:
+                self.cache.discard(url)
+        return 0, []
+
+    async def stream(self, query: str, max_results: Optional[float] = None, sort_by: str = "relevance") -> AsyncIterator[arxiv.Result]:
+        """
+        Yields `arxiv.Result` records for `query`, best first.
+
+        Args:
+            query (str): An arXiv API search query.
+            max_results (Optional[float]): Upper bound on results; None, -1 or inf fetch all.
+            sort_by (str): 'relevance', 'lastUpdatedDate' or 'submittedDate'.
+        """
+        if max_results is None or max_results == -1:
+            max_results = math.inf
+        if max_results <= 0:
+            return
+
+        first_size = int(min(self.page_size, max_results))
+        total, results = await self._fetch_page(query, 0, first_size, None, sort_by)
+        limit = int(min(total, max_results))
+        remaining = deque(range(first_size, limit, self.page_size))
+        in_flight = deque()
+
+        def schedule():
+            while remaining and len(in_flight) < self.prefetch:
+                start = remaining.popleft()
+                size = min(self.page_size, limit - start)
+                in_flight.append(asyncio.create_task(self._fetch_page(query, start, size, limit, sort_by)))
+
+        yielded = 0
+        try:
+            schedule()
+            while True:
+                for result in results:
+                    if yielded >= limit:
+                        return
+                    yield result
+                    yielded += 1
+                if not in_flight:
+                    return
+                _, results = await in_flight.popleft()
+                schedule()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def collect(self, query: str, max_results: Optional[float] = None) -> List[arxiv.Result]:
+        return [result async for result in self.stream(query, max_results)]
+
+    async def collect_updated_since(self, query: str, since: datetime, max_results: Optional[float] = None) -> List[arxiv.Result]:
+        """Collects results last updated after `since`, newest first, stopping at the first older one."""
+        results = []
+        async with aclosing(self.stream(query, max_results, sort_by="lastUpdatedDate")) as stream:
+            async for result in stream:
+                if result.updated <= since:
+                    break
+                results.append(result)
+        return results
+
+def fetch_results(query: str, max_results: Optional[float] = None, fetcher: Optional[AsyncArxivFetcher] = None) -> List[arxiv.Result]:
+    """
+    Synchronous wrapper that runs one streamed search to completion.
+
+    Args:
+        query (str): An arXiv API search query.
+        max_results (Optional[float]): Upper bound on results; None, -1 or inf fetch all.
+        fetcher (Optional[AsyncArxivFetcher]): Fetcher to use; a default one is created if omitted.
+
+    Returns:
+        A list of arxiv.Result objects.
+    """
+    fetcher = fetcher or AsyncArxivFetcher()
+    return asyncio.run(fetcher.collect(query, max_results))
+
+def fetch_updated_since(query: str, since: datetime, max_results: Optional[float] = None, fetcher: Optional[AsyncArxivFetcher] = None) -> List[arxiv.Result]:
+    """
+    Synchronous wrapper that fetches only the results updated after `since`.
+
+    Args:
+        query (str): An arXiv API search query.
+        since (datetime): Timezone-aware cut-off; older results are not fetched.
+        max_results (Optional[float]): Upper bound on results; None, -1 or inf fetch all.
+        fetcher (Optional[AsyncArxivFetcher]): Fetcher to use; a default one is created if omitted.
+
+    Returns:
+        A list of arxiv.Result objects, newest first.
+    """
+    fetcher = fetcher or AsyncArxivFetcher()
+    return asyncio.run(fetcher.collect_updated_since(query, since, max_results))
+
+def fetch_many(queries: Sequence[Tuple[str, Optional[float]]], fetcher: Optional[AsyncArxivFetcher] = None) -> List[List[arxiv.Result]]:
+    """
+    Runs several searches concurrently under the shared rate limit.
+
+    Args:
+        queries (Sequence[Tuple[str, Optional[float]]]): (query, max_results) pairs.
+        fetcher (Optional[AsyncArxivFetcher]): Fetcher to use; a default one is created if omitted.
+
+    Returns:
+        One list of results per query, in the same order as `queries`.
+    """
+    fetcher = fetcher or AsyncArxivFetcher()
+
+    async def run():
+        return await asyncio.gather(*(fetcher.collect(query, limit) for query, limit in queries))
+
+    return list(asyncio.run(run()))
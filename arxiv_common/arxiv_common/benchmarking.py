@@ -0,0 +1,42 @@
+# arxiv_common/benchmarking.py
+#
+# Helpers shared by the scaling benchmarks: the commit a results file was recorded at, and
+# tables of the per-stage run profiles, alone or against an earlier results file.
+
+import os
+import subprocess
+from typing import Any, Dict, Optional
+
+def git_commit(path: Optional[str] = None) -> Optional[str]:
+    """Short hash of the commit checked out at `path` (default: this package), or None outside git."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=path or os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_runs(results: Dict[str, Any], stage_width: int = 22):
+    """Prints the wall time, CPU time and peak RSS of every stage of every run."""
+    print(f"\n{'sentences':>10} {'stage':<{stage_width}} {'wall s':>9} {'cpu s':>9} {'peak MB':>8}")
+    for run in results["runs"]:
+        for stage in run["stages"]:
+            print(f"{run['sentences']:>10} {stage['name']:<{stage_width}} {stage['wall_seconds']:>9.3f} "
+                  f"{stage['cpu_seconds']:>9.3f} {stage['peak_rss_mb']:>8.1f}")
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], stage_width: int = 22):
+    """Prints the wall time of each stage relative to a previous results file."""
+    old = {
+        (run["sentences"], stage["name"]): stage["wall_seconds"]
+        for run in baseline["runs"] for stage in run["stages"]
+    }
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    print(f"{'sentences':>10} {'stage':<{stage_width}} {'before s':>9} {'after s':>9} {'speedup':>8}")
+    for run in results["runs"]:
+        for stage in run["stages"]:
+            before = old.get((run["sentences"], stage["name"]))
+            if before is None:
+                continue
+            print(f"{run['sentences']:>10} {stage['name']:<{stage_width}} {before:>9.3f} {stage['wall_seconds']:>9.3f} "
+                  f"{before / max(stage['wall_seconds'], 1e-9):>7.2f}x")
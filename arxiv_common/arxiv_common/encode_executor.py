@@ -0,0 +1,246 @@
+# arxiv_common/encode_executor.py
+
+import glob
+import math
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+from tqdm import tqdm
+
+# Up to this many cores, one process with one thread per core is as fast as splitting
+# the work; past it, transformer inference stops scaling with intra-op threads.
+MAX_THREADS_PER_WORKER = 8
+
+def _parse_cpulist(text: str) -> List[int]:
+    cpus = []
+    for part in text.strip().split(','):
+        if '-' in part:
+            low, high = part.split('-')
+            cpus.extend(range(int(low), int(high) + 1))
+        elif part:
+            cpus.append(int(part))
+    return cpus
+
+def usable_cpus() -> List[int]:
+    """The CPUs this process may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+def physical_cores(cpus: List[int]) -> int:
+    """
+    Number of physical cores among `cpus`, counting SMT siblings once. torch inference
+    runs no faster (usually slower) with a thread on every hyper-thread.
+    """
+    cores = set()
+    for cpu in cpus:
+        topology = f'/sys/devices/system/cpu/cpu{cpu}/topology'
+        try:
+            with open(os.path.join(topology, 'physical_package_id'), 'r') as f:
+                package = f.read().strip()
+            with open(os.path.join(topology, 'core_id'), 'r') as f:
+                cores.add((package, f.read().strip()))
+        except OSError:
+            # Topology not exposed; count every CPU as a core.
+            return len(cpus)
+    return max(1, len(cores))
+
+def numa_nodes() -> List[List[int]]:
+    """The usable CPUs of each NUMA node (a single group where NUMA is not exposed)."""
+    usable = set(usable_cpus())
+    nodes = []
+    for path in sorted(glob.glob('/sys/devices/system/node/node[0-9]*/cpulist')):
+        try:
+            with open(path, 'r') as f:
+                cpus = [cpu for cpu in _parse_cpulist(f.read()) if cpu in usable]
+        except (OSError, ValueError):
+            continue
+        if cpus:
+            nodes.append(cpus)
+    return nodes or [sorted(usable)]
+
+def cpu_groups(workers: Optional[int] = None) -> List[List[int]]:
+    """
+    Splits the usable CPUs into one group per encode worker, never across NUMA nodes.
+
+    With `workers` unset, each NUMA node is split into groups of at most
+    MAX_THREADS_PER_WORKER cores, so a machine with up to that many cores gets a single
+    group (in-process encoding) and larger machines get one worker per core group.
+    """
+    nodes = numa_nodes()
+    if workers is None:
+        splits = [math.ceil(len(node) / MAX_THREADS_PER_WORKER) for node in nodes]
+    else:
+        # Share the workers between nodes in proportion to their size.
+        total = sum(len(node) for node in nodes)
+        splits = [max(1, round(workers * len(node) / total)) for node in nodes]
+        while sum(splits) > workers and max(splits) > 1:
+            splits[splits.index(max(splits))] -= 1
+    groups = []
+    for node, split in zip(nodes, splits):
+        size = math.ceil(len(node) / split)
+        groups.extend(node[k:k + size] for k in range(0, len(node), size))
+    return groups
+
+_worker_model = None
+
+def _init_worker(model_bytes: bytes, groups, threads: int):
+    global _worker_model
+    # Pin the worker to its own core group so workers do not compete for cores.
+    group = groups.get()
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, group)
+    torch.set_num_threads(threads or physical_cores(group))
+    _worker_model = pickle.loads(model_bytes)
+
+@contextmanager
+def _torch_threads(threads: Optional[int]):
+    """Runs the block with `threads` torch intra-op threads, restoring the previous count afterwards."""
+    if not threads:
+        yield
+        return
+    previous = torch.get_num_threads()
+    torch.set_num_threads(threads)
+    try:
+        yield
+    finally:
+        torch.set_num_threads(previous)
+
+def _encode_chunk(sentences: List[str], batch_size: int, kwargs: Dict[str, Any]) -> np.ndarray:
+    return np.asarray(_worker_model.encode(sentences, batch_size=batch_size, convert_to_numpy=True,
+                                           show_progress_bar=False, **kwargs), dtype=np.float32)
+
+def _encode_batches(batches: List[List[str]], kwargs: Dict[str, Any]) -> List[np.ndarray]:
+    return [_encode_chunk(batch, len(batch), kwargs) for batch in batches]
+
+class EncodeExecutor:
+    """
+    Runs `model.encode` with explicit CPU parallelism.
+
+    With a single worker, sentences are encoded in this process. With several, the model
+    is copied once into each of `workers` spawned processes, each pinned to its own core
+    group (see `cpu_groups`) with its own `torch.set_num_threads`; large inputs are split
+    into chunks of whole batches and spread over the pool, and the embeddings come back
+    in input order. Small inputs are still encoded in-process, where a round trip to the
+    pool would cost more than it saves.
+
+    In the workers `threads` defaults to the physical cores of the core group, leaving SMT
+    siblings idle. In this process the torch thread count is left alone unless `threads`
+    is given, and then it is only changed for the duration of each in-process encode call.
+
+    The executor has the same `encode` / `get_sentence_embedding_dimension` interface as
+    the model, so it can be used in its place. The model must be picklable to use a pool.
+    Call `close` (or use the executor as a context manager) to shut the pool down.
+    """
+    def __init__(self, model: Any, workers: Optional[int] = None, threads: Optional[int] = None,
+                 device: str = 'cpu'):
+        self.model = model
+        # GPU encoding is left to the model; the pool only helps on CPU.
+        self.groups = cpu_groups(workers) if device == 'cpu' else [usable_cpus()]
+        self.workers = len(self.groups)
+        # The in-process thread count; None keeps torch's own setting.
+        self.local_threads = threads
+        self.threads = threads or (physical_cores(self.groups[0]) if self.workers > 1 else torch.get_num_threads())
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def describe(self) -> str:
+        if self.workers == 1:
+            return f"in-process, {self.threads} torch threads"
+        return f"{self.workers} worker processes x {self.threads} torch threads (core groups {self.groups})"
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            context = multiprocessing.get_context('spawn')
+            groups = context.Queue()
+            for group in self.groups:
+                groups.put(group)
+            # Plain pickling copies the weights into each worker; torch's default
+            # multiprocessing reduction would share them through file descriptors,
+            # which quantized modules do not support.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=context,
+                initializer=_init_worker, initargs=(pickle.dumps(self.model), groups, self.local_threads)
+            )
+        return self._pool
+
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False, convert_to_numpy: bool = True,
+               convert_to_tensor: bool = False, device: Optional[str] = None, **kwargs):
+        single = isinstance(sentences, str)
+        if single or self.workers == 1 or len(sentences) < 2 * batch_size * self.workers:
+            with _torch_threads(self.local_threads):
+                return self.model.encode(sentences, batch_size=batch_size, show_progress_bar=show_progress_bar,
+                                         convert_to_numpy=convert_to_numpy, convert_to_tensor=convert_to_tensor,
+                                         device=device, **kwargs)
+
+        sentences = list(sentences)
+        # About four chunks per worker keeps the pool balanced when chunks differ in length.
+        chunk = max(batch_size, math.ceil(len(sentences) / (4 * self.workers) / batch_size) * batch_size)
+        futures = [
+            self._get_pool().submit(_encode_chunk, sentences[start:start + chunk], batch_size, kwargs)
+            for start in range(0, len(sentences), chunk)
+        ]
+        embeddings = np.concatenate([
+            future.result() for future in tqdm(futures, desc="Chunks", disable=not show_progress_bar)
+        ])
+        if convert_to_tensor:
+            return torch.from_numpy(embeddings).to(device or 'cpu')
+        if not convert_to_numpy:
+            # SentenceTransformer returns a list of tensors when neither conversion is asked for.
+            return list(torch.from_numpy(embeddings))
+        return embeddings
+
+    def encode_batches(self, batches: List[List[str]], show_progress_bar: bool = False, **kwargs) -> List[np.ndarray]:
+        """
+        Encodes pre-formed batches (e.g. from `token_batching.plan_batches`) as they are,
+        one model call per batch, returning one float32 array per batch. Extra keyword
+        arguments (e.g. `normalize_embeddings`) are passed to every `model.encode` call.
+        """
+        if self.workers == 1 or len(batches) < 2 * self.workers:
+            with _torch_threads(self.local_threads):
+                return [
+                    np.asarray(self.model.encode(batch, batch_size=len(batch), convert_to_numpy=True,
+                                                 show_progress_bar=False, **kwargs), dtype=np.float32)
+                    for batch in tqdm(batches, desc="Batches", disable=not show_progress_bar)
+                ]
+        # Interleave the batches over the chunks so every chunk gets long and short ones.
+        num_chunks = min(len(batches), 4 * self.workers)
+        futures = [
+            self._get_pool().submit(_encode_batches, batches[k::num_chunks], kwargs)
+            for k in range(num_chunks)
+        ]
+        results = [future.result() for future in tqdm(futures, desc="Chunks", disable=not show_progress_bar)]
+        encoded = [None] * len(batches)
+        for k, chunk in enumerate(results):
+            encoded[k::num_chunks] = chunk
+        return encoded
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def close(self):
+        """Shuts down the worker pool, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self) -> 'EncodeExecutor':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def parallelism_from_config(config) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Reads `encode_workers` / `encode_threads`. Workers default to 1 (in-process); 'auto'
+    picks them from the core count. Threads default to 'auto'.
+    """
+    workers = config.get('encode_workers', 1)
+    threads = config.get('encode_threads', 'auto')
+    return (None if workers in (None, 'auto') else int(workers),
+            None if threads in (None, 'auto') else int(threads))
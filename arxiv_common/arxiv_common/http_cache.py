@@ -0,0 +1,188 @@
+# arxiv_common/http_cache.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, Optional, Tuple
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a GET URL: lower-case scheme and host, query parameters sorted and
+    re-encoded, whitespace inside values collapsed. Equivalent requests share a cache entry.
+    """
+    parts = urllib.parse.urlsplit(url)
+    params = sorted(
+        (key, " ".join(value.split()))
+        for key, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+    )
+    return urllib.parse.urlunsplit((
+        parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", urllib.parse.urlencode(params), ""
+    ))
+
+class HttpCache:
+    """
+    On-disk cache of HTTP GET responses, keyed by normalized URL.
+
+    Each entry is a raw body file plus a small JSON sidecar holding the URL, validators
+    (ETag / Last-Modified) and the time it was stored. Entries younger than `ttl_seconds`
+    are served without touching the network; older ones are revalidated with a
+    conditional request, and a 304 reply refreshes them in place. The body file's mtime
+    records the last access, and the least recently used entries are evicted once the
+    cache grows past `max_bytes`.
+
+    With `offline=True` the directory acts as a fixture set: entries never expire and a
+    URL without an entry raises LookupError instead of reaching the live API. A fixture
+    directory is simply a cache directory recorded during an online run.
+    """
+    def __init__(self, cache_dir: str, ttl_seconds: float = 24 * 3600, max_bytes: int = 256 * 1024 * 1024,
+                 offline: bool = False):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._sizes: Dict[str, int] = {
+            name[:-len(".body")]: os.path.getsize(os.path.join(cache_dir, name))
+            for name in os.listdir(cache_dir) if name.endswith(".body")
+        }
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str) -> Tuple[str, str]:
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.body", f"{base}.json"
+
+    def lookup(self, url: str) -> Tuple[Optional[bytes], Dict[str, str]]:
+        """
+        Looks up `url`.
+
+        Returns:
+            (body, headers): the body when the entry is fresh (None otherwise), and the
+            conditional request headers to send when it has to be revalidated.
+        """
+        key = self.key(url)
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            if self.offline:
+                raise LookupError(f"No cached response (fixture) for {normalize_url(url)} in {self.cache_dir}")
+            self.misses += 1
+            return None, {}
+
+        if self.offline or time.time() - meta["stored_at"] < self.ttl_seconds:
+            self.hits += 1
+            os.utime(body_path)
+            return body, {}
+
+        self.misses += 1
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return None, headers
+
+    def revalidated_body(self, url: str) -> bytes:
+        """Marks an entry as fresh again after a 304 Not Modified reply and returns its body."""
+        key = self.key(url)
+        body_path, meta_path = self._paths(key)
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        meta["stored_at"] = time.time()
+        self._write_json(meta_path, meta)
+        os.utime(body_path)
+        self.revalidated += 1
+        with open(body_path, 'rb') as f:
+            return f.read()
+
+    def store(self, url: str, body: bytes, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Stores a response body and its validators, evicting old entries if needed."""
+        key = self.key(url)
+        body_path, meta_path = self._paths(key)
+        tmp_path = f"{body_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, body_path)
+        self._write_json(meta_path, {
+            "url": normalize_url(url),
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+        })
+        with self._lock:
+            self._sizes[key] = len(body)
+            self._evict(keep=key)
+
+    def discard(self, url: str):
+        """Removes the entry for `url`, e.g. when the response turned out to be unusable. Fixtures are never removed."""
+        if self.offline:
+            return
+        key = self.key(url)
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._sizes.pop(key, None)
+
+    def _write_json(self, path: str, data: Dict):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def _evict(self, keep: str):
+        total = sum(self._sizes.values())
+        if total <= self.max_bytes:
+            return
+        def last_access(key):
+            try:
+                return os.path.getmtime(self._paths(key)[0])
+            except OSError:
+                return 0.0
+        for key in sorted(self._sizes, key=last_access):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= self._sizes.pop(key)
+
+    def report(self):
+        print(f"HTTP cache: {self.hits} hits, {self.misses} misses ({self.revalidated} answered by 304 Not Modified), "
+              f"{sum(self._sizes.values()) / (1024 * 1024):.1f} MB in {self.cache_dir}.")
+
+def http_cache_from_config(config: Dict[str, Any]) -> Optional[HttpCache]:
+    """
+    Builds the HttpCache described by the config: `http_fixture_dir` replays recorded
+    responses without network access; otherwise `http_cache_dir` (with
+    `http_cache_ttl_hours` and `http_cache_max_mb`) caches live responses. Returns None
+    when neither is set.
+    """
+    if config.get('http_fixture_dir'):
+        return HttpCache(config['http_fixture_dir'], offline=True)
+    if config.get('http_cache_dir'):
+        return HttpCache(
+            config['http_cache_dir'],
+            ttl_seconds=config.get('http_cache_ttl_hours', 24) * 3600,
+            max_bytes=int(config.get('http_cache_max_mb', 256) * 1024 * 1024)
+        )
+    return None
@@ -0,0 +1,355 @@
+# arxiv_common/metadata_store.py
+
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import sqlite3
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import arxiv
+
+from arxiv_common.async_fetcher import fetch_results, fetch_updated_since
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    arxiv_id TEXT PRIMARY KEY,
+    entry_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    authors TEXT NOT NULL,
+    published TEXT,
+    updated TEXT,
+    pdf_url TEXT,
+    primary_category TEXT,
+    categories TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+    title, summary, content='papers', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+    INSERT INTO papers_fts(rowid, title, summary) VALUES (new.rowid, new.title, new.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+    INSERT INTO papers_fts(papers_fts, rowid, title, summary) VALUES ('delete', old.rowid, old.title, old.summary);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE ON papers BEGIN
+    INSERT INTO papers_fts(papers_fts, rowid, title, summary) VALUES ('delete', old.rowid, old.title, old.summary);
+    INSERT INTO papers_fts(rowid, title, summary) VALUES (new.rowid, new.title, new.summary);
+END;
+CREATE TABLE IF NOT EXISTS synced_queries (
+    query TEXT PRIMARY KEY,
+    synced_at TEXT NOT NULL
+);
+"""
+
+UPSERT = """
+INSERT INTO papers (arxiv_id, entry_id, title, summary, authors, published, updated, pdf_url, primary_category, categories)
+VALUES (:arxiv_id, :entry_id, :title, :summary, :authors, :published, :updated, :pdf_url, :primary_category, :categories)
+ON CONFLICT(arxiv_id) DO UPDATE SET
+    entry_id = excluded.entry_id, title = excluded.title, summary = excluded.summary,
+    authors = excluded.authors, published = excluded.published, updated = excluded.updated,
+    pdf_url = excluded.pdf_url, primary_category = excluded.primary_category, categories = excluded.categories
+WHERE excluded.updated >= papers.updated OR papers.updated IS NULL
+"""
+
+OAI_NS = "{http://www.openarchives.org/OAI/2.0/}"
+OAI_ARXIV_NS = "{http://arxiv.org/OAI/arXiv/}"
+
+# arXiv query field prefixes and the FTS5 column they map to (None searches every column).
+# Any other `word:` (e.g. a subtitle colon in a raw title) is an ordinary term.
+FIELD_COLUMNS = {"ti": "title", "abs": "summary", "all": None,
+                 "au": None, "co": None, "jr": None, "cat": None, "rn": None, "id": None}
+QUERY_TOKEN = re.compile(r'(' + '|'.join(FIELD_COLUMNS) + r'):|\\?"((?:[^"\\]|\\.)*)\\?"|(\()|(\))|([^\s()"]+)')
+
+def _base_id(arxiv_id: str) -> str:
+    """Drops the version suffix so every version of a paper shares one row."""
+    return re.sub(r'v\d+$', '', arxiv_id)
+
+def _fts_phrase(text: str) -> Optional[str]:
+    text = re.sub(r'\s+', ' ', text.replace('\\', '').replace('"', ' ')).strip()
+    return f'"{text}"' if text else None
+
+def to_fts_query(query: str) -> str:
+    """
+    Translates an arXiv API search query into an FTS5 MATCH expression.
+
+    `ti:` and `abs:` become column filters on title and summary, quoted strings stay
+    phrases, AND/OR/ANDNOT map to FTS5 operators and parentheses are kept. Terms with no
+    operator between them are OR-ed, and the bm25 ranking does the rest.
+
+    Args:
+        query (str): The arXiv query, e.g. '(ti:"Some Title") OR (abs:("kw1" OR "kw2"))'.
+
+    Returns:
+        The FTS5 expression.
+    """
+    out: List[str] = []
+
+    def needs_or():
+        return out and out[-1] not in ("AND", "OR", "NOT", "(") and not out[-1].endswith(":")
+
+    for field, phrase, open_paren, close_paren, word in QUERY_TOKEN.findall(query):
+        if field:
+            if needs_or():
+                out.append("OR")
+            column = FIELD_COLUMNS.get(field.lower())
+            if column:
+                out.append(f"{column} :")
+            continue
+        if close_paren:
+            if out and out[-1] == "(":
+                out.pop()
+            elif out and out[-1].endswith(":"):
+                out.pop()
+                out.append(")")
+            else:
+                out.append(")")
+            continue
+        if word in ("AND", "OR"):
+            out.append(word)
+            continue
+        if word == "ANDNOT":
+            out.append("NOT")
+            continue
+        term = "(" if open_paren else _fts_phrase(phrase or word)
+        if term is None:
+            continue
+        if needs_or():
+            out.append("OR")
+        out.append(term)
+
+    while out and (out[-1] in ("AND", "OR", "NOT") or out[-1].endswith(":")):
+        out.pop()
+    return " ".join(out)
+
+def result_to_row(result: arxiv.Result) -> Dict[str, Any]:
+    """Flattens an `arxiv.Result` into a store row; `row_to_result` reverses it."""
+    return {
+        "arxiv_id": _base_id(result.entry_id.split('/abs/')[-1]),
+        "entry_id": result.entry_id,
+        "title": result.title,
+        "summary": result.summary,
+        "authors": json.dumps([author.name for author in result.authors]),
+        "published": result.published.isoformat() if result.published else None,
+        "updated": result.updated.isoformat() if result.updated else None,
+        "pdf_url": result.pdf_url,
+        "primary_category": result.primary_category,
+        "categories": json.dumps(list(result.categories)),
+    }
+
+def row_to_result(row: sqlite3.Row) -> arxiv.Result:
+    """Rebuilds an `arxiv.Result` from a stored row so callers cannot tell it came from disk."""
+    links = [arxiv.Result.Link(row["entry_id"], rel="alternate", content_type="text/html")]
+    if row["pdf_url"]:
+        links.append(arxiv.Result.Link(row["pdf_url"], title="pdf", rel="related", content_type="application/pdf"))
+    return arxiv.Result(
+        entry_id=row["entry_id"],
+        updated=datetime.fromisoformat(row["updated"]) if row["updated"] else None,
+        published=datetime.fromisoformat(row["published"]) if row["published"] else None,
+        title=row["title"],
+        authors=[arxiv.Result.Author(name) for name in json.loads(row["authors"])],
+        summary=row["summary"],
+        primary_category=row["primary_category"] or "",
+        categories=json.loads(row["categories"] or "[]"),
+        links=links
+    )
+
+class MetadataStore:
+    """
+    SQLite store of arXiv paper metadata with an FTS5 index over title and abstract.
+
+    It is filled from fetcher results or from bulk dumps (the Kaggle JSON snapshot or
+    OAI-PMH `arXiv` metadata records) and answers `ti:`/`abs:` queries locally.
+    """
+    def __init__(self, db_path: str):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def _upsert_rows(self, rows: Iterable[Dict[str, Any]], batch_size: int = 10000) -> int:
+        count = 0
+        batch = []
+        with self.conn:
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    self.conn.executemany(UPSERT, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self.conn.executemany(UPSERT, batch)
+                count += len(batch)
+        return count
+
+    def add_results(self, results: Iterable[arxiv.Result]) -> int:
+        """Inserts or refreshes papers returned by the arXiv API."""
+        return self._upsert_rows(result_to_row(result) for result in results)
+
+    def import_kaggle_snapshot(self, path: str) -> int:
+        """
+        Imports the Kaggle `arxiv-metadata-oai-snapshot.json` dump (one JSON object per line).
+        The file is streamed, so multi-gigabyte snapshots do not need to fit in memory.
+        """
+        def rows() -> Iterator[Dict[str, Any]]:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    versions = record.get("versions") or [{"version": "v1"}]
+                    latest = versions[-1]["version"]
+                    created = versions[0].get("created")
+                    if record.get("authors_parsed"):
+                        authors = [" ".join(p for p in (parts[1], parts[0], parts[2] if len(parts) > 2 else "") if p)
+                                   for parts in record["authors_parsed"]]
+                    else:
+                        authors = [a.strip() for a in re.split(r',| and ', record.get("authors", "")) if a.strip()]
+                    categories = (record.get("categories") or "").split()
+                    yield {
+                        "arxiv_id": record["id"],
+                        "entry_id": f"http://arxiv.org/abs/{record['id']}{latest}",
+                        "title": re.sub(r'\s+', ' ', record.get("title", "")).strip(),
+                        "summary": record.get("abstract", "").strip(),
+                        "authors": json.dumps(authors),
+                        "published": parsedate_to_datetime(created).isoformat() if created else None,
+                        "updated": (datetime.fromisoformat(record["update_date"]).replace(tzinfo=timezone.utc).isoformat()
+                                    if record.get("update_date") else None),
+                        "pdf_url": f"http://arxiv.org/pdf/{record['id']}{latest}",
+                        "primary_category": categories[0] if categories else "",
+                        "categories": json.dumps(categories),
+                    }
+        return self._upsert_rows(rows())
+
+    def import_oai_pmh(self, path: str) -> int:
+        """Imports an OAI-PMH ListRecords response harvested with metadataPrefix=arXiv."""
+        def rows() -> Iterator[Dict[str, Any]]:
+            for _, element in ET.iterparse(path):
+                if element.tag != f"{OAI_ARXIV_NS}arXiv":
+                    continue
+                arxiv_id = element.findtext(f"{OAI_ARXIV_NS}id", "").strip()
+                authors = []
+                for author in element.iter(f"{OAI_ARXIV_NS}author"):
+                    parts = (author.findtext(f"{OAI_ARXIV_NS}forenames", ""), author.findtext(f"{OAI_ARXIV_NS}keyname", ""))
+                    authors.append(" ".join(p.strip() for p in parts if p.strip()))
+                created = element.findtext(f"{OAI_ARXIV_NS}created")
+                updated = element.findtext(f"{OAI_ARXIV_NS}updated") or created
+                categories = (element.findtext(f"{OAI_ARXIV_NS}categories") or "").split()
+                yield {
+                    "arxiv_id": arxiv_id,
+                    "entry_id": f"http://arxiv.org/abs/{arxiv_id}",
+                    "title": re.sub(r'\s+', ' ', element.findtext(f"{OAI_ARXIV_NS}title", "")).strip(),
+                    "summary": element.findtext(f"{OAI_ARXIV_NS}abstract", "").strip(),
+                    "authors": json.dumps(authors),
+                    "published": datetime.fromisoformat(created).replace(tzinfo=timezone.utc).isoformat() if created else None,
+                    "updated": datetime.fromisoformat(updated).replace(tzinfo=timezone.utc).isoformat() if updated else None,
+                    "pdf_url": f"http://arxiv.org/pdf/{arxiv_id}",
+                    "primary_category": categories[0] if categories else "",
+                    "categories": json.dumps(categories),
+                }
+                element.clear()
+        return self._upsert_rows(rows())
+
+    def search(self, query: str, max_results: Optional[float] = None) -> List[arxiv.Result]:
+        """
+        Answers an arXiv-style query from the local index, best bm25 match first.
+
+        Args:
+            query (str): An arXiv API search query.
+            max_results (Optional[float]): Upper bound on results; None, -1 or inf return all.
+
+        Returns:
+            A list of arxiv.Result objects.
+        """
+        match = to_fts_query(query)
+        if not match:
+            return []
+        limit = -1 if max_results in (None, -1) or max_results == math.inf else int(max_results)
+        try:
+            rows = self.conn.execute(
+                "SELECT papers.* FROM papers_fts JOIN papers ON papers.rowid = papers_fts.rowid "
+                "WHERE papers_fts MATCH ? ORDER BY bm25(papers_fts) LIMIT ?",
+                (match, limit)
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"Could not run local query '{match}': {e}")
+            return []
+        return [row_to_result(row) for row in rows]
+
+    def last_synced(self, query: str) -> Optional[datetime]:
+        row = self.conn.execute("SELECT synced_at FROM synced_queries WHERE query = ?", (query,)).fetchone()
+        return datetime.fromisoformat(row["synced_at"]) if row else None
+
+    def mark_synced(self, query: str, synced_at: datetime):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO synced_queries (query, synced_at) VALUES (?, ?) "
+                "ON CONFLICT(query) DO UPDATE SET synced_at = excluded.synced_at",
+                (query, synced_at.isoformat())
+            )
+
+def search_with_store(store: MetadataStore, query: str, max_results: Optional[float], offline: bool = False) -> List[arxiv.Result]:
+    """
+    Answers `query` from the local store, syncing it with arXiv first unless offline.
+
+    The first time a query is seen its results are fetched in full; after that only
+    papers updated since the last sync are requested. The answer is ranked locally over
+    every paper in the store, so it can include papers synced for other queries or
+    bulk-loaded, and differs from arXiv's own relevance ranking.
+
+    Args:
+        store (MetadataStore): The local metadata store.
+        query (str): An arXiv API search query.
+        max_results (Optional[float]): Upper bound on results; None, -1 or inf return all.
+        offline (bool): If True, never touch the network.
+
+    Returns:
+        A list of arxiv.Result objects.
+    """
+    if not offline:
+        synced_at = datetime.now(timezone.utc)
+        since = store.last_synced(query)
+        try:
+            if since is None:
+                fetched = fetch_results(query, max_results)
+            else:
+                fetched = fetch_updated_since(query, since, max_results)
+            store.add_results(fetched)
+            store.mark_synced(query, synced_at)
+            print(f"Synced {len(fetched)} new or updated paper(s) into {store.db_path}.")
+        except (OSError, ValueError, LookupError) as e:
+            # LookupError: an HTTP fixture set without a recording of this request.
+            print(f"Could not sync with arXiv ({e}); answering from the local store.")
+    return store.search(query, max_results)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load arXiv metadata into the local store.")
+    parser.add_argument("db_path", help="Path to the SQLite metadata store.")
+    parser.add_argument("--kaggle", nargs='*', default=[], help="Kaggle arxiv-metadata-oai-snapshot.json file(s).")
+    parser.add_argument("--oai", nargs='*', default=[], help="OAI-PMH ListRecords XML file(s) or glob patterns.")
+    args = parser.parse_args()
+
+    store = MetadataStore(args.db_path)
+    for path in args.kaggle:
+        print(f"Imported {store.import_kaggle_snapshot(path)} record(s) from {path}.")
+    for pattern in args.oai:
+        for path in sorted(glob.glob(pattern)):
+            print(f"Imported {store.import_oai_pmh(path)} record(s) from {path}.")
+    print(f"Store now holds {len(store)} paper(s).")
+    store.close()
@@ -0,0 +1,89 @@
+# arxiv_common/parse_cache.py
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from typing import Any, Dict, Optional
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ParseCache:
+    """
+    Content-addressed cache of parsed documents.
+
+    Entries are keyed by the SHA-256 of the file contents, so a renamed or copied PDF is
+    still a hit and an edited one is a miss. Each entry is a gzip-compressed JSON file
+    under `<cache_dir>/<parser_version>/<variant>/`, so changing the parser version
+    invalidates everything written by older heuristics; `prune` deletes those stale
+    directories. `variant` separates results of different PDF backends.
+
+    Each project passes its own `parser_version`, defined next to the parsing code it
+    tags, and bumps it whenever that code changes behaviour.
+    """
+    def __init__(self, cache_dir: str, parser_version: str, variant: str = ""):
+        self.root = cache_dir
+        self.parser_version = parser_version
+        self.directory = os.path.join(cache_dir, parser_version, variant)
+
+    def _entry_path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], f"{digest}.json.gz")
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached record for the file at `path`, or None on a miss."""
+        entry_path = self._entry_path(file_digest(path))
+        if not os.path.exists(entry_path):
+            return None
+        try:
+            with gzip.open(entry_path, 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # A truncated entry (e.g. from an interrupted run) is treated as a miss.
+            return None
+
+    def put(self, path: str, record: Dict[str, Any]):
+        """Stores `record` for the file at `path`."""
+        entry_path = self._entry_path(file_digest(path))
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, entry_path)
+
+    def prune(self) -> int:
+        """Deletes entries written by other parser versions and returns how many versions were removed."""
+        if not os.path.isdir(self.root):
+            return 0
+        removed = 0
+        for name in os.listdir(self.root):
+            if name != self.parser_version and os.path.isdir(os.path.join(self.root, name)):
+                shutil.rmtree(os.path.join(self.root, name))
+                removed += 1
+        return removed
+
+    def clear(self):
+        """Deletes every entry, whatever its parser version."""
+        if os.path.isdir(self.root):
+            shutil.rmtree(self.root)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the parsed-PDF cache.")
+    parser.add_argument("cache_dir", help="Directory of the cache (parse_cache_dir in the config).")
+    parser.add_argument("parser_version", help="The project's current PARSER_VERSION; other versions are pruned.")
+    parser.add_argument("--clear", action="store_true", help="Delete every cached entry.")
+    args = parser.parse_args()
+
+    cache = ParseCache(args.cache_dir, args.parser_version)
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {args.cache_dir}.")
+    else:
+        print(f"Removed {cache.prune()} stale parser version(s) from {args.cache_dir}.")
@@ -0,0 +1,101 @@
+# arxiv_common/pdf_backends.py
+
+from typing import Dict, Iterator, Type
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+class PdfBackend:
+    """
+    Interface of a PDF text extractor.
+
+    Subclasses set `name` and implement `iter_pages`, yielding the text of one page at a
+    time so callers can stop early. Register them with `register_backend` to make them
+    selectable through the `pdf_backend` config key.
+    """
+    name = ""
+
+    def iter_pages(self, filepath: str) -> Iterator[str]:
+        raise NotImplementedError
+
+    def page_count(self, filepath: str) -> int:
+        raise NotImplementedError
+
+_BACKENDS: Dict[str, Type[PdfBackend]] = {}
+
+def register_backend(backend_cls: Type[PdfBackend]) -> Type[PdfBackend]:
+    """Registers a PdfBackend subclass under its `name`; usable as a class decorator."""
+    _BACKENDS[backend_cls.name] = backend_cls
+    return backend_cls
+
+def available_backends() -> Dict[str, bool]:
+    """Maps every registered backend name to whether its library is installed."""
+    available = {}
+    for name in _BACKENDS:
+        try:
+            get_backend(name)
+            available[name] = True
+        except ImportError:
+            available[name] = False
+    return available
+
+def get_backend(name: str) -> PdfBackend:
+    """
+    Returns an instance of the backend registered as `name`.
+
+    Args:
+        name (str): The backend name, e.g. 'pypdf' or 'pymupdf'.
+
+    Returns:
+        PdfBackend: The backend.
+    """
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{name}'. Available backends: {', '.join(sorted(_BACKENDS))}.")
+    return _BACKENDS[name]()
+
+@register_backend
+class PypdfBackend(PdfBackend):
+    """Pure-Python extraction with pypdf; slower, but has no compiled dependencies."""
+    name = "pypdf"
+
+    def __init__(self):
+        if pypdf is None:
+            raise ImportError("The 'pypdf' backend requires pypdf (pip install pypdf).")
+
+    def iter_pages(self, filepath: str) -> Iterator[str]:
+        with open(filepath, 'rb') as f:
+            reader = pypdf.PdfReader(f)
+            for page in reader.pages:
+                yield page.extract_text()
+
+    def page_count(self, filepath: str) -> int:
+        with open(filepath, 'rb') as f:
+            return len(pypdf.PdfReader(f).pages)
+
+@register_backend
+class PyMuPDFBackend(PdfBackend):
+    """Extraction with PyMuPDF (MuPDF bindings); much faster on large documents."""
+    name = "pymupdf"
+
+    def __init__(self):
+        if fitz is None:
+            raise ImportError("The 'pymupdf' backend requires PyMuPDF (pip install PyMuPDF).")
+
+    def iter_pages(self, filepath: str) -> Iterator[str]:
+        doc = fitz.open(filepath)
+        try:
+            for page in doc:
+                yield page.get_text("text")
+        finally:
+            doc.close()
+
+    def page_count(self, filepath: str) -> int:
+        with fitz.open(filepath) as doc:
+            return doc.page_count
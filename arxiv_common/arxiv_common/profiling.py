@@ -0,0 +1,115 @@
+# arxiv_common/profiling.py
+
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _children_cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+class Stage:
+    """Measurements of one pipeline stage; `count` records how many items it handled."""
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.child_cpu_seconds = 0.0
+        self.peak_rss_mb = 0.0
+        self.rss_growth_mb = 0.0
+        self.counts: Dict[str, float] = {}
+
+    def count(self, **counts: float):
+        """Adds to this stage's item counts, e.g. `stage.count(pages=12, sentences=340)`."""
+        for key, value in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "wall_seconds": round(self.wall_seconds, 4),
+            "cpu_seconds": round(self.cpu_seconds, 4),
+            "child_cpu_seconds": round(self.child_cpu_seconds, 4),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "rss_growth_mb": round(self.rss_growth_mb, 1),
+            "counts": self.counts,
+        }
+
+class RunProfiler:
+    """
+    Records wall time, CPU time, peak RSS and item counts for each stage of a run.
+
+    Wrap every step in `with profiler.stage("name") as stage:` and call
+    `stage.count(...)` inside it. CPU time is the process time of this process (all
+    threads); `child_cpu_seconds` adds the time of worker processes that finished during
+    the stage. Peak RSS is process-wide and never decreases, so `rss_growth_mb` shows how
+    much a stage raised it. `save` writes the profile as JSON for comparison across runs.
+    """
+    def __init__(self, run_name: str):
+        self.run_name = run_name
+        self.stages: List[Stage] = []
+        self.info: Dict[str, Any] = {}
+        self.started_at = datetime.now(timezone.utc)
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[Stage]:
+        stage = Stage(name)
+        rss_before = peak_rss_mb()
+        wall, cpu, child_cpu = time.perf_counter(), time.process_time(), _children_cpu_seconds()
+        try:
+            yield stage
+        finally:
+            stage.wall_seconds = time.perf_counter() - wall
+            stage.cpu_seconds = time.process_time() - cpu
+            stage.child_cpu_seconds = _children_cpu_seconds() - child_cpu
+            stage.peak_rss_mb = peak_rss_mb()
+            stage.rss_growth_mb = stage.peak_rss_mb - rss_before
+            self.stages.append(stage)
+
+    def annotate(self, **info: Any):
+        """Adds run-level details to the profile, e.g. the models and settings used."""
+        self.info.update(info)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "run": self.run_name,
+            "started_at": self.started_at.isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "total_wall_seconds": round(time.perf_counter() - self._start_wall, 4),
+            "total_cpu_seconds": round(time.process_time() - self._start_cpu, 4),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "info": self.info,
+            "stages": [stage.to_dict() for stage in self.stages],
+        }
+
+    def save(self, path: str) -> Dict[str, Any]:
+        """Writes the run profile to `path` as JSON and returns it."""
+        profile = self.to_dict()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=4)
+        return profile
+
+    def report(self):
+        """Prints one line per stage."""
+        print(f"{'stage':<22} {'wall s':>8} {'cpu s':>8} {'peak MB':>8}  counts")
+        for stage in self.stages:
+            counts = ", ".join(f"{key}={value:g}" for key, value in stage.counts.items())
+            print(f"{stage.name:<22} {stage.wall_seconds:>8.2f} {stage.cpu_seconds + stage.child_cpu_seconds:>8.2f} "
+                  f"{stage.peak_rss_mb:>8.1f}  {counts}")
@@ -0,0 +1,184 @@
+# arxiv_common/query_planner.py
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+
+import arxiv
+from arxiv_common.async_fetcher import AsyncArxivFetcher, fetch_many
+
+# The arXiv API is queried with GET requests, so the whole search has to fit in the URL.
+# 1000 encoded characters of search_query stays well clear of server and proxy limits.
+MAX_QUERY_CHARS = 1000
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r'[^0-9a-z]+', ' ', text.lower()).split())
+
+class SubQuery:
+    """
+    One phrase searched in one or more fields, e.g. a keyword in `ti:` and `abs:`.
+
+    Args:
+        phrase (str): The phrase to search for.
+        fields (Sequence[str]): arXiv field prefixes to search ('ti', 'abs').
+        max_results (int): Results wanted for this phrase on its own.
+    """
+    def __init__(self, phrase: str, fields: Sequence[str] = ("ti", "abs"), max_results: int = 10):
+        self.phrase = " ".join(phrase.replace('"', ' ').split())
+        self.fields = tuple(fields)
+        self.max_results = max_results
+
+    @property
+    def key(self) -> Tuple[Tuple[str, ...], str, int]:
+        return self.fields, _normalize(self.phrase), self.max_results
+
+    def to_query(self) -> str:
+        terms = [f'{field}:"{self.phrase}"' for field in self.fields]
+        return terms[0] if len(terms) == 1 else f"({' OR '.join(terms)})"
+
+    def matches(self, result: arxiv.Result) -> bool:
+        """Whether the phrase occurs in one of the searched fields of `result`."""
+        texts = {"ti": result.title, "abs": result.summary}
+        phrase = f" {_normalize(self.phrase)} "
+        return any(phrase in f" {_normalize(texts.get(field) or '')} " for field in self.fields)
+
+class QueryPlan:
+    """A single API request answering several sub-queries at once."""
+    def __init__(self, sub_queries: List[SubQuery]):
+        self.sub_queries = sub_queries
+        self.query = " OR ".join(sub_query.to_query() for sub_query in sub_queries)
+        self.max_results = sum(sub_query.max_results for sub_query in sub_queries)
+
+class QueryPlanner:
+    """
+    Packs sub-queries into as few arXiv API requests as the URL length allows.
+
+    Each request ORs its sub-queries together and asks for the sum of their result
+    counts. The results are attributed back to the sub-queries locally by matching each
+    phrase against the searched fields, so callers still get per-phrase results. arXiv
+    also matches stemmed forms, so a result can be returned without being attributed to
+    any phrase; it is still part of the request's results. When a merged request comes
+    back with fewer results than it asked for, its sub-queries attributed fewer than
+    their `max_results` are re-issued on their own. Callers that only use the union
+    call `search`, which skips attribution and re-issues altogether.
+
+    Sub-queries and requests already answered by this planner are served from memory, so
+    a planner shared across a batch of documents never repeats a search.
+    """
+    def __init__(self, max_query_chars: int = MAX_QUERY_CHARS, fetcher: Optional[AsyncArxivFetcher] = None):
+        self.max_query_chars = max_query_chars
+        self.fetcher = fetcher
+        self.answered: Dict[Tuple[Tuple[str, ...], str, int], List[arxiv.Result]] = {}
+        self.responses: Dict[str, List[arxiv.Result]] = {}
+        self.requests_made = 0
+
+    def _fits(self, sub_queries: List[SubQuery]) -> bool:
+        query = " OR ".join(sub_query.to_query() for sub_query in sub_queries)
+        return len(urlencode({"search_query": query})) <= self.max_query_chars
+
+    def plan(self, sub_queries: Sequence[SubQuery]) -> List[QueryPlan]:
+        """
+        Groups the sub-queries that still need an answer into requests, in order.
+
+        A sub-query too long to share a request gets one of its own.
+        """
+        plans, current, seen = [], [], set()
+        for sub_query in sub_queries:
+            if sub_query.key in self.answered or sub_query.key in seen:
+                continue
+            seen.add(sub_query.key)
+            if current and not self._fits(current + [sub_query]):
+                plans.append(QueryPlan(current))
+                current = []
+            current.append(sub_query)
+        if current:
+            plans.append(QueryPlan(current))
+        return plans
+
+    def _fetch(self, plans: List[QueryPlan]) -> List[List[arxiv.Result]]:
+        if plans:
+            print(f"Planned {len(plans)} ArXiv request(s) for {sum(len(p.sub_queries) for p in plans)} sub-queries.")
+        responses = fetch_many([(p.query, p.max_results) for p in plans], fetcher=self.fetcher) if plans else []
+        self.requests_made += len(plans)
+        return responses
+
+    def search(self, sub_queries: Sequence[SubQuery]) -> List[arxiv.Result]:
+        """
+        Answers the sub-queries with as few requests as possible, without attributing the
+        results to each phrase.
+
+        Args:
+            sub_queries (Sequence[SubQuery]): The phrases to search for.
+
+        Returns:
+            The unique results of all requests, in request and relevance order, followed
+            by results reused from earlier runs.
+        """
+        answered = [self.answered[q.key] for q in sub_queries if q.key in self.answered]
+        plans = self.plan(sub_queries)
+        new_plans = [plan for plan in plans if plan.query not in self.responses]
+        for plan, results in zip(new_plans, self._fetch(new_plans)):
+            self.responses[plan.query] = results
+
+        union, seen_ids = [], set()
+        for results in [self.responses[plan.query] for plan in plans] + answered:
+            for result in results:
+                short_id = result.entry_id.split('/')[-1]
+                if short_id not in seen_ids:
+                    seen_ids.add(short_id)
+                    union.append(result)
+        return union
+
+    def run(self, sub_queries: Sequence[SubQuery]) -> Tuple[List[arxiv.Result], List[List[arxiv.Result]]]:
+        """
+        Answers the sub-queries with as few requests as possible.
+
+        Args:
+            sub_queries (Sequence[SubQuery]): The phrases to search for.
+
+        Returns:
+            The unique results of all requests (in request and relevance order, followed by
+            results reused from earlier runs) and, for each sub-query, the results
+            attributed to it (at most its `max_results`).
+        """
+        plans = self.plan(sub_queries)
+        responses = self._fetch(plans)
+
+        union, seen_ids = [], set()
+
+        def add(result: arxiv.Result):
+            short_id = result.entry_id.split('/')[-1]
+            if short_id not in seen_ids:
+                seen_ids.add(short_id)
+                union.append(result)
+
+        short = []
+        for plan, results in zip(plans, responses):
+            for result in results:
+                add(result)
+            for sub_query in plan.sub_queries:
+                if len(plan.sub_queries) == 1:
+                    self.answered[sub_query.key] = results
+                    continue
+                attributed = [result for result in results if sub_query.matches(result)]
+                # A full response used its whole budget; only a short one can have left
+                # a phrase's own results out.
+                if len(results) < plan.max_results and len(attributed) < sub_query.max_results:
+                    short.append(sub_query)
+                else:
+                    self.answered[sub_query.key] = attributed[:sub_query.max_results]
+
+        if short:
+            print(f"Re-issuing {len(short)} sub-queries that a merged request answered short.")
+            retries = fetch_many([(q.to_query(), q.max_results) for q in short], fetcher=self.fetcher)
+            self.requests_made += len(short)
+            for sub_query, results in zip(short, retries):
+                for result in results:
+                    add(result)
+                self.answered[sub_query.key] = results
+
+        per_sub_query = [self.answered[sub_query.key] for sub_query in sub_queries]
+        for results in per_sub_query:
+            for result in results:
+                add(result)
+        return union, per_sub_query
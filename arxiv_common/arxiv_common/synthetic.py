@@ -0,0 +1,132 @@
+# arxiv_common/synthetic.py
+#
+# Deterministic synthetic corpora and a stub sentence encoder for the benchmarks, so they
+# run offline on a CPU-only machine and give the same inputs on every run.
+
+import random
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+def make_vocabulary(size: int = 5000, seed: int = 0) -> List[str]:
+    """Pronounceable pseudo-words, so sentences tokenize like real text."""
+    rng = random.Random(seed)
+    consonants, vowels = "bcdfghjklmnprstvz", "aeiou"
+    words = set()
+    while len(words) < size:
+        length = rng.randint(2, 4)
+        words.add("".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(length)))
+    return sorted(words)
+
+class SyntheticPaper:
+    """The attributes of an `arxiv.Result` that the similarity and report steps read."""
+    def __init__(self, index: int, title: str, summary: str):
+        self.entry_id = f"http://arxiv.org/abs/synthetic.{index:06d}v1"
+        self.pdf_url = f"http://arxiv.org/pdf/synthetic.{index:06d}v1"
+        self.title = title
+        self.summary = summary
+
+class SyntheticCorpus:
+    """
+    Generates a source document and a corpus of `num_papers` x `sentences_per_paper`
+    sentences from a fixed seed.
+
+    A fraction `overlap` of the corpus documents contain a copy of a source sentence with
+    a single word changed, so the similarity search has a known number of true matches
+    to report at every size.
+
+    The corpus is exposed both as sentence-level documents (`source_doc`, `corpus_docs`)
+    and as paper records (`title`, `abstract`, `papers`) for title/abstract ranking.
+    """
+    def __init__(self, num_papers: int, sentences_per_paper: int = 10, source_sentences: int = 20,
+                 overlap: float = 0.05, words_per_sentence: Tuple[int, int] = (8, 24), seed: int = 0):
+        self.rng = random.Random(seed)
+        self.vocabulary = make_vocabulary(seed=seed)
+        self.words_per_sentence = words_per_sentence
+        self.source_doc: Dict[str, Any] = {
+            "title": self.sentence(),
+            "abstract": "",
+            "sentences": [self.sentence() for _ in range(source_sentences)],
+            "path": "source.pdf",
+        }
+        self.source_doc["abstract"] = " ".join(self.source_doc["sentences"])
+
+        self.corpus_docs: List[Dict[str, Any]] = []
+        plant_every = max(1, round(1 / overlap)) if overlap else 0
+        for d in range(num_papers):
+            sentences = [self.sentence() for _ in range(sentences_per_paper)]
+            if plant_every and d % plant_every == 0:
+                sentences[self.rng.randrange(sentences_per_paper)] = self.paraphrase(
+                    self.rng.choice(self.source_doc["sentences"]))
+            self.corpus_docs.append({
+                "title": self.sentence().capitalize(),
+                "abstract": " ".join(sentences),
+                "sentences": sentences,
+                "path": f"synthetic/{d:06d}.pdf",
+            })
+
+    def sentence(self) -> str:
+        low, high = self.words_per_sentence
+        return " ".join(self.rng.choice(self.vocabulary) for _ in range(self.rng.randint(low, high))) + "."
+
+    def paraphrase(self, sentence: str) -> str:
+        words = sentence.rstrip(".").split()
+        words[self.rng.randrange(len(words))] = self.rng.choice(self.vocabulary)
+        return " ".join(words) + "."
+
+    @property
+    def num_sentences(self) -> int:
+        return sum(len(doc["sentences"]) for doc in self.corpus_docs)
+
+    @property
+    def title(self) -> str:
+        return self.source_doc["title"].rstrip(".").capitalize()
+
+    @property
+    def abstract(self) -> str:
+        return " ".join(sentence.capitalize() for sentence in self.source_doc["sentences"])
+
+    @property
+    def papers(self) -> List[SyntheticPaper]:
+        return [
+            SyntheticPaper(d, doc["title"].rstrip("."), " ".join(s.capitalize() for s in doc["sentences"]))
+            for d, doc in enumerate(self.corpus_docs)
+        ]
+
+class StubEncoder:
+    """
+    A tiny deterministic stand-in for a SentenceTransformer: each text is a normalized bag
+    of hashed words and word pairs. Texts sharing most of their words get high cosine
+    similarity, and encoding costs a fraction of a real model, so benchmarks measure the
+    code around the encoder.
+    """
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        words = text.lower().replace(".", " ").split()
+        for token in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            h = zlib.crc32(token.encode("utf-8"))
+            vector[h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, sentences: Any, batch_size: int = 32, show_progress_bar: Optional[bool] = None,
+               convert_to_numpy: bool = True, convert_to_tensor: bool = False, device: Optional[str] = None,
+               **kwargs) -> Any:
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        embeddings = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for k, sentence in enumerate(sentences):
+            embeddings[k] = self._embed(sentence)
+        if single:
+            embeddings = embeddings[0]
+        if convert_to_tensor:
+            return torch.from_numpy(embeddings).to(device or "cpu")
+        return embeddings
@@ -0,0 +1,161 @@
+# arxiv_common/token_batching.py
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import torch
+from tqdm import tqdm
+
+# Upper bound on sentences per batch, however short they are.
+MAX_BATCH_SIZE = 1024
+# Token lengths are bucketed geometrically: the longest sentence of a bucket is at most
+# this factor longer than the shortest, which bounds the padding of any batch.
+BUCKET_RATIO = 1.25
+
+def _find_attribute(model: Any, name: str):
+    # Encoder backends and executors keep the SentenceTransformer they wrap in `.model`.
+    while model is not None:
+        value = getattr(model, name, None)
+        if value is not None:
+            return value
+        model = getattr(model, 'model', None)
+    return None
+
+def token_lengths(sentences: List[str], tokenizer: Any = None, max_length: Optional[int] = None) -> np.ndarray:
+    """
+    Token count of every sentence, including special tokens and capped at `max_length`.
+    Without a tokenizer (e.g. a stub encoder), words plus two special tokens are counted.
+    """
+    if tokenizer is None:
+        lengths = np.array([len(sentence.split()) + 2 for sentence in sentences], dtype=np.int64)
+    else:
+        input_ids = tokenizer(list(sentences), add_special_tokens=True, truncation=bool(max_length),
+                              max_length=max_length)['input_ids']
+        lengths = np.array([len(ids) for ids in input_ids], dtype=np.int64)
+    return np.minimum(lengths, max_length) if max_length else lengths
+
+def plan_batches(lengths: np.ndarray, token_budget: int, max_batch_size: int = MAX_BATCH_SIZE) -> List[np.ndarray]:
+    """
+    Groups sentences into length buckets and splits each bucket into batches under a token budget.
+
+    Buckets grow geometrically (see BUCKET_RATIO), so a batch never mixes lengths more
+    than that factor apart. Within a bucket, sentences are taken longest first and each
+    batch is sized so that size x its longest sentence stays within `token_budget` (one
+    sentence at least, `max_batch_size` at most): long sentences go in small batches and
+    short ones in large batches.
+
+    Returns:
+        List[np.ndarray]: The input positions of every batch, longest bucket first.
+    """
+    order = np.argsort(-lengths, kind='stable')
+    buckets = np.floor(np.log(np.maximum(lengths[order], 1)) / np.log(BUCKET_RATIO)).astype(np.int64)
+    batches, start = [], 0
+    while start < len(order):
+        longest = max(int(lengths[order[start]]), 1)
+        size = max(1, min(max_batch_size, token_budget // longest))
+        end = min(start + size, len(order))
+        # Stop the batch where the next bucket begins.
+        end = start + int(np.searchsorted(-buckets[start:end], -buckets[start], side='right'))
+        batches.append(order[start:end])
+        start = end
+    return batches
+
+def fixed_batches(sentences: List[str], batch_size: int) -> List[np.ndarray]:
+    """The batches `SentenceTransformer.encode` forms: fixed size, sorted by character length."""
+    order = np.argsort([-len(sentence) for sentence in sentences], kind='stable')
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+def padded_tokens(lengths: np.ndarray, batches: List[np.ndarray]) -> int:
+    """Tokens processed when every batch is padded to its longest sentence."""
+    return int(sum(len(batch) * lengths[batch].max() for batch in batches))
+
+class LengthBucketedEncoder:
+    """
+    Batching layer in front of an encoder (a model, encoder backend or EncodeExecutor).
+
+    Every `encode` call tokenizes its sentences, plans batches with `plan_batches` and
+    sends them to the encoder one batch at a time (through `encode_batches` when the
+    encoder has it, so an EncodeExecutor can spread them over its pool). Extra keyword
+    arguments such as `normalize_embeddings` are passed on with every batch, and the
+    embeddings are returned in input order. Padding is counted for the planned batches
+    and, with `compare_fixed`, for the fixed-size batches the encoder would have formed
+    on its own, for `report`.
+    """
+    def __init__(self, encoder: Any, token_budget: int, max_batch_size: int = MAX_BATCH_SIZE,
+                 compare_fixed: bool = False):
+        self.encoder = encoder
+        self.token_budget = token_budget
+        self.max_batch_size = max_batch_size
+        self.compare_fixed = compare_fixed
+        self.tokenizer = _find_attribute(encoder, 'tokenizer')
+        self.max_seq_length = _find_attribute(encoder, 'max_seq_length')
+        self.real_tokens = 0
+        self.padded_tokens = 0
+        self.fixed_padded_tokens = 0
+        self.fixed_batch_size = None
+        self.num_batches = 0
+        self.last_num_batches = 0
+
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False, convert_to_numpy: bool = True,
+               convert_to_tensor: bool = False, device: Optional[str] = None, **kwargs):
+        if isinstance(sentences, str) or len(sentences) == 0:
+            return self.encoder.encode(sentences, batch_size=batch_size, show_progress_bar=show_progress_bar,
+                                       convert_to_numpy=convert_to_numpy, convert_to_tensor=convert_to_tensor,
+                                       device=device, **kwargs)
+
+        if kwargs.get('output_value', 'sentence_embedding') != 'sentence_embedding':
+            raise ValueError("Length-bucketed batching only returns sentence embeddings.")
+
+        sentences = list(sentences)
+        lengths = token_lengths(sentences, self.tokenizer, self.max_seq_length)
+        batches = plan_batches(lengths, self.token_budget, self.max_batch_size)
+        self.real_tokens += int(lengths.sum())
+        self.padded_tokens += padded_tokens(lengths, batches)
+        if self.compare_fixed:
+            self.fixed_padded_tokens += padded_tokens(lengths, fixed_batches(sentences, batch_size))
+            self.fixed_batch_size = batch_size
+        self.last_num_batches = len(batches)
+        self.num_batches += len(batches)
+
+        texts = [[sentences[k] for k in batch] for batch in batches]
+        if hasattr(self.encoder, 'encode_batches'):
+            encoded = self.encoder.encode_batches(texts, show_progress_bar=show_progress_bar, **kwargs)
+        else:
+            encoded = [
+                np.asarray(self.encoder.encode(batch, batch_size=len(batch), convert_to_numpy=True,
+                                               show_progress_bar=False, **kwargs), dtype=np.float32)
+                for batch in tqdm(texts, desc="Batches", disable=not show_progress_bar)
+            ]
+        embeddings = np.empty((len(sentences), encoded[0].shape[1]), dtype=np.float32)
+        embeddings[np.concatenate(batches)] = np.concatenate(encoded)
+        if convert_to_tensor:
+            return torch.from_numpy(embeddings).to(device or 'cpu')
+        if not convert_to_numpy:
+            # SentenceTransformer returns a list of tensors when neither conversion is asked for.
+            return list(torch.from_numpy(embeddings))
+        return embeddings
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.encoder.get_sentence_embedding_dimension()
+
+    def padding_stats(self) -> Dict[str, float]:
+        """Real and padded token counts so far, for the planned and (with `compare_fixed`) the fixed-size batches."""
+        stats = {
+            "real_tokens": self.real_tokens,
+            "padded_tokens": self.padded_tokens,
+            "padding_waste": 1 - self.real_tokens / max(self.padded_tokens, 1),
+        }
+        if self.compare_fixed:
+            stats["fixed_padded_tokens"] = self.fixed_padded_tokens
+            stats["fixed_padding_waste"] = 1 - self.real_tokens / max(self.fixed_padded_tokens, 1)
+        return stats
+
+    def report(self):
+        if not self.real_tokens:
+            return
+        stats = self.padding_stats()
+        message = (f"Padding waste: {stats['padding_waste']:.1%} of encoded tokens with length-bucketed batches "
+                   f"({self.num_batches} batches, {self.token_budget} token budget)")
+        if self.compare_fixed:
+            message += f", {stats['fixed_padding_waste']:.1%} with fixed batches of {self.fixed_batch_size}"
+        print(message + ".")
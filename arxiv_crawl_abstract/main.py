@@ -3,7 +3,7 @@ import logging
 from keyword_extractor import extract_keywords_from_text
 from arxiv_crawler import crawl_arxiv
 from similarity_analyzer import find_similar_papers
-from utils import read_document, save_results_to_json, extract_title_and_abstract
+from utils import LazyDocument, save_results_to_json
 
 # Configure logging
 logging.basicConfig(
@@ -42,21 +42,26 @@ def main():
         default="similar_papers.json",
         help="Path to the output JSON file."
     )
+    parser.add_argument(
+        "--parse_cache_dir",
+        type=str,
+        default=".parse_cache",
+        help="Directory caching parsed documents by content hash; pass an empty string to disable."
+    )
     args = parser.parse_args()
 
-    # 1. Read the input document
+    # 1-2. Read the input document and extract its title and abstract (cached by file contents)
     logging.info(f"Reading document: {args.document_path}")
-    doc_text = read_document(args.document_path)
-
-    # 2. Extract title and abstract from the document
-    logging.info("Extracting title and abstract...")
-    title, abstract = extract_title_and_abstract(doc_text)
+    # Only the pages up to the end of the abstract are parsed here; the rest is read
+    # when keyword extraction first asks for the full text.
+    document = LazyDocument(args.document_path, cache_dir=args.parse_cache_dir or None)
+    title, abstract = document.title_and_abstract()
     logging.info(f"Extracted Title: {title}")
     logging.info(f"Extracted Abstract: {abstract[:100]}...")
     
     # 3. Extract keywords
     logging.info("Extracting keywords...")
-    keywords = extract_keywords_from_text(doc_text, top_n=args.num_keywords)
+    keywords = extract_keywords_from_text(document.text, top_n=args.num_keywords)
     logging.info(f"Extracted keywords: {', '.join(keywords)}")
 
     # 4. Crawl ArXiv using the extracted title, abstract, and keywords
@@ -65,7 +70,7 @@ def main():
 
     # 5. Find and rank similar papers based on the original document's full text
     logging.info("Analyzing similarity with crawled papers...")
-    similar_papers = find_similar_papers(doc_text, crawled_papers)
+    similar_papers = find_similar_papers(document.text, crawled_papers)
 
     # 6. Save the results to a JSON file
     logging.info(f"Saving results to {args.output_file}")
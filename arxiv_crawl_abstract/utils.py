@@ -1,34 +1,126 @@
 import json
 import pypdf
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from arxiv_common.parse_cache import ParseCache
 
-def read_document(filepath: str) -> str:
+# Bump this whenever read_document or extract_title_and_abstract change behaviour, so
+# entries written by the old heuristics are no longer served.
+PARSER_VERSION = "pypdf-heuristics-1"
+
+# Markers that close the abstract; the title/abstract heuristics never look past them.
+ABSTRACT_END_MARKERS = ["INDEX TERMS", "I. INTRODUCTION"]
+
+def iter_pages(filepath: str) -> Iterator[str]:
     """
-    Reads text from a .txt or .pdf file.
+    Yields the text of a .txt or .pdf file one page at a time.
+
+    A .txt file is yielded as a single page. PDF pages are extracted only when the
+    caller asks for them, so stopping early skips the rest of the document.
 
     Args:
         filepath (str): The path to the document.
 
-    Returns:
-        str: The extracted text content of the document.
+    Yields:
+        str: The text of each page.
     """
     if filepath.lower().endswith('.pdf'):
         try:
             with open(filepath, 'rb') as f:
                 reader = pypdf.PdfReader(f)
-                text = "".join(page.extract_text() for page in reader.pages)
-            return text
+                for page in reader.pages:
+                    yield page.extract_text()
         except Exception as e:
             raise IOError(f"Error reading PDF file: {e}")
     elif filepath.lower().endswith('.txt'):
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
-                return f.read()
+                yield f.read()
         except Exception as e:
             raise IOError(f"Error reading text file: {e}")
     else:
         raise ValueError("Unsupported file type. Please provide a .txt or .pdf file.")
 
+class LazyDocument:
+    """
+    A document whose pages are parsed on demand.
+
+    `title_and_abstract` reads pages only until the abstract is closed by one of the
+    ABSTRACT_END_MARKERS, while `text` reads (and joins) every page the first time it is
+    accessed. Pages already read are reused, so asking for both parses each page once.
+    With a cache directory, results are stored in the parse cache and a later run over
+    the same file contents does not touch the PDF at all.
+    """
+    def __init__(self, filepath: str, cache_dir: Optional[str] = None):
+        self.filepath = filepath
+        self._cache = ParseCache(cache_dir, PARSER_VERSION) if cache_dir else None
+        self._record = (self._cache.get(filepath) if self._cache else None) or {}
+        self._pages: List[str] = []
+        self._page_iter: Optional[Iterator[str]] = None
+        self._exhausted = False
+
+    @property
+    def pages_read(self) -> int:
+        """Number of pages parsed so far."""
+        return len(self._pages)
+
+    def iter_pages(self) -> Iterator[str]:
+        """
+        Yields the pages, parsing each one the first time it is reached. Cached text is
+        yielded as a single page, and the joined text is cached once every page is read.
+        """
+        if "text" in self._record:
+            yield self._record["text"]
+            return
+        yield from self._pages
+        if self._page_iter is None:
+            self._page_iter = iter_pages(self.filepath)
+        while not self._exhausted:
+            try:
+                page = next(self._page_iter)
+            except StopIteration:
+                self._exhausted = True
+                self._store(text="".join(self._pages))
+                return
+            self._pages.append(page)
+            yield page
+
+    def title_and_abstract(self) -> Tuple[str, str]:
+        """Extracts the title and abstract, reading no further than the end of the abstract."""
+        if "title" not in self._record:
+            if "text" in self._record:
+                title, abstract = extract_title_and_abstract(self._record["text"])
+            else:
+                title, abstract = extract_title_and_abstract_from_pages(self.iter_pages())
+            self._store(title=title, abstract=abstract)
+        return self._record["title"], self._record["abstract"]
+
+    @property
+    def text(self) -> str:
+        """The full text of the document, parsed on first access."""
+        if "text" not in self._record:
+            for _ in self.iter_pages():
+                pass
+        return self._record["text"]
+
+    def _store(self, **fields):
+        self._record.update(fields)
+        if self._cache:
+            self._cache.put(self.filepath, self._record)
+
+def read_document(filepath: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Reads text from a .txt or .pdf file.
+
+    Args:
+        filepath (str): The path to the document.
+        cache_dir (Optional[str]): Directory of the parse cache. When given, a file whose
+            contents were read before is served from the cache instead of being re-parsed.
+
+    Returns:
+        str: The extracted text content of the document.
+    """
+    return LazyDocument(filepath, cache_dir).text
+
 def extract_title_and_abstract(doc_text: str) -> Tuple[str, str]:
     """
     Extracts the title and abstract from the document text using heuristics.
@@ -52,13 +144,40 @@ def extract_title_and_abstract(doc_text: str) -> Tuple[str, str]:
         abstract_start_index = doc_text.upper().index("ABSTRACT")
         # Find the end of the abstract (e.g., start of "INDEX TERMS" or "I. INTRODUCTION")
         text_after_abstract = doc_text[abstract_start_index:]
-        end_markers = ["INDEX TERMS", "I. INTRODUCTION"]
-        end_index = min([text_after_abstract.upper().find(marker) for marker in end_markers if text_after_abstract.upper().find(marker) != -1] or [len(text_after_abstract)])
+        end_index = min([text_after_abstract.upper().find(marker) for marker in ABSTRACT_END_MARKERS if text_after_abstract.upper().find(marker) != -1] or [len(text_after_abstract)])
         abstract = text_after_abstract[len("ABSTRACT"):end_index].strip()
     except ValueError:
         abstract = "" # Could not find the abstract
     return title, abstract
 
+def extract_title_and_abstract_from_pages(pages: Iterable[str]) -> Tuple[str, str]:
+    """
+    Extracts the title and abstract from a stream of pages, stopping once the abstract ends.
+
+    The result is the same as running `extract_title_and_abstract` on the joined text of
+    all pages; pages after the one that closes the abstract are never consumed.
+
+    Args:
+        pages (Iterable[str]): The text of each page, in order.
+
+    Returns:
+        Tuple[str, str]: A tuple containing the extracted title and abstract.
+    """
+    longest_marker = max(len(marker) for marker in ABSTRACT_END_MARKERS)
+    text = ""
+    for page in pages:
+        text += page
+        start = text.upper().find("ABSTRACT")
+        if start == -1:
+            continue
+        upper_after = text[start:].upper()
+        found = [upper_after.find(marker) for marker in ABSTRACT_END_MARKERS if upper_after.find(marker) != -1]
+        # A marker found this early cannot be preceded by another one that straddles
+        # the boundary with the next page, so the remaining pages cannot change the result.
+        if found and start + min(found) + longest_marker <= len(text):
+            break
+    return extract_title_and_abstract(text)
+
 def save_results_to_json(papers: List[Dict[str, Any]], output_path: str = "similar_papers.json"):
     """
     Saves the list of similar papers to a JSON file.
@@ -1,38 +1,30 @@
 import arxiv
-import time
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Optional
+from arxiv_common.query_planner import QueryPlanner, SubQuery
 
-def crawl_arxiv_by_keywords(keywords: List[str], max_results_per_keyword: int = 10) -> List[Dict[str, Any]]:
+def crawl_arxiv_by_keywords(keywords: List[str], max_results_per_keyword: int = 10,
+                            planner: Optional[QueryPlanner] = None) -> List[Dict[str, Any]]:
     """
     Crawls ArXiv for papers matching a list of keywords and returns their metadata.
 
     Args:
         keywords (List[str]): A list of keywords to search for.
         max_results_per_keyword (int): The maximum number of papers to fetch for each keyword.
+        planner (Optional[QueryPlanner]): A planner to share across several crawls, so
+            keywords already searched in this batch are not searched again.
 
     Returns:
         List[Dict[str, Any]]: A list of unique papers found.
     """
     print(f"Crawling ArXiv for keywords: {', '.join(keywords)}...")
-    
-    all_papers = []
-    seen_ids: Set[str] = set()
 
-    for keyword in keywords:
-        search = arxiv.Search(
-            query=keyword,
-            max_results=max_results_per_keyword,
-            sort_by=arxiv.SortCriterion.Relevance
-        )
-
-        for result in search.results():
-            arxiv_id = result.entry_id.split('/')[-1]
-            if arxiv_id not in seen_ids:
-                all_papers.append(result)
-                seen_ids.add(arxiv_id)
-        
-        # ArXiv API guidelines recommend a 3-second delay between requests
-        time.sleep(3)
+    # The keywords are searched in titles and abstracts and packed into as few requests as
+    # the URL length allows; the planner attributes the results back to each keyword.
+    planner = planner or QueryPlanner()
+    sub_queries = [SubQuery(keyword, ("ti", "abs"), max_results_per_keyword) for keyword in keywords]
+    all_papers, results_per_keyword = planner.run(sub_queries)
 
+    for keyword, results in zip(keywords, results_per_keyword):
+        print(f"  '{keyword}': {len(results)} papers")
     print(f"Found {len(all_papers)} unique papers from ArXiv.")
     return all_papers
\ No newline at end of file
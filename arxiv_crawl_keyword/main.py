@@ -3,6 +3,8 @@ from keyword_extractor import extract_keywords_from_text
 from arxiv_crawler import crawl_arxiv_by_keywords
 from similarity_analyzer import find_similar_papers
 from utils import read_document, save_results_to_json
+from arxiv_common.async_fetcher import set_default_http_cache
+from arxiv_common.http_cache import http_cache_from_config
 
 def main():
     """
@@ -41,11 +43,31 @@ def main():
         default="similar_papers.json",
         help="Path to the output JSON file."
     )
+    parser.add_argument(
+        "--parse_cache_dir",
+        type=str,
+        default=".parse_cache",
+        help="Directory caching parsed documents by content hash; pass an empty string to disable."
+    )
+    parser.add_argument(
+        "--http_cache_dir",
+        type=str,
+        default=".http_cache",
+        help="Directory caching ArXiv API responses for a day; pass an empty string to disable."
+    )
+    parser.add_argument(
+        "--http_fixture_dir",
+        type=str,
+        default=None,
+        help="Replay recorded ArXiv responses from this directory without network access."
+    )
     args = parser.parse_args()
+    http_cache = http_cache_from_config(vars(args))
+    set_default_http_cache(http_cache)
 
     # 1. Read the input document
     print(f"Reading document: {args.document_path}")
-    doc_text = read_document(args.document_path)
+    doc_text = read_document(args.document_path, cache_dir=args.parse_cache_dir or None)
 
     # 2. Extract keywords
     print("Extracting keywords...")
@@ -63,6 +85,8 @@ def main():
 
     # 5. Save the results to a JSON file
     save_results_to_json(similar_papers, args.output_file)
+    if http_cache is not None:
+        http_cache.report()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,17 +1,13 @@
 import json
 import pypdf
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from arxiv_common.parse_cache import ParseCache
 
-def read_document(filepath: str) -> str:
-    """
-    Reads text from a .txt or .pdf file.
-
-    Args:
-        filepath (str): The path to the document.
+# Bump this whenever read_document changes behaviour, so
+# entries written by the old heuristics are no longer served.
+PARSER_VERSION = "pypdf-1"
 
-    Returns:
-        str: The extracted text content of the document.
-    """
+def _extract_document_text(filepath: str) -> str:
     if filepath.lower().endswith('.pdf'):
         try:
             with open(filepath, 'rb') as f:
@@ -29,6 +25,27 @@ def read_document(filepath: str) -> str:
     else:
         raise ValueError("Unsupported file type. Please provide a .txt or .pdf file.")
 
+def read_document(filepath: str, cache_dir: Optional[str] = None) -> str:
+    """
+    Reads text from a .txt or .pdf file.
+
+    Args:
+        filepath (str): The path to the document.
+        cache_dir (Optional[str]): Directory of the parse cache. When given, a file whose
+            contents were read before is served from the cache instead of being re-parsed.
+
+    Returns:
+        str: The extracted text content of the document.
+    """
+    cache = ParseCache(cache_dir, PARSER_VERSION) if cache_dir else None
+    record = cache.get(filepath) if cache else None
+    if record is not None:
+        return record["text"]
+    text = _extract_document_text(filepath)
+    if cache:
+        cache.put(filepath, {"text": text})
+    return text
+
 def save_results_to_json(papers: List[Dict[str, Any]], output_path: str = "similar_papers.json"):
     """
     Saves the list of similar papers to a JSON file.
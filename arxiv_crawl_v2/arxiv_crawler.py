@@ -1,8 +1,18 @@
 import arxiv
-import time
-from typing import List, Dict, Any, Set
+import math
+from typing import List, Dict, Any, Optional, Set
+from arxiv_common.metadata_store import MetadataStore, search_with_store
+from arxiv_common.query_planner import QueryPlan, QueryPlanner, SubQuery
 
-def crawl_arxiv(title: str, abstract: str, keywords: List[str], max_results: int = 20) -> List[Dict[str, Any]]:
+def crawl_arxiv(
+    title: str,
+    abstract: str,
+    keywords: List[str],
+    max_results: int = 20,
+    store: Optional[MetadataStore] = None,
+    offline: bool = False,
+    planner: Optional[QueryPlanner] = None,
+) -> List[Dict[str, Any]]:
     """
     Crawls ArXiv for papers using a combined query of title, abstract, and keywords.
 
@@ -11,6 +21,11 @@ def crawl_arxiv(title: str, abstract: str, keywords: List[str], max_results: int
         abstract (str): The abstract of the paper.
         keywords (List[str]): A list of keywords from the paper.
         max_results (int): The maximum number of papers to fetch.
+        store (Optional[MetadataStore]): Local metadata store. When given, the query is
+            answered locally and only papers updated since the last sync are fetched.
+        offline (bool): Answer from the local store without touching the network.
+        planner (Optional[QueryPlanner]): A planner to share across several crawls, so
+            sub-queries already searched in this batch are not searched again.
 
     Returns:
         List[Dict[str, Any]]: A list of unique papers found.
@@ -18,21 +33,28 @@ def crawl_arxiv(title: str, abstract: str, keywords: List[str], max_results: int
     # Build a powerful query. Search the title for an exact match, and search the abstract
     # for the extracted keywords to find related papers.
     # The `ti:` prefix searches the title, `abs:` searches the abstract.
-    keyword_query = " OR ".join([f'"{k}"' for k in keywords])
-    query = f'(ti:"{title}") OR (abs:({keyword_query}))'
+    phrases = [(title, ("ti",))] + [(keyword, ("abs",)) for keyword in keywords]
+    phrases = [(phrase, fields) for phrase, fields in phrases if phrase.strip()]
+    per_phrase = math.ceil(max_results / max(len(phrases), 1))
+    sub_queries = [SubQuery(phrase, fields, per_phrase) for phrase, fields in phrases]
+    query = QueryPlan(sub_queries).query
     
     print(f"Crawling ArXiv with query: {query}...")
     
     all_papers = []
     seen_ids: Set[str] = set()
 
-    search = arxiv.Search(
-        query=query,
-        max_results=max_results,
-        sort_by=arxiv.SortCriterion.Relevance
-    )
+    if store is not None:
+        results = search_with_store(store, query, max_results, offline=offline)
+    elif offline:
+        raise ValueError("Offline mode requires a local metadata store ('metadata_store_path').")
+    else:
+        # The planner sends the query as one request when it fits in the URL and splits it
+        # otherwise; each request asks for its share of max_results. Only the union is
+        # used, so the results are not attributed back to each phrase.
+        results = (planner or QueryPlanner()).search(sub_queries)[:max_results]
 
-    for result in search.results():
+    for result in results:
         arxiv_id = result.entry_id.split('/')[-1]
         if arxiv_id not in seen_ids:
             all_papers.append(result)
@@ -0,0 +1,118 @@
+import argparse
+import difflib
+import json
+import multiprocessing
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from arxiv_common.pdf_backends import available_backends, get_backend
+from utils import extract_title_and_abstract, extract_title_and_abstract_from_pages
+
+BUNDLED_PDFS = ["2502.02587v1.pdf", "2512.04062v1.pdf", "my_proposal.pdf"]
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    return peak / (1024 * 1024) if os.uname().sysname == 'Darwin' else peak / 1024
+
+def _measure(backend_name: str, pdf_path: str, repeat: int) -> Dict[str, Any]:
+    """Runs in a fresh process so that peak RSS reflects a single backend and document."""
+    backend = get_backend(backend_name)
+    baseline_rss = _peak_rss_mb()
+
+    full_seconds, pages = float('inf'), []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = list(backend.iter_pages(pdf_path))
+        full_seconds = min(full_seconds, time.perf_counter() - start)
+    title, abstract = extract_title_and_abstract("".join(pages))
+
+    # Title/abstract only, stopping at the end of the abstract as main.py does.
+    early_seconds, early_pages = float('inf'), 0
+    for _ in range(repeat):
+        consumed = []
+        def counted():
+            for page in backend.iter_pages(pdf_path):
+                consumed.append(page)
+                yield page
+        start = time.perf_counter()
+        extract_title_and_abstract_from_pages(counted())
+        early_seconds = min(early_seconds, time.perf_counter() - start)
+        early_pages = len(consumed)
+
+    return {
+        "backend": backend_name,
+        "pdf": os.path.basename(pdf_path),
+        "pages": len(pages),
+        "full_seconds": full_seconds,
+        "pages_per_sec": len(pages) / max(full_seconds, 1e-9),
+        "title_abstract_seconds": early_seconds,
+        "title_abstract_pages": early_pages,
+        "chars": sum(len(page) for page in pages),
+        "peak_rss_mb": _peak_rss_mb(),
+        "parse_rss_mb": _peak_rss_mb() - baseline_rss,
+        "title": title,
+        "abstract": abstract,
+    }
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+def _agreement(result: Dict[str, Any], reference: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title_match": _normalize(result["title"]) == _normalize(reference["title"]),
+        "abstract_similarity": difflib.SequenceMatcher(
+            None, _normalize(result["abstract"]), _normalize(reference["abstract"])).ratio(),
+        "abstract_found": bool(result["abstract"].strip()),
+    }
+
+def run_benchmark(pdf_paths: List[str], backends: List[str], reference: str, repeat: int) -> List[Dict[str, Any]]:
+    """
+    Measures every backend on every PDF and compares the extracted title and abstract
+    against the reference backend.
+
+    Returns:
+        One result dictionary per (backend, PDF) pair.
+    """
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for pdf_path in pdf_paths:
+        by_backend = {}
+        for backend_name in backends:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                by_backend[backend_name] = pool.submit(_measure, backend_name, pdf_path, repeat).result()
+        for backend_name, result in by_backend.items():
+            result.update(_agreement(result, by_backend.get(reference, result)))
+            results.append(result)
+    return results
+
+def print_results(results: List[Dict[str, Any]], reference: str):
+    print(f"{'pdf':<20} {'backend':<8} {'pages':>5} {'pages/s':>8} {'t/a s':>7} {'t/a pg':>6} "
+          f"{'peak MB':>8} {'parse MB':>8} {'title':>6} {'abs sim':>7}")
+    for r in results:
+        print(f"{r['pdf'][:20]:<20} {r['backend']:<8} {r['pages']:>5} {r['pages_per_sec']:>8.1f} "
+              f"{r['title_abstract_seconds']:>7.3f} {r['title_abstract_pages']:>6} {r['peak_rss_mb']:>8.1f} "
+              f"{r['parse_rss_mb']:>8.1f} {'yes' if r['title_match'] else 'NO':>6} {r['abstract_similarity']:>7.2f}")
+    print(f"Title and abstract agreement is measured against the '{reference}' backend.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the registered PDF backends on speed, memory and extraction agreement.")
+    parser.add_argument("pdfs", nargs="*", help="PDFs to parse; defaults to the PDFs bundled next to this script.")
+    parser.add_argument("--backends", nargs="+", default=None, help="Backends to compare; defaults to every installed backend.")
+    parser.add_argument("--reference", default="pypdf", help="Backend whose title/abstract the others are compared to.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions; the fastest run is reported.")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    pdfs = args.pdfs or [os.path.join(script_dir, name) for name in BUNDLED_PDFS]
+    backends = args.backends or [name for name, installed in available_backends().items() if installed]
+    results = run_benchmark(pdfs, backends, args.reference, args.repeat)
+    print_results(results, args.reference)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4, ensure_ascii=False)
+        print(f"Results saved to {args.json_path}")
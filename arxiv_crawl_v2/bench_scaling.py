@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import tempfile
+from typing import Any, Dict
+
+from arxiv_common.benchmarking import compare, git_commit, print_runs
+from arxiv_common.profiling import RunProfiler
+from arxiv_common.synthetic import StubEncoder, SyntheticCorpus
+from model_registry import get_model, register_model
+from report_generator import generate_pdf_report
+from similarity_analyzer import find_similar_papers
+
+def bench_size(num_sentences: int, args: argparse.Namespace, model_name: str, output_dir: str) -> Dict[str, Any]:
+    """
+    Times `find_similar_papers` and `generate_pdf_report` on a synthetic corpus holding
+    `num_sentences` abstract sentences.
+
+    Returns:
+        The run profile of this size.
+    """
+    num_papers = max(1, num_sentences // args.sentences_per_paper)
+    profiler = RunProfiler(f"scaling {num_sentences} sentences")
+    with profiler.stage("build_corpus") as stage:
+        corpus = SyntheticCorpus(num_papers, args.sentences_per_paper, source_sentences=10, seed=args.seed)
+        stage.count(papers=num_papers, sentences=num_papers * args.sentences_per_paper)
+
+    with profiler.stage("find_similar_papers") as stage:
+        similar_papers = find_similar_papers(corpus.title, corpus.abstract, corpus.papers, model_name)
+        stage.count(papers=len(similar_papers))
+
+    # main.py only reports the papers above min_similarity; the top ones stand in for them.
+    with profiler.stage("generate_pdf_report") as stage:
+        report_papers = similar_papers[:args.report_papers]
+        generate_pdf_report(corpus.title, corpus.abstract, report_papers,
+                            os.path.join(output_dir, "report.pdf"), model_name)
+        stage.count(papers=len(report_papers))
+
+    profile = profiler.to_dict()
+    profile["sentences"] = num_sentences
+    return profile
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scaling benchmark of paper ranking and report generation on synthetic corpora.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000], help="Corpus sizes in abstract sentences.")
+    parser.add_argument("--sentences_per_paper", type=int, default=10, help="Sentences per synthetic abstract.")
+    parser.add_argument("--report_papers", type=int, default=50, help="Top-ranked papers passed to the PDF report.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default=None, help="Benchmark this sentence-transformer instead of the stub encoder.")
+    parser.add_argument("--output", default="bench_scaling.json", help="Path of the JSON results.")
+    parser.add_argument("--baseline", default=None, help="Earlier results file to compare against.")
+    args = parser.parse_args()
+
+    if args.model:
+        model_name = args.model
+        get_model(model_name)  # Load up front so model loading is not timed as ranking.
+    else:
+        model_name = "stub"
+        register_model(model_name, StubEncoder())
+
+    results = {
+        "benchmark": "bench_scaling",
+        "commit": git_commit(os.path.dirname(os.path.abspath(__file__))),
+        "encoder": model_name,
+        "settings": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory() as output_dir:
+        for num_sentences in args.sizes:
+            print(f"\n=== {num_sentences} abstract sentences ===")
+            results["runs"].append(bench_size(num_sentences, args, model_name, output_dir))
+
+    print_runs(results)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4)
+    print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            compare(results, json.load(f))
@@ -0,0 +1,51 @@
+import threading
+from typing import Any, Dict, Optional
+
+from arxiv_common.encode_executor import EncodeExecutor, parallelism_from_config
+from model_registry import get_model
+
+# Process-wide settings and one executor per model, shared like the models themselves.
+_settings: Dict[str, Optional[int]] = {"workers": 1, "threads": None}
+_executors: Dict[str, EncodeExecutor] = {}
+_lock = threading.Lock()
+
+def configure(workers: Optional[int] = 1, threads: Optional[int] = None):
+    """
+    Sets the encode parallelism for executors created after this call.
+
+    Args:
+        workers (Optional[int]): Worker processes; 1 encodes in-process, None picks one per
+            core group.
+        threads (Optional[int]): torch threads per worker; None uses the physical cores of
+            the worker's core group (in-process: leaves torch's thread count alone).
+    """
+    with _lock:
+        _settings.update(workers=workers, threads=threads)
+
+def configure_from_config(config: Dict[str, Any]):
+    """Applies `encode_workers` / `encode_threads` (see `parallelism_from_config`)."""
+    configure(*parallelism_from_config(config))
+
+def get_executor(model_name: str) -> EncodeExecutor:
+    """
+    Returns the shared EncodeExecutor for the registry model `model_name`.
+
+    Args:
+        model_name (str): The name of the sentence-transformer model.
+
+    Returns:
+        EncodeExecutor: An executor wrapping the model loaded by `model_registry.get_model`.
+    """
+    model = get_model(model_name)
+    with _lock:
+        if model_name not in _executors:
+            device = str(getattr(model, 'device', 'cpu'))
+            _executors[model_name] = EncodeExecutor(model, _settings["workers"], _settings["threads"], device)
+            print(f"Encoding with '{model_name}': {_executors[model_name].describe()}")
+        return _executors[model_name]
+
+def close_executors():
+    """Shuts down the worker pools of every executor created in this process."""
+    with _lock:
+        for executor in _executors.values():
+            executor.close()
@@ -1,21 +1,194 @@
+import argparse
+import heapq
+import json
+import re
 from keybert import KeyBERT
-from typing import List
+from keybert.backend import BaseEmbedder
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+from token_batching import get_encoder
 
-def extract_keywords_from_text(text: str, top_n: int = 10) -> List[str]:
+class _SharedModelBackend(BaseEmbedder):
+    """KeyBERT embedding backend that encodes with a shared registry model (through its encode executor and token batching) in large batches."""
+    def __init__(self, model: Any, batch_size: int):
+        super().__init__()
+        self.model = model
+        self.batch_size = batch_size
+
+    def embed(self, documents: List[str], verbose: bool = False):
+        return self.model.encode(list(documents), batch_size=self.batch_size,
+                                 show_progress_bar=verbose, convert_to_numpy=True)
+
+class KeywordExtractor:
+    """
+    Keeps one KeyBERT model resident and extracts keywords for many documents at once.
+
+    Documents are processed in groups of `docs_per_batch`. For each group, KeyBERT builds
+    a single candidate n-gram vocabulary and embeds it once, in encode batches of
+    `batch_size`, so n-grams shared between documents are only embedded once. The group
+    size bounds the vocabulary (and memory) of a single step.
+    """
+    def __init__(self, model_name: str = 'all-MiniLM-L6-v2', batch_size: int = 256, docs_per_batch: int = 64,
+                 keyphrase_ngram_range: Tuple[int, int] = (1, 2), stop_words: str = 'english'):
+        self.model_name = model_name
+        self.docs_per_batch = docs_per_batch
+        self.keyphrase_ngram_range = keyphrase_ngram_range
+        self.stop_words = stop_words
+        self.kw_model = KeyBERT(model=_SharedModelBackend(get_encoder(model_name), batch_size))
+
+    def _extract_scored(self, group: List[str], top_n: int) -> List[List[Tuple[str, float]]]:
+        keywords = self.kw_model.extract_keywords(
+            group, keyphrase_ngram_range=self.keyphrase_ngram_range, stop_words=self.stop_words, top_n=top_n
+        )
+        # KeyBERT returns [] when no document in the group has a candidate, and unwraps
+        # the result when the group holds a single document.
+        if not keywords:
+            return [[] for _ in group]
+        if len(group) == 1:
+            return [keywords]
+        return keywords
+
+    def extract(self, texts: List[str], top_n: int = 10) -> List[List[str]]:
+        """
+        Extracts key phrases from each document.
+
+        Args:
+            texts (List[str]): The documents' texts.
+            top_n (int): The number of top keywords to extract per document.
+
+        Returns:
+            List[List[str]]: The most relevant keywords of each document, in input order.
+        """
+        results = []
+        for start in range(0, len(texts), self.docs_per_batch):
+            group = texts[start:start + self.docs_per_batch]
+            # Return only the keyword text, not the similarity score
+            results.extend([keyword for keyword, _ in doc_keywords] for doc_keywords in self._extract_scored(group, top_n))
+        return results
+
+    def extract_chunked(self, text: Union[str, Iterable[str]], top_n: int = 10, chunk_words: int = 150) -> List[str]:
+        """
+        Extracts key phrases from a long document chunk by chunk.
+
+        The document is split into chunks of about `chunk_words` words, so every chunk fits
+        within the model's sequence length instead of being truncated after the first few
+        hundred tokens. Chunks are streamed through KeyBERT `docs_per_batch` at a time and
+        each keyphrase keeps the best score it reached in any chunk. The running top-`top_n`
+        is kept in a bounded heap, so memory does not grow with the document's length.
+
+        Args:
+            text (Union[str, Iterable[str]]): The document text, or an iterable of its pages.
+            top_n (int): The number of top keywords to extract.
+            chunk_words (int): Target chunk length in words.
+
+        Returns:
+            List[str]: The most relevant keywords, best first.
+        """
+        pieces = [text] if isinstance(text, str) else text
+        heap: List[Tuple[float, str]] = []
+        best: Dict[str, float] = {}
+        group: List[str] = []
+
+        def merge(chunks: List[str]):
+            # A keyphrase that ends up in the overall top-n is also in the top-n of the chunk
+            # where it scores best, so asking each chunk for `top_n` keyphrases is exact.
+            for chunk_keywords in self._extract_scored(chunks, top_n):
+                for keyword, score in chunk_keywords:
+                    if keyword in best:
+                        if score > best[keyword]:
+                            best[keyword] = score
+                            heap[:] = [(best[k], k) for _, k in heap]
+                            heapq.heapify(heap)
+                    elif len(heap) < top_n:
+                        best[keyword] = score
+                        heapq.heappush(heap, (score, keyword))
+                    elif score > heap[0][0]:
+                        _, evicted = heapq.heapreplace(heap, (score, keyword))
+                        del best[evicted]
+                        best[keyword] = score
+
+        for chunk in iter_chunks(pieces, chunk_words):
+            group.append(chunk)
+            if len(group) == self.docs_per_batch:
+                merge(group)
+                group = []
+        if group:
+            merge(group)
+        return [keyword for _, keyword in sorted(heap, reverse=True)]
+
+def iter_chunks(pieces: Iterable[str], chunk_words: int = 150) -> Iterator[str]:
+    """
+    Splits a stream of text (e.g. PDF pages) into chunks of at most `chunk_words` words.
+
+    Paragraphs (separated by blank lines) are packed into a chunk while they fit; a
+    paragraph longer than a chunk is cut into word windows. Text carries over between
+    pieces, so a paragraph that spans a page break stays together.
+    """
+    current: List[str] = []
+    for piece in pieces:
+        for paragraph in re.split(r'\n\s*\n', piece):
+            words = paragraph.split()
+            if current and len(current) + len(words) > chunk_words:
+                yield " ".join(current)
+                current = []
+            while len(words) > chunk_words:
+                yield " ".join(words[:chunk_words])
+                words = words[chunk_words:]
+            current.extend(words)
+    if current:
+        yield " ".join(current)
+
+_extractors: Dict[str, KeywordExtractor] = {}
+
+def get_keyword_extractor(model_name: str = 'all-MiniLM-L6-v2') -> KeywordExtractor:
+    """Returns the process-wide KeywordExtractor for `model_name`, creating it on first use."""
+    if model_name not in _extractors:
+        _extractors[model_name] = KeywordExtractor(model_name)
+    return _extractors[model_name]
+
+def extract_keywords_batch(texts: List[str], top_n: int = 10, model_name: str = 'all-MiniLM-L6-v2') -> List[List[str]]:
+    """Extracts the `top_n` keywords of every document in `texts` with one resident model."""
+    return get_keyword_extractor(model_name).extract(texts, top_n)
+
+def extract_keywords_from_text(text: Union[str, Iterable[str]], top_n: int = 10, model_name: str = 'all-MiniLM-L6-v2',
+                               mode: str = 'full', chunk_words: int = 150) -> List[str]:
     """
     Extracts key phrases from the given text using the KeyBERT model.
 
     Args:
-        text (str): The input text from the document.
+        text (Union[str, Iterable[str]]): The input text from the document; in 'chunked'
+            mode this can also be an iterable of pages.
         top_n (int): The number of top keywords to extract.
+        model_name (str): The sentence-transformer model KeyBERT embeds with.
+        mode (str): 'full' embeds the whole text at once (truncated by the model);
+            'chunked' scores it chunk by chunk so the whole document is used.
+        chunk_words (int): Chunk length in words for 'chunked' mode.
 
     Returns:
         List[str]: A list of the most relevant keywords.
     """
-    # KeyBERT uses sentence-transformers to find the most representative keywords
-    kw_model = KeyBERT()
+    # KeyBERT uses sentence-transformers to find the most representative keywords.
     # We look for keyphrases of 1 or 2 words, ignoring common English stop words.
-    keywords = kw_model.extract_keywords(text, keyphrase_ngram_range=(1, 2), stop_words='english', top_n=top_n)
-    
-    # Return only the keyword text, not the similarity score
-    return [keyword for keyword, _ in keywords]
\ No newline at end of file
+    if mode == 'chunked':
+        return get_keyword_extractor(model_name).extract_chunked(text, top_n, chunk_words)
+    if mode != 'full':
+        raise ValueError(f"Unknown keyword mode '{mode}'. Use 'full' or 'chunked'.")
+    if not isinstance(text, str):
+        text = "".join(text)
+    return extract_keywords_batch([text], top_n, model_name)[0]
+
+if __name__ == "__main__":
+    from utils import LazyDocument
+
+    parser = argparse.ArgumentParser(description="Extract keywords from many documents with one resident model.")
+    parser.add_argument("documents", nargs="+", help="Input documents (.txt or .pdf).")
+    parser.add_argument("--top_n", type=int, default=5, help="Number of keywords per document.")
+    parser.add_argument("--model", default='all-MiniLM-L6-v2', help="Sentence-transformer model used by KeyBERT.")
+    parser.add_argument("--parse_cache_dir", default=".parse_cache", help="Parse cache directory; pass an empty string to disable.")
+    parser.add_argument("--output", default="keywords.json", help="Path of the output JSON file.")
+    args = parser.parse_args()
+
+    texts = [LazyDocument(path, cache_dir=args.parse_cache_dir or None).text for path in args.documents]
+    all_keywords = extract_keywords_batch(texts, top_n=args.top_n, model_name=args.model)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(dict(zip(args.documents, all_keywords)), f, indent=4, ensure_ascii=False)
+    print(f"Keywords for {len(texts)} documents saved to {args.output}")
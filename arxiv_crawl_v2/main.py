@@ -1,11 +1,21 @@
 import argparse
+import os
 import yaml
 from keyword_extractor import extract_keywords_from_text
 from arxiv_crawler import crawl_arxiv
-from similarity_analyzer import find_similar_papers
+from arxiv_common.metadata_store import MetadataStore
+import numpy as np
+from similarity_analyzer import paper_similarities, rank_papers
 from local_llm_corrector import correct_text_with_local_llm
-from utils import read_document, save_results_to_json, extract_title_and_abstract
-from report_generator import generate_pdf_report
+from utils import LazyDocument, save_results_to_json
+from report_generator import abstract_sentence_similarities, generate_pdf_report
+from rescore import save_artifacts
+from model_registry import get_model_stats, report_model_stats
+from encode_executor import close_executors, configure_from_config
+from token_batching import configure as configure_token_batching, report_padding
+from arxiv_common.profiling import RunProfiler
+from arxiv_common.async_fetcher import set_default_http_cache
+from arxiv_common.http_cache import http_cache_from_config
 
 def main():
     """
@@ -26,49 +36,116 @@ def main():
     max_papers = config["max_papers"]
     min_similarity = config["min_similarity"]
     similarity_model = config["similarity_model"]
+    keyword_model = config.get("keyword_model", "all-MiniLM-L6-v2")
     llm_model = config.get("llm_model") # Use .get() for optional keys
     ollama_url = config.get("ollama_url")
     title_weight = config["title_weight"]
     abstract_weight = config["abstract_weight"]
     output_pdf_path = output_json_path.replace('.json', '_report.pdf')
+    http_cache = http_cache_from_config(config)
+    set_default_http_cache(http_cache)
+    configure_from_config(config)
+    configure_token_batching(config.get("encode_token_budget"), config.get("encode_padding_profile", False))
 
-    # 1. Read the input document
-    print(f"Reading document: {doc_path}")
-    doc_text = read_document(doc_path)
+    profiler = RunProfiler("arxiv_crawl_v2")
+    profiler.annotate(similarity_model=similarity_model, keyword_model=keyword_model, pdf_backend=config.get("pdf_backend", "pypdf"))
 
-    # 2. Extract title and abstract from the document
-    print("Extracting title and abstract...")
-    title, abstract = extract_title_and_abstract(doc_text)
+    # 1-2. Read the input document and extract its title and abstract (cached by file contents)
+    print(f"Reading document: {doc_path}")
+    with profiler.stage("read_and_extract") as stage:
+        # Only the pages up to the end of the abstract are parsed here; the rest is read
+        # when keyword extraction first asks for the full text.
+        document = LazyDocument(doc_path, cache_dir=config.get("parse_cache_dir"), backend=config.get("pdf_backend", "pypdf"))
+        title, abstract = document.title_and_abstract()
+        stage.count(pages=document.pages_read)
     
     # Optionally correct the extracted title using the local LLM
     if llm_model and ollama_url:
         print(f"Extracted Title (raw): {title}")
-        title = correct_text_with_local_llm(title, llm_model, ollama_url)
+        with profiler.stage("llm_title_correction"):
+            title = correct_text_with_local_llm(title, llm_model, ollama_url)
         print(f"Corrected Title: {title}")
     else:
         print(f"Extracted Title: {title}")
 
     # 3. Extract keywords
     print("Extracting keywords...")
-    keywords = extract_keywords_from_text(doc_text, top_n=num_keywords)
+    with profiler.stage("keywords") as stage:
+        pages_before = document.pages_read
+        if config.get("keyword_mode", "full") == "chunked":
+            # Pages are streamed into fixed-size chunks, so text past the model's sequence
+            # length still contributes keywords.
+            keywords = extract_keywords_from_text(
+                document.iter_pages(), top_n=num_keywords, model_name=keyword_model,
+                mode="chunked", chunk_words=config.get("keyword_chunk_words", 150)
+            )
+        else:
+            keywords = extract_keywords_from_text(document.text, top_n=num_keywords, model_name=keyword_model)
+        stage.count(pages=document.pages_read - pages_before, keywords=len(keywords))
     print(f"Extracted keywords: {', '.join(keywords)}")
 
     # 4. Crawl ArXiv using the extracted title, abstract, and keywords
-    crawled_papers = crawl_arxiv(title, abstract, keywords, max_results=max_papers)
+    with profiler.stage("crawl") as stage:
+        store = MetadataStore(config["metadata_store_path"]) if config.get("metadata_store_path") else None
+        crawled_papers = crawl_arxiv(
+            title, abstract, keywords, max_results=max_papers,
+            store=store, offline=config.get("offline_mode", False)
+        )
+        stage.count(papers=len(crawled_papers))
 
     # 5. Find and rank similar papers using a weighted comparison of title and abstract
-    similar_papers = find_similar_papers(title, abstract, crawled_papers, similarity_model, title_weight, abstract_weight)
+    with profiler.stage("similarity") as stage:
+        if crawled_papers:
+            title_similarities, abstract_similarities = paper_similarities(title, abstract, crawled_papers, similarity_model)
+        else:
+            title_similarities, abstract_similarities = np.zeros(0), np.zeros(0)
+        similar_papers = rank_papers(crawled_papers, title_similarities, abstract_similarities, title_weight, abstract_weight)
+        stage.count(papers=len(similar_papers))
+
+    # Save the similarities and paper metadata so `rescore.py` can re-rank them with other
+    # weights or thresholds. The report's sentence similarities are computed for every
+    # crawled paper here, so any threshold can be re-applied later.
+    sentence_similarities = None
+    if config.get("artifacts_dir"):
+        with profiler.stage("save_artifacts") as stage:
+            if crawled_papers:
+                sentence_similarities = abstract_sentence_similarities(abstract, crawled_papers, similarity_model)
+            save_artifacts(config["artifacts_dir"], title, abstract, keywords, crawled_papers,
+                           title_similarities, abstract_similarities, sentence_similarities, similarity_model)
+            stage.count(papers=len(crawled_papers))
 
     # 6. Save the results to a JSON file
-    save_results_to_json(similar_papers, output_json_path, min_similarity)
+    with profiler.stage("save_json") as stage:
+        save_results_to_json(similar_papers, output_json_path, min_similarity)
+        stage.count(papers=sum(1 for p in similar_papers if p['similarity_score'] >= min_similarity))
 
     # 7. Generate the PDF report
     # Filter papers for the report based on the similarity threshold
-    report_papers = [p for p in similar_papers if p['similarity_score'] >= min_similarity]
-    if report_papers:
-        generate_pdf_report(title, abstract, report_papers, output_pdf_path, similarity_model)
-    else:
-        print("No papers met the minimum similarity threshold for PDF report generation.")
+    with profiler.stage("report") as stage:
+        report_papers = [p for p in similar_papers if p['similarity_score'] >= min_similarity]
+        if report_papers:
+            report_similarities = None
+            if sentence_similarities is not None:
+                report_similarities = sentence_similarities[:, [p['index'] for p in report_papers]]
+            generate_pdf_report(title, abstract, report_papers, output_pdf_path, similarity_model,
+                                sentence_similarities=report_similarities)
+            stage.count(papers=len(report_papers))
+        else:
+            print("No papers met the minimum similarity threshold for PDF report generation.")
+
+    # Each model was loaded once and shared across the stages above.
+    report_model_stats()
+    report_padding()
+    close_executors()
+    if http_cache is not None:
+        http_cache.report()
+
+    # 8. Save the run profile next to the JSON results
+    profiler.annotate(models=get_model_stats())
+    profile_path = os.path.join(os.path.dirname(output_json_path), "run_profile.json")
+    profiler.save(profile_path)
+    profiler.report()
+    print(f"Run profile saved to {profile_path}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
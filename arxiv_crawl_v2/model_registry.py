@@ -0,0 +1,61 @@
+import os
+import resource
+import threading
+import time
+from typing import Any, Dict
+
+from sentence_transformers import SentenceTransformer
+
+# Process-wide registry so each embedding model is loaded once and shared by the keyword
+# extractor, the similarity analyzer and the report generator.
+_models: Dict[str, Any] = {}
+_stats: Dict[str, Dict[str, float]] = {}
+_lock = threading.Lock()
+
+def _resident_memory_mb() -> float:
+    """Current resident set size of this process in MB."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # Not on Linux: fall back to the peak RSS (kilobytes on Linux, bytes on macOS).
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if os.uname().sysname == 'Darwin' else peak / 1024
+
+def get_model(model_name: str) -> SentenceTransformer:
+    """
+    Returns the shared SentenceTransformer for `model_name`, loading it on first use.
+
+    Args:
+        model_name (str): The name of the sentence-transformer model.
+
+    Returns:
+        SentenceTransformer: The loaded model.
+    """
+    with _lock:
+        if model_name not in _models:
+            print(f"Loading model: {model_name}...")
+            rss_before = _resident_memory_mb()
+            start = time.perf_counter()
+            _models[model_name] = SentenceTransformer(model_name)
+            _stats[model_name] = {
+                "load_seconds": time.perf_counter() - start,
+                "resident_mb": _resident_memory_mb() - rss_before,
+            }
+        return _models[model_name]
+
+def register_model(model_name: str, model: Any):
+    """Registers an already constructed model (e.g. a stub encoder) under `model_name`."""
+    with _lock:
+        _models[model_name] = model
+        _stats[model_name] = {"load_seconds": 0.0, "resident_mb": 0.0}
+
+def get_model_stats() -> Dict[str, Dict[str, float]]:
+    """Load time (seconds) and resident memory added by the load (MB) for each model."""
+    return {name: dict(stats) for name, stats in _stats.items()}
+
+def report_model_stats():
+    """Prints load time and resident memory for every model loaded in this process."""
+    for name, stats in _stats.items():
+        print(f"Model '{name}': loaded in {stats['load_seconds']:.1f}s, ~{stats['resident_mb']:.0f} MB resident.")
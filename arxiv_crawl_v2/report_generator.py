@@ -1,7 +1,7 @@
 import fitz  # PyMuPDF
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import numpy as np
-from sentence_transformers import SentenceTransformer
+from token_batching import get_encoder
 from sklearn.metrics.pairwise import cosine_similarity
 import nltk
 
@@ -28,18 +28,115 @@ def get_color_palette(num_colors: int):
     # Repeat colors if more are needed
     return [colors[i % len(colors)] for i in range(num_colors)]
 
+def sentence_paper_similarities(
+    sentence_embeddings: np.ndarray,
+    paper_sentence_embeddings: Optional[np.ndarray],
+    paper_offsets: List[int]
+) -> np.ndarray:
+    """
+    Scores each source sentence against each paper by its most similar sentence in it.
+
+    Args:
+        sentence_embeddings (np.ndarray): Embeddings of the source sentences.
+        paper_sentence_embeddings (Optional[np.ndarray]): Embeddings of all paper sentences, paper by paper.
+        paper_offsets (List[int]): Paper `i` owns rows `paper_offsets[i]:paper_offsets[i + 1]`.
+
+    Returns:
+        np.ndarray: A (source sentences x papers) matrix; -inf for papers without sentences.
+    """
+    offsets = np.asarray(paper_offsets)
+    per_paper = np.full((len(sentence_embeddings), len(offsets) - 1), -np.inf)
+    non_empty = np.flatnonzero(np.diff(offsets) > 0)
+    if paper_sentence_embeddings is None or len(non_empty) == 0:
+        return per_paper
+    similarities = cosine_similarity(sentence_embeddings, paper_sentence_embeddings)
+    per_paper[:, non_empty] = np.maximum.reduceat(similarities, offsets[non_empty], axis=1)
+    return per_paper
+
+def best_papers_from_similarities(per_paper: np.ndarray) -> Tuple[List[int], List[float]]:
+    """
+    Picks, for each source sentence, the paper with the highest score in a
+    `sentence_paper_similarities` matrix.
+
+    Returns:
+        Tuple[List[int], List[float]]: The best paper index (-1 if no paper scores above 0) and
+        its similarity for each source sentence. Ties go to the earlier paper.
+    """
+    num_sentences = per_paper.shape[0]
+    if per_paper.shape[1] == 0:
+        return [-1] * num_sentences, [0.0] * num_sentences
+    best_papers = per_paper.argmax(axis=1)
+    best_similarities = per_paper[np.arange(num_sentences), best_papers]
+    no_match = best_similarities <= 0
+    best_papers[no_match] = -1
+    best_similarities[no_match] = 0
+    return best_papers.tolist(), best_similarities.tolist()
+
+def best_matching_papers(
+    sentence_embeddings: np.ndarray,
+    paper_sentence_embeddings: Optional[np.ndarray],
+    paper_offsets: List[int]
+) -> Tuple[List[int], List[float]]:
+    """
+    Finds, for each source sentence, the paper containing its most similar sentence.
+
+    Args:
+        sentence_embeddings (np.ndarray): Embeddings of the source sentences.
+        paper_sentence_embeddings (Optional[np.ndarray]): Embeddings of all paper sentences, paper by paper.
+        paper_offsets (List[int]): Paper `i` owns rows `paper_offsets[i]:paper_offsets[i + 1]`.
+
+    Returns:
+        Tuple[List[int], List[float]]: The best paper index (-1 if no paper scores above 0) and
+        its similarity for each source sentence. Ties go to the earlier paper.
+    """
+    return best_papers_from_similarities(
+        sentence_paper_similarities(sentence_embeddings, paper_sentence_embeddings, paper_offsets)
+    )
+
+def abstract_sentence_similarities(original_abstract: str, papers: List[Any], model_name: str) -> np.ndarray:
+    """
+    Scores every sentence of the original abstract against every paper's abstract.
+
+    Every paper sentence is embedded once, in a single batch, and all source sentences
+    are scored against them with one matrix operation.
+
+    Args:
+        original_abstract (str): The abstract of the source document.
+        papers (List[Any]): Paper objects from the arxiv library.
+        model_name (str): The name of the sentence-transformer model to use.
+
+    Returns:
+        np.ndarray: The `sentence_paper_similarities` matrix (abstract sentences x papers).
+    """
+    model = get_encoder(model_name)
+    original_abstract_sentences = nltk.sent_tokenize(original_abstract)
+    paper_sentences = []
+    paper_offsets = [0]
+    for paper in papers:
+        paper_sentences.extend(nltk.sent_tokenize(paper.summary))
+        paper_offsets.append(len(paper_sentences))
+    if not original_abstract_sentences:
+        return np.zeros((0, len(papers)))
+    original_abstract_embeddings = model.encode(original_abstract_sentences)
+    paper_embeddings = model.encode(paper_sentences) if paper_sentences else None
+    return sentence_paper_similarities(original_abstract_embeddings, paper_embeddings, paper_offsets)
+
 def generate_pdf_report(
     original_title: str,
     original_abstract: str,
     similar_papers: List[Dict[str, Any]],
     output_pdf_path: str,
-    model_name: str
+    model_name: str,
+    sentence_similarities: Optional[np.ndarray] = None
 ):
     """
     Generates a PDF report with highlighted sentences and a list of sources.
+
+    `sentence_similarities` (abstract sentences x `similar_papers`, see
+    `abstract_sentence_similarities`) can be passed in to build the report without
+    encoding anything, e.g. when re-scoring a saved run.
     """
     print(f"Generating PDF report at {output_pdf_path}...")
-    model = SentenceTransformer(model_name)
 
     # Create a new PDF
     doc = fitz.open()
@@ -54,32 +151,20 @@ def generate_pdf_report(
         page.insert_text((72, 100), "Original abstract not found or empty.", fontsize=11)
         y_pos = 120
     else:
-        original_abstract_embeddings = model.encode(original_abstract_sentences)
+        if sentence_similarities is None:
+            sentence_similarities = abstract_sentence_similarities(
+                original_abstract, [paper_item['paper'] for paper_item in similar_papers], model_name
+            )
         y_pos = 100
         page.insert_text((72, y_pos), "Original Abstract:", fontsize=12, fontname="helvetica-bold")
         y_pos += 20
 
         # --- 2. Find and Highlight Similar Sentences ---
         colors = get_color_palette(len(similar_papers))
-        
-        for sent_idx, (sentence, sent_embedding) in enumerate(zip(original_abstract_sentences, original_abstract_embeddings)):
-            max_sim = 0
-            best_paper_idx = -1
-
-            for paper_idx, paper_item in enumerate(similar_papers):
-                similar_paper_abstract = paper_item['paper'].summary
-                similar_paper_sentences = nltk.sent_tokenize(similar_paper_abstract)
-                if not similar_paper_sentences:
-                    continue
-                
-                similar_paper_embeddings = model.encode(similar_paper_sentences)
-                similarities = cosine_similarity(sent_embedding.reshape(1, -1), similar_paper_embeddings)[0]
-                current_max_sim = np.max(similarities)
-
-                if current_max_sim > max_sim:
-                    max_sim = current_max_sim
-                    best_paper_idx = paper_idx
 
+        best_paper_indices, best_similarities = best_papers_from_similarities(sentence_similarities)
+
+        for sentence, best_paper_idx, max_sim in zip(original_abstract_sentences, best_paper_indices, best_similarities):
             # Insert the sentence text into the PDF first
             # We use a TextWriter to handle wrapping long sentences
             text_rect = fitz.Rect(72, y_pos, page.rect.width - 72, y_pos + 100)
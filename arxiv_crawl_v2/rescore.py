@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import yaml
+
+from arxiv_common.metadata_store import result_to_row, row_to_result
+from report_generator import generate_pdf_report
+from similarity_analyzer import rank_papers
+from utils import save_results_to_json
+
+# Bumped whenever the layout of the saved artifacts changes.
+ARTIFACTS_VERSION = 1
+
+def save_artifacts(
+    directory: str,
+    title: str,
+    abstract: str,
+    keywords: List[str],
+    crawled_papers: List[Any],
+    title_similarities: np.ndarray,
+    abstract_similarities: np.ndarray,
+    sentence_similarities: Optional[np.ndarray],
+    similarity_model: str
+):
+    """
+    Saves what a run's ranking and report are computed from, so that weights and the
+    minimum similarity can be changed without parsing, crawling or encoding again.
+
+    Writes `run.json` (title, abstract, keywords, model and every crawled paper as a
+    metadata row) and `similarities.npz` with the title and abstract similarity of every
+    paper and the (abstract sentences x papers) matrix used to highlight the report.
+
+    Args:
+        directory (str): The directory to write to.
+        title (str): The title of the source document.
+        abstract (str): The abstract of the source document.
+        keywords (List[str]): The extracted keywords.
+        crawled_papers (List[Any]): The paper objects from the arxiv library, in crawl order.
+        title_similarities (np.ndarray): Title similarity of each paper.
+        abstract_similarities (np.ndarray): Abstract similarity of each paper.
+        sentence_similarities (Optional[np.ndarray]): Best sentence similarity of each abstract sentence per paper.
+        similarity_model (str): The model that produced the similarities.
+    """
+    os.makedirs(directory, exist_ok=True)
+    arrays = {
+        "title_similarities": np.asarray(title_similarities, dtype=np.float32),
+        "abstract_similarities": np.asarray(abstract_similarities, dtype=np.float32),
+    }
+    if sentence_similarities is not None:
+        arrays["sentence_similarities"] = np.asarray(sentence_similarities, dtype=np.float32)
+    np.savez(os.path.join(directory, "similarities.npz"), **arrays)
+    run = {
+        "version": ARTIFACTS_VERSION,
+        "similarity_model": similarity_model,
+        "title": title,
+        "abstract": abstract,
+        "keywords": keywords,
+        "papers": [result_to_row(paper) for paper in crawled_papers],
+    }
+    with open(os.path.join(directory, "run.json"), 'w', encoding='utf-8') as f:
+        json.dump(run, f, ensure_ascii=False)
+    print(f"Run artifacts saved to {directory} ({len(crawled_papers)} papers).")
+
+def load_artifacts(directory: str) -> Dict[str, Any]:
+    """
+    Loads artifacts written by `save_artifacts`.
+
+    Args:
+        directory (str): The directory they were written to.
+
+    Returns:
+        Dict[str, Any]: The run.json contents, with the papers rebuilt as `arxiv.Result`
+        objects and the arrays of similarities.npz added under their own names.
+    """
+    run_path = os.path.join(directory, "run.json")
+    if not os.path.exists(run_path):
+        raise FileNotFoundError(f"No run artifacts found in {directory}. Run main.py once with 'artifacts_dir' set.")
+    with open(run_path, 'r', encoding='utf-8') as f:
+        run = json.load(f)
+    if run.get("version") != ARTIFACTS_VERSION:
+        raise ValueError(f"Run artifacts in {directory} have version {run.get('version')}, expected {ARTIFACTS_VERSION}. "
+                         "Run main.py again to refresh them.")
+    run["papers"] = [row_to_result(row) for row in run["papers"]]
+    with np.load(os.path.join(directory, "similarities.npz")) as arrays:
+        run.update({name: arrays[name] for name in arrays.files})
+    return run
+
+def rescore(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Re-ranks the papers of the last run with the current `title_weight`,
+    `abstract_weight` and `min_similarity`, then rewrites the JSON results and the PDF
+    report, from the saved artifacts alone.
+
+    Args:
+        config (Dict[str, Any]): The loaded configuration.
+
+    Returns:
+        List[Dict[str, Any]]: All papers, ranked by the new combined score.
+    """
+    start = time.perf_counter()
+    run = load_artifacts(config["artifacts_dir"])
+    if run["similarity_model"] != config["similarity_model"]:
+        print(f"Note: the saved similarities come from '{run['similarity_model']}', not the configured "
+              f"'{config['similarity_model']}'; only a full run re-encodes with a different model.")
+    output_json_path = config["output_file"]
+    min_similarity = config["min_similarity"]
+
+    similar_papers = rank_papers(
+        run["papers"], run["title_similarities"], run["abstract_similarities"],
+        config["title_weight"], config["abstract_weight"]
+    )
+    save_results_to_json(similar_papers, output_json_path, min_similarity)
+
+    report_papers = [p for p in similar_papers if p['similarity_score'] >= min_similarity]
+    if report_papers:
+        # Columns of the saved matrix follow the crawl order; pick the report's papers.
+        sentence_similarities = run.get("sentence_similarities")
+        if sentence_similarities is not None:
+            sentence_similarities = sentence_similarities[:, [p['index'] for p in report_papers]]
+        generate_pdf_report(run["title"], run["abstract"], report_papers,
+                            output_json_path.replace('.json', '_report.pdf'), config["similarity_model"],
+                            sentence_similarities=sentence_similarities)
+    else:
+        print("No papers met the minimum similarity threshold for PDF report generation.")
+    print(f"Re-scored {len(similar_papers)} papers ({len(report_papers)} above {min_similarity}) "
+          f"in {time.perf_counter() - start:.2f}s.")
+    return similar_papers
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-rank the last run's papers with the weights and threshold in the config.")
+    parser.add_argument("config_path", type=str, help="Path to the configuration YAML file.")
+    args = parser.parse_args()
+    with open(args.config_path, 'r') as f:
+        rescore(yaml.safe_load(f))
@@ -1,37 +1,28 @@
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 from typing import List, Dict, Any, Tuple
-from sentence_transformers import SentenceTransformer
+from token_batching import get_encoder
 
-def find_similar_papers(
+def paper_similarities(
     original_title: str,
     original_abstract: str,
     crawled_papers: List[Any],
     model_name: str = 'all-MiniLM-L6-v2',
-    title_weight: float = 0.3,
-    abstract_weight: float = 0.7,
-) -> List[Dict[str, Any]]:
+) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Compares crawled papers to the original document's title and abstract,
-    returning a ranked list based on a weighted similarity score.
+    Computes the cosine similarity of every crawled paper's title and abstract to the
+    original document's title and abstract.
 
     Args:
         original_title (str): The title of the source document.
         original_abstract (str): The abstract of the source document.
         crawled_papers (List[Any]): A list of paper objects from the arxiv library.
         model_name (str): The name of the sentence-transformer model to use.
-        title_weight (float): The weight to give to title similarity.
-        abstract_weight (float): The weight to give to abstract similarity.
 
     Returns:
-        List[Dict[str, Any]]: A sorted list of the top N similar papers with their metadata.
+        Tuple[np.ndarray, np.ndarray]: The title and abstract similarities, one per paper.
     """
-    if not crawled_papers:
-        return []
-
-    print(f"Loading similarity model: {model_name}...")
-    model = SentenceTransformer(model_name)
+    model = get_encoder(model_name)
 
     # Generate embeddings for the original document's title and abstract
     original_title_embedding = model.encode(original_title, convert_to_tensor=False).reshape(1, -1)
@@ -48,20 +39,72 @@ def find_similar_papers(
     # Calculate cosine similarity between the original document and all crawled papers
     title_similarities = cosine_similarity(original_title_embedding, corpus_title_embeddings)[0]
     abstract_similarities = cosine_similarity(original_abstract_embedding, corpus_abstract_embeddings)[0]
+    return title_similarities, abstract_similarities
+
+def rank_papers(
+    crawled_papers: List[Any],
+    title_similarities: np.ndarray,
+    abstract_similarities: np.ndarray,
+    title_weight: float = 0.3,
+    abstract_weight: float = 0.7,
+) -> List[Dict[str, Any]]:
+    """
+    Ranks papers by the weighted combination of their title and abstract similarities.
 
+    Args:
+        crawled_papers (List[Any]): A list of paper objects from the arxiv library.
+        title_similarities (np.ndarray): Title similarity of each paper.
+        abstract_similarities (np.ndarray): Abstract similarity of each paper.
+        title_weight (float): The weight to give to title similarity.
+        abstract_weight (float): The weight to give to abstract similarity.
+
+    Returns:
+        List[Dict[str, Any]]: The papers with their similarity score and their position
+        in `crawled_papers` ("index"), sorted by score.
+    """
     # Calculate a weighted combined similarity score.
-    combined_similarities = (title_weight * title_similarities) + (abstract_weight * abstract_similarities)
+    combined_similarities = (title_weight * np.asarray(title_similarities)) + (abstract_weight * np.asarray(abstract_similarities))
 
     # Pair each paper with its similarity score
     scored_papers = []
     for i, paper in enumerate(crawled_papers):
         scored_papers.append({
             "paper": paper,
-            "similarity_score": float(combined_similarities[i])
+            "similarity_score": float(combined_similarities[i]),
+            "index": i
         })
 
     # Sort papers by similarity score in descending order
     scored_papers.sort(key=lambda x: x['similarity_score'], reverse=True)
 
     # Return all scored and sorted papers
-    return scored_papers
\ No newline at end of file
+    return scored_papers
+
+def find_similar_papers(
+    original_title: str,
+    original_abstract: str,
+    crawled_papers: List[Any],
+    model_name: str = 'all-MiniLM-L6-v2',
+    title_weight: float = 0.3,
+    abstract_weight: float = 0.7,
+) -> List[Dict[str, Any]]:
+    """
+    Compares crawled papers to the original document's title and abstract,
+    returning a ranked list based on a weighted similarity score.
+
+    Args:
+        original_title (str): The title of the source document.
+        original_abstract (str): The abstract of the source document.
+        crawled_papers (List[Any]): A list of paper objects from the arxiv library.
+        model_name (str): The name of the sentence-transformer model to use.
+        title_weight (float): The weight to give to title similarity.
+        abstract_weight (float): The weight to give to abstract similarity.
+
+    Returns:
+        List[Dict[str, Any]]: A sorted list of the top N similar papers with their metadata.
+    """
+    if not crawled_papers:
+        return []
+
+    title_similarities, abstract_similarities = paper_similarities(original_title, original_abstract, crawled_papers, model_name)
+    return rank_papers(crawled_papers, title_similarities, abstract_similarities, title_weight, abstract_weight)
@@ -0,0 +1,49 @@
+import threading
+from typing import Any, Dict, Optional
+
+from arxiv_common.token_batching import LengthBucketedEncoder
+from encode_executor import get_executor
+
+# Process-wide token budget and one bucketed encoder per model, like the executors.
+_settings: Dict[str, Any] = {"token_budget": None, "compare_fixed": False}
+_encoders: Dict[str, LengthBucketedEncoder] = {}
+_lock = threading.Lock()
+
+def configure(token_budget: Optional[int] = None, compare_fixed: bool = False):
+    """
+    Sets the token budget of length-bucketed batching for every model.
+
+    Args:
+        token_budget (Optional[int]): Tokens per batch, padding included; None encodes
+            in fixed batches through the encode executor.
+        compare_fixed (bool): Also count the padding of fixed-size batches for `report_padding`.
+    """
+    with _lock:
+        _settings.update(token_budget=token_budget, compare_fixed=compare_fixed)
+
+def get_encoder(model_name: str) -> Any:
+    """
+    Returns the shared encoder for `model_name`: its EncodeExecutor, behind a
+    LengthBucketedEncoder when a token budget is configured.
+
+    Args:
+        model_name (str): The name of the sentence-transformer model.
+
+    Returns:
+        Any: An object with SentenceTransformer's `encode` interface.
+    """
+    executor = get_executor(model_name)
+    with _lock:
+        if not _settings["token_budget"]:
+            return executor
+        if model_name not in _encoders:
+            _encoders[model_name] = LengthBucketedEncoder(executor, _settings["token_budget"],
+                                                          compare_fixed=_settings["compare_fixed"])
+        return _encoders[model_name]
+
+def report_padding():
+    """Prints the padding waste of every bucketed encoder used in this process."""
+    for name, encoder in _encoders.items():
+        if encoder.real_tokens:
+            print(f"Model '{name}':", end=" ")
+            encoder.report()
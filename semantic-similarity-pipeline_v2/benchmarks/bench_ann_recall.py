@@ -0,0 +1,78 @@
+# benchmarks/bench_ann_recall.py
+#
+# Measures recall@k and query latency of the ANN index against exact brute-force search
+# on synthetic clustered embeddings, for a range of nprobe settings.
+#
+# Run from the project root:
+#     python benchmarks/bench_ann_recall.py --sentences 100000 --dim 768
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.ann_index import SentenceIndex, faiss, normalize
+
+def make_embeddings(num_sentences, dim, num_topics, seed):
+    """Clustered vectors: abstracts on the same topic produce nearby sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    topics = rng.standard_normal((num_topics, dim)).astype(np.float32)
+    labels = rng.integers(0, num_topics, num_sentences)
+    return normalize(topics[labels] + 0.6 * rng.standard_normal((num_sentences, dim)).astype(np.float32)), topics
+
+def exact_search(corpus, queries, k):
+    scores = queries @ corpus.T
+    ids = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return ids
+
+def recall(approx_ids, exact_ids):
+    hits = sum(len(set(a) & set(e)) for a, e in zip(approx_ids, exact_ids))
+    return hits / exact_ids.size
+
+def main():
+    parser = argparse.ArgumentParser(description="ANN recall-vs-exact benchmark.")
+    parser.add_argument("--sentences", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus, topics = make_embeddings(args.sentences, args.dim, max(10, args.sentences // 500), args.seed)
+    queries, _ = make_embeddings(args.queries, args.dim, len(topics), args.seed + 1)
+    rows = np.stack([np.arange(args.sentences), np.zeros(args.sentences, dtype=np.int64)], axis=1)
+
+    start = time.perf_counter()
+    exact_ids = exact_search(corpus, queries, args.k)
+    exact_ms = (time.perf_counter() - start) * 1000 / args.queries
+    print(f"Exact search: {exact_ms:.2f} ms/query over {args.sentences} sentences (dim {args.dim})")
+
+    start = time.perf_counter()
+    index = SentenceIndex.build(corpus, [], rows, method='ivf')
+    print(f"IVF build: {time.perf_counter() - start:.1f}s, {len(index.centroids)} lists")
+    print(f"{'nprobe':>7} {'recall@' + str(args.k):>10} {'ms/query':>10}")
+    for nprobe in (1, 2, 4, 8, 16, 32, 64):
+        if nprobe > len(index.centroids):
+            break
+        start = time.perf_counter()
+        _, ids = index.search(queries, args.k, nprobe=nprobe)
+        ms = (time.perf_counter() - start) * 1000 / args.queries
+        print(f"{nprobe:>7} {recall(ids, exact_ids):>10.3f} {ms:>10.2f}")
+
+    if faiss is not None:
+        start = time.perf_counter()
+        index = SentenceIndex.build(corpus, [], rows, method='hnsw')
+        print(f"HNSW build: {time.perf_counter() - start:.1f}s")
+        start = time.perf_counter()
+        _, ids = index.search(queries, args.k)
+        ms = (time.perf_counter() - start) * 1000 / args.queries
+        print(f"HNSW recall@{args.k}: {recall(ids, exact_ids):.3f} at {ms:.2f} ms/query")
+    else:
+        print("faiss-cpu not installed; skipping HNSW.")
+
+if __name__ == "__main__":
+    main()
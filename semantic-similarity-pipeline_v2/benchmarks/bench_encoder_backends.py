@@ -0,0 +1,109 @@
+# benchmarks/bench_encoder_backends.py
+#
+# Compares the encoder backends (PyTorch, dynamic int8, ONNX Runtime) for one embedding
+# model on CPU: throughput in sentences/sec and parity with the PyTorch embeddings,
+# both per vector (cosine) and for the rankings the similarity search would produce.
+#
+# Run from the project root:
+#     python benchmarks/bench_encoder_backends.py --model all-MiniLM-L6-v2 --sentences 2000
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.encoder_backends import available_backends, check_parity, get_backend
+from pipeline.quantization import ranking_agreement
+from pipeline.similarity_analyzer import SimilarityAnalyzer
+from arxiv_common.synthetic import SyntheticCorpus
+
+def load_sentences(args):
+    if args.text_file:
+        with open(args.text_file, 'r', encoding='utf-8') as f:
+            sentences = [line.strip() for line in f if line.strip()]
+        return sentences[:args.queries], sentences[args.queries:args.queries + args.sentences]
+    corpus = SyntheticCorpus(max(1, args.sentences // 10), 10, args.queries, seed=args.seed)
+    return corpus.source_doc['sentences'], [s for doc in corpus.corpus_docs for s in doc['sentences']]
+
+def time_encode(model, sentences, batch_size, repeat):
+    best, embeddings = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        embeddings = model.encode(sentences, batch_size=batch_size, convert_to_numpy=True)
+        best = min(best, time.perf_counter() - start)
+    return best, np.asarray(embeddings, dtype=np.float32)
+
+def cosine_matrix(a, b):
+    a = torch.nn.functional.normalize(torch.from_numpy(a), dim=1)
+    b = torch.nn.functional.normalize(torch.from_numpy(b), dim=1)
+    return a @ b.T
+
+def main():
+    parser = argparse.ArgumentParser(description="Encoder backend parity and throughput benchmark.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Embedding model (name or local path).")
+    parser.add_argument("--backends", nargs="+", default=None, help="Backends to compare; defaults to every installed backend.")
+    parser.add_argument("--sentences", type=int, default=2000, help="Corpus sentences to encode.")
+    parser.add_argument("--queries", type=int, default=20, help="Query sentences for the ranking agreement.")
+    parser.add_argument("--text_file", default=None, help="Real sentences, one per line, instead of synthetic ones.")
+    parser.add_argument("--batch_size", type=int, default=64)
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions; the fastest run is reported.")
+    parser.add_argument("--threads", type=int, default=None, help="torch.set_num_threads for every backend.")
+    parser.add_argument("--onnx_cache_dir", default="data/cache/onnx/")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    queries, sentences = load_sentences(args)
+    # _load_model applies the same contriever/SimCSE pooling as the pipeline.
+    reference = SimilarityAnalyzer({"embedding_model": args.model, "similarity_threshold": 0.75}).model
+    backends = args.backends or [name for name, installed in available_backends().items() if installed]
+
+    _, reference_queries = time_encode(reference, queries, args.batch_size, 1)
+    reference_seconds, reference_corpus = time_encode(reference, sentences, args.batch_size, args.repeat)
+    reference_scores = cosine_matrix(reference_queries, reference_corpus)
+
+    results = []
+    for name in backends:
+        start = time.perf_counter()
+        backend = reference if name == 'torch' else get_backend(name, reference, args.model, args.onnx_cache_dir)
+        build_seconds = time.perf_counter() - start
+        if name == 'torch':
+            seconds, corpus_embeddings, backend_queries = reference_seconds, reference_corpus, reference_queries
+        else:
+            seconds, corpus_embeddings = time_encode(backend, sentences, args.batch_size, args.repeat)
+            _, backend_queries = time_encode(backend, queries, args.batch_size, 1)
+        cosines = (torch.nn.functional.normalize(torch.from_numpy(corpus_embeddings), dim=1)
+                   * torch.nn.functional.normalize(torch.from_numpy(reference_corpus), dim=1)).sum(dim=1)
+        results.append(dict(
+            backend=name,
+            build_seconds=build_seconds,
+            sentences_per_sec=len(sentences) / seconds,
+            speedup=reference_seconds / seconds,
+            min_cosine=float(cosines.min()),
+            mean_cosine=float(cosines.mean()),
+            parity_sentences=check_parity(reference, backend)["min_cosine"],
+            **ranking_agreement(reference_scores, cosine_matrix(backend_queries, corpus_embeddings), k=10)
+        ))
+
+    print(f"\n{'backend':<11} {'build s':>8} {'sent/s':>9} {'speedup':>8} {'min cos':>8} {'mean cos':>9} "
+          f"{'top-1':>6} {'recall@10':>10}")
+    for r in results:
+        print(f"{r['backend']:<11} {r['build_seconds']:>8.2f} {r['sentences_per_sec']:>9.1f} {r['speedup']:>7.2f}x "
+              f"{r['min_cosine']:>8.4f} {r['mean_cosine']:>9.4f} {r['top1_agreement']:>6.3f} {r['recall_at_k']:>10.3f}")
+    print(f"{len(sentences)} sentences, batch size {args.batch_size}, {torch.get_num_threads()} torch threads; "
+          "parity is measured against the 'torch' backend.")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+        print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
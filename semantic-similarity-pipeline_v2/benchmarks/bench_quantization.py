@@ -0,0 +1,84 @@
+# benchmarks/bench_quantization.py
+#
+# Compares float32, float16 and int8 corpus embeddings (with and without the float32
+# re-rank) on a synthetic corpus: memory held for the corpus, scoring time, and how well
+# the rankings agree with the full-precision path.
+#
+# Run from the project root:
+#     python benchmarks/bench_quantization.py --sentences 100000 --dim 768
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.quantization import QuantizedEmbeddings, ranking_agreement
+from pipeline.similarity_analyzer import SimilarityAnalyzer
+from arxiv_common.synthetic import StubEncoder, SyntheticCorpus
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantized corpus embedding benchmark.")
+    parser.add_argument("--sentences", type=int, default=100000, help="Corpus size in sentences.")
+    parser.add_argument("--sentences_per_paper", type=int, default=10)
+    parser.add_argument("--source_sentences", type=int, default=20)
+    parser.add_argument("--dim", type=int, default=768, help="Stub encoder dimension (768 like all-mpnet-base-v2).")
+    parser.add_argument("--rerank_top_k", type=int, nargs="+", default=[0, 50])
+    parser.add_argument("--k", type=int, default=10, help="Top-k used for the ranking agreement.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default=None, help="Benchmark this sentence-transformer instead of the stub encoder.")
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    corpus = SyntheticCorpus(max(1, args.sentences // args.sentences_per_paper), args.sentences_per_paper,
+                             args.source_sentences, seed=args.seed)
+    config = {
+        "embedding_model": args.model or "stub",
+        "similarity_threshold": 0.75,
+        "encode_batch_size": 128,
+        "corpus_encode_mode": "batched",
+    }
+    model = None if args.model else StubEncoder(args.dim)
+    reference = SimilarityAnalyzer(config, model=model)
+    model = reference.model
+    source_embeddings = reference._encode(corpus.source_doc['sentences'])
+
+    start = time.perf_counter()
+    exact, _ = reference._score_corpus(source_embeddings, corpus.corpus_docs)
+    exact_seconds = time.perf_counter() - start
+    float32_bytes = exact.shape[1] * model.get_sentence_embedding_dimension() * 4
+
+    results = [{"precision": "float32", "rerank_top_k": 0, "corpus_mb": float32_bytes / (1024 * 1024),
+                "seconds": exact_seconds, "top1_agreement": 1.0, "recall_at_k": 1.0, "max_abs_error": 0.0}]
+    for precision in ("float16", "int8"):
+        for rerank_top_k in args.rerank_top_k:
+            analyzer = SimilarityAnalyzer(dict(config, embedding_precision=precision, rerank_top_k=rerank_top_k), model=model)
+            start = time.perf_counter()
+            approx, _ = analyzer._score_corpus(source_embeddings, corpus.corpus_docs)
+            seconds = time.perf_counter() - start
+            # Zero-filled arrays are not paged in, so this only sizes the storage.
+            storage = QuantizedEmbeddings(approx.shape[1], model.get_sentence_embedding_dimension(), precision)
+            results.append(dict(
+                precision=precision,
+                rerank_top_k=rerank_top_k,
+                corpus_mb=storage.nbytes / (1024 * 1024),
+                seconds=seconds,
+                **ranking_agreement(exact, approx, args.k)
+            ))
+
+    print(f"\n{'precision':<10} {'rerank':>6} {'corpus MB':>10} {'saved':>6} {'encode+score s':>15} "
+          f"{'top-1':>6} {f'recall@{args.k}':>10} {'max err':>8}")
+    for r in results:
+        print(f"{r['precision']:<10} {r['rerank_top_k']:>6} {r['corpus_mb']:>10.1f} "
+              f"{1 - r['corpus_mb'] * 1024 * 1024 / float32_bytes:>6.0%} {r['seconds']:>15.2f} "
+              f"{r['top1_agreement']:>6.3f} {r['recall_at_k']:>10.3f} {r['max_abs_error']:>8.4f}")
+    print("Agreement is measured against the float32 scores; 'max err' is over all scores, not just the re-ranked ones.")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+        print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/bench_scaling.py
+#
+# Times SimilarityAnalyzer.find_similar_sentences (in every corpus encode mode) and
+# generate_report on synthetic corpora of increasing size. By default sentences are
+# encoded with the deterministic stub encoder from arxiv_common/synthetic.py, so the run is
+# offline and CPU-only; --model benchmarks a real sentence-transformer instead.
+#
+# Each size is recorded as a run profile (arxiv_common/profiling.py) and the whole run is written
+# to JSON together with the git commit, so results can be compared across commits.
+#
+# Run from the project root:
+#     python benchmarks/bench_scaling.py --output scaling-new.json --baseline scaling-old.json
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arxiv_common.benchmarking import compare, git_commit, print_runs
+from arxiv_common.profiling import RunProfiler
+from arxiv_common.synthetic import StubEncoder, SyntheticCorpus
+from pipeline.reporting import generate_report
+from pipeline.similarity_analyzer import SimilarityAnalyzer
+
+def bench_size(num_sentences, args, model, output_dir):
+    num_papers = max(1, num_sentences // args.sentences_per_paper)
+    profiler = RunProfiler(f"scaling {num_sentences} sentences")
+    with profiler.stage("build_corpus") as stage:
+        corpus = SyntheticCorpus(num_papers, args.sentences_per_paper, args.source_sentences, seed=args.seed)
+        stage.count(papers=num_papers, sentences=corpus.num_sentences)
+
+    config = {
+        "embedding_model": args.model or "stub",
+        "similarity_threshold": args.threshold,
+        "encode_batch_size": args.batch_size,
+        "findings_mode": args.findings_mode,
+        "findings_top_k": args.findings_top_k,
+        "output_dir": output_dir,
+        "font_size_title": 12,
+        "font_size_abstract": 10,
+        "font_size_sources": 9,
+    }
+    findings = []
+    for mode in args.modes:
+        analyzer = SimilarityAnalyzer(dict(config, corpus_encode_mode=mode), model=model)
+        with profiler.stage(f"find_similar_sentences[{mode}]") as stage:
+            findings = analyzer.find_similar_sentences(corpus.source_doc, corpus.corpus_docs)
+            stage.count(
+                encoded_sentences=analyzer.encoded_sentences,
+                encode_batches=analyzer.encode_batches,
+                findings=len(findings)
+            )
+
+    if findings:
+        with profiler.stage("generate_report") as stage:
+            generate_report(config, corpus.source_doc, findings)
+            stage.count(findings=len(findings), sources=len({f['source_paper_path'] for f in findings}))
+
+    profile = profiler.to_dict()
+    profile["sentences"] = num_sentences
+    return profile
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark of the similarity pipeline on synthetic corpora.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000], help="Corpus sizes in sentences.")
+    parser.add_argument("--sentences_per_paper", type=int, default=10)
+    parser.add_argument("--source_sentences", type=int, default=20)
+    parser.add_argument("--modes", nargs="+", default=["batched", "per_document"], help="corpus_encode_mode values to time.")
+    parser.add_argument("--threshold", type=float, default=0.75)
+    parser.add_argument("--findings_mode", default="threshold", help="findings_mode to time ('threshold' or a top-k mode).")
+    parser.add_argument("--findings_top_k", type=int, default=5)
+    parser.add_argument("--batch_size", type=int, default=128)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model", default=None, help="Benchmark this sentence-transformer instead of the stub encoder.")
+    parser.add_argument("--output", default="bench_scaling.json", help="Path of the JSON results.")
+    parser.add_argument("--baseline", default=None, help="Earlier results file to compare against.")
+    args = parser.parse_args()
+
+    # With --model, SimilarityAnalyzer loads the real model itself.
+    model = None if args.model else StubEncoder()
+    results = {
+        "benchmark": "bench_scaling",
+        "commit": git_commit(os.path.dirname(os.path.abspath(__file__))),
+        "encoder": args.model or "stub",
+        "settings": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory() as output_dir:
+        for num_sentences in args.sizes:
+            print(f"\n=== {num_sentences} corpus sentences ===")
+            run = bench_size(num_sentences, args, model, output_dir)
+            results["runs"].append(run)
+
+    print_runs(results, stage_width=36)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=4)
+    print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            compare(results, json.load(f), stage_width=36)
+
+if __name__ == "__main__":
+    main()
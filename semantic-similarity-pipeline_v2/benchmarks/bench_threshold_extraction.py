@@ -0,0 +1,77 @@
+# benchmarks/bench_threshold_extraction.py
+#
+# Compares the per-cell `.item()` loop that find_similar_sentences used to run against
+# the batched `extract_findings` pass, on synthetic similarity matrices.
+#
+# Run from the project root:
+#     python benchmarks/bench_threshold_extraction.py
+
+import os
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.similarity_analyzer import extract_findings
+
+SOURCE_SENTENCES = 10
+SENTENCES_PER_DOC = 8
+THRESHOLD = 0.75
+REPEATS = 3
+
+def loop_findings(similarity_matrix, source_sentences, corpus_doc, threshold):
+    """The original nested loop, kept here as the baseline."""
+    findings = []
+    for i in range(len(source_sentences)):
+        for j in range(len(corpus_doc['sentences'])):
+            score = similarity_matrix[i][j].item()
+            if score >= threshold:
+                findings.append({
+                    'source_sentence': source_sentences[i],
+                    'similar_sentence': corpus_doc['sentences'][j],
+                    'similarity_score': score,
+                    'source_paper_title': corpus_doc['title'],
+                    'source_paper_path': corpus_doc['path']
+                })
+    return findings
+
+def make_corpus(num_docs):
+    generator = torch.Generator().manual_seed(num_docs)
+    source_sentences = [f"source sentence {i}" for i in range(SOURCE_SENTENCES)]
+    corpus = []
+    for d in range(num_docs):
+        doc = {
+            'title': f"Paper {d}",
+            'path': f"paper_{d}.pdf",
+            'sentences': [f"paper {d} sentence {j}" for j in range(SENTENCES_PER_DOC)]
+        }
+        matrix = torch.rand(SOURCE_SENTENCES, SENTENCES_PER_DOC, generator=generator)
+        corpus.append((doc, matrix))
+    return source_sentences, corpus
+
+def time_extraction(extract, source_sentences, corpus):
+    best = float('inf')
+    findings = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        findings = []
+        for doc, matrix in corpus:
+            findings.extend(extract(matrix, source_sentences, doc, THRESHOLD))
+        best = min(best, time.perf_counter() - start)
+    return best, findings
+
+def main():
+    print(f"{'docs':>6} {'loop (ms)':>12} {'batched (ms)':>14} {'speedup':>9} {'findings':>9}")
+    for num_docs in (10, 100, 1000):
+        source_sentences, corpus = make_corpus(num_docs)
+        loop_time, loop_result = time_extraction(loop_findings, source_sentences, corpus)
+        batched_time, batched_result = time_extraction(extract_findings, source_sentences, corpus)
+        if loop_result != batched_result:
+            raise AssertionError(f"Findings differ for {num_docs} docs.")
+        print(f"{num_docs:>6} {loop_time * 1000:>12.2f} {batched_time * 1000:>14.2f} "
+              f"{loop_time / batched_time:>8.1f}x {len(batched_result):>9}")
+
+if __name__ == "__main__":
+    main()
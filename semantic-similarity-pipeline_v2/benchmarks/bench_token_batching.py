@@ -0,0 +1,85 @@
+# benchmarks/bench_token_batching.py
+#
+# Compares fixed-size encode batches with length-bucketed, token-budget batches: padding
+# waste and sentences/sec for one embedding model on CPU, on synthetic sentences whose
+# lengths vary as much as real abstract sentences (or on a file of real sentences).
+#
+# Run from the project root:
+#     python benchmarks/bench_token_batching.py --model all-MiniLM-L6-v2 --sentences 5000 --token_budgets 4096 8192
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.similarity_analyzer import SimilarityAnalyzer
+from arxiv_common.token_batching import (LengthBucketedEncoder, fixed_batches, padded_tokens,
+                                     token_lengths)
+from arxiv_common.synthetic import SyntheticCorpus
+
+def load_sentences(args):
+    if args.text_file:
+        with open(args.text_file, 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()][:args.sentences]
+    corpus = SyntheticCorpus(max(1, args.sentences // 10), 10, words_per_sentence=(3, 70), seed=args.seed)
+    return [s for doc in corpus.corpus_docs for s in doc['sentences']]
+
+def time_encode(encoder, sentences, batch_size, repeat):
+    best, embeddings = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        embeddings = encoder.encode(sentences, batch_size=batch_size, convert_to_numpy=True)
+        best = min(best, time.perf_counter() - start)
+    return best, np.asarray(embeddings, dtype=np.float32)
+
+def main():
+    parser = argparse.ArgumentParser(description="Length-bucketed batching benchmark.")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="Embedding model (name or local path).")
+    parser.add_argument("--sentences", type=int, default=5000)
+    parser.add_argument("--text_file", default=None, help="Real sentences, one per line, instead of synthetic ones.")
+    parser.add_argument("--batch_size", type=int, default=128, help="Size of the fixed batches.")
+    parser.add_argument("--token_budgets", type=int, nargs="+", default=[4096, 8192, 16384])
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions; the fastest run is reported.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    sentences = load_sentences(args)
+    model = SimilarityAnalyzer({"embedding_model": args.model, "similarity_threshold": 0.75}).model
+
+    fixed_seconds, reference = time_encode(model, sentences, args.batch_size, args.repeat)
+    probe = LengthBucketedEncoder(model, args.token_budgets[0])
+    lengths = token_lengths(sentences, probe.tokenizer, probe.max_seq_length)
+    fixed = fixed_batches(sentences, args.batch_size)
+    results = [{"batching": f"fixed {args.batch_size}", "batches": len(fixed),
+                "padding_waste": 1 - lengths.sum() / padded_tokens(lengths, fixed),
+                "sentences_per_sec": len(sentences) / fixed_seconds, "speedup": 1.0, "max_abs_error": 0.0}]
+    for budget in args.token_budgets:
+        encoder = LengthBucketedEncoder(model, budget)
+        seconds, embeddings = time_encode(encoder, sentences, args.batch_size, args.repeat)
+        results.append({
+            "batching": f"budget {budget}",
+            "batches": encoder.last_num_batches,
+            "padding_waste": encoder.padding_stats()["padding_waste"],
+            "sentences_per_sec": len(sentences) / seconds,
+            "speedup": fixed_seconds / seconds,
+            "max_abs_error": float(np.abs(embeddings - reference).max()),
+        })
+
+    print(f"\n{'batching':<14} {'batches':>8} {'padding':>8} {'sent/s':>9} {'speedup':>8} {'max err':>9}")
+    for r in results:
+        print(f"{r['batching']:<14} {r['batches']:>8} {r['padding_waste']:>8.1%} {r['sentences_per_sec']:>9.1f} "
+              f"{r['speedup']:>7.2f}x {r['max_abs_error']:>9.2e}")
+    print(f"{len(sentences)} sentences, {int(lengths.sum())} tokens (mean {lengths.mean():.1f}, max {lengths.max()}).")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+        print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,17 @@
 
 from pipeline.data_loader import load_config, load_source_document
 from pipeline.arxiv_fetcher import search_arxiv_papers
-from utils.text_utils import extract_text_from_pdf, split_into_sentences
+from arxiv_common.metadata_store import MetadataStore
+from arxiv_common.async_fetcher import set_default_http_cache
+from arxiv_common.http_cache import http_cache_from_config
+from utils.text_utils import split_into_sentences
+from arxiv_common.profiling import RunProfiler
 from pipeline.similarity_analyzer import SimilarityAnalyzer # Updated import
 from pipeline.reporting import generate_report
+from pipeline.batch import collect_source_paths, run_batch
+from pipeline.ingest import load_corpus_documents
+from pipeline.rescore import rescore, save_artifacts
+import argparse
 import glob
 import os
 
@@ -14,34 +22,58 @@ def run_pipeline():
     """
     # 1. Load Configuration
     config = load_config('configs/config.yaml')
+    profiler = RunProfiler("semantic-similarity-pipeline")
+    profiler.annotate(
+        embedding_model=config['embedding_model'],
+        pdf_backend=config.get('pdf_backend', 'pymupdf')
+    )
 
     # 2. Load and Process Source Document
-    source_doc_title, source_doc_abstract = extract_text_from_pdf(config['input_doc_path'])
-    source_sentences = split_into_sentences(source_doc_abstract)
+    with profiler.stage("load_source") as stage:
+        source_doc = load_source_document(
+            config['input_doc_path'],
+            parse_cache_dir=config.get('parse_cache_dir'),
+            pdf_backend=config.get('pdf_backend', 'pymupdf')
+        )
+        source_doc_title, source_doc_abstract = source_doc['title'], source_doc['abstract']
+        source_sentences = source_doc['sentences']
+        stage.count(documents=1, sentences=len(source_sentences))
 
     # 3. Build Corpus: Either from arXiv or a local directory
-    if config.get('use_arxiv_corpus', False):
-        arxiv_results = search_arxiv_papers( # This function is now correctly defined in arxiv_fetcher
-            query=source_doc_title,
-            max_results=config['max_arxiv_results']
-        )
-        # Process arXiv results in-memory
-        corpus_docs = []
-        for result in arxiv_results:
-            # Exclude the source paper itself if it's found on arXiv
-            if result.get_short_id() not in config['input_doc_path']:
-                corpus_docs.append({
-                    "title": result.title,
-                    "abstract": result.summary,
-                    "sentences": split_into_sentences(result.summary),
-                    "path": result.pdf_url # Use the URL as a unique identifier
-                })
-    else:
-        print("\nUsing local corpus directory.")
-        corpus_dir = config.get('corpus_dir', 'data/corpus/')
-        corpus_paths = glob.glob(os.path.join(corpus_dir, "*.pdf"))
-        corpus_paths = [p for p in corpus_paths if os.path.abspath(p) != os.path.abspath(config['input_doc_path'])]
-        corpus_docs = [load_source_document(p) for p in corpus_paths]
+    with profiler.stage("build_corpus") as stage:
+        if config.get('use_arxiv_corpus', False):
+            store = MetadataStore(config['metadata_store_path']) if config.get('metadata_store_path') else None
+            arxiv_results = search_arxiv_papers( # This function is now correctly defined in arxiv_fetcher
+                query=source_doc_title,
+                max_results=config['max_arxiv_results'],
+                store=store,
+                offline=config.get('offline_mode', False)
+            )
+            # Process arXiv results in-memory
+            corpus_docs = []
+            for result in arxiv_results:
+                # Exclude the source paper itself if it's found on arXiv
+                if result.get_short_id() not in config['input_doc_path']:
+                    corpus_docs.append({
+                        "title": result.title,
+                        "abstract": result.summary,
+                        "sentences": split_into_sentences(result.summary),
+                        "path": result.pdf_url # Use the URL as a unique identifier
+                    })
+            stage.count(papers_fetched=len(arxiv_results))
+        else:
+            print("\nUsing local corpus directory.")
+            corpus_dir = config.get('corpus_dir', 'data/corpus/')
+            corpus_paths = glob.glob(os.path.join(corpus_dir, "*.pdf"))
+            corpus_paths = [p for p in corpus_paths if os.path.abspath(p) != os.path.abspath(config['input_doc_path'])]
+            corpus_docs = load_corpus_documents(
+                corpus_paths,
+                workers=config.get('ingest_workers'),
+                parse_cache_dir=config.get('parse_cache_dir'),
+                pdf_backend=config.get('pdf_backend', 'pymupdf')
+            )
+            stage.count(pdfs=len(corpus_paths))
+        stage.count(papers=len(corpus_docs), sentences=sum(len(doc['sentences']) for doc in corpus_docs))
 
     source_doc_processed = {
         "title": source_doc_title,
@@ -51,19 +83,66 @@ def run_pipeline():
     }
 
     # 4. Analyze for Similarity
-    analyzer = SimilarityAnalyzer(config)
-    findings = analyzer.find_similar_sentences(source_doc_processed, corpus_docs)
+    with profiler.stage("load_model"):
+        analyzer = SimilarityAnalyzer(config)
+    # The analyzer resolves the encode mode's default, so record the mode it actually uses.
+    profiler.annotate(corpus_encode_mode=analyzer.corpus_encode_mode)
+    with profiler.stage("similarity") as stage:
+        findings = analyzer.find_similar_sentences(source_doc_processed, corpus_docs)
+        stage.count(
+            encoded_sentences=analyzer.encoded_sentences,
+            encode_batches=analyzer.encode_batches,
+            findings=len(findings)
+        )
+    analyzer.close()
+
+    # Keep the similarity matrix so threshold changes can be re-scored without a full run
+    if config.get('artifacts_dir') and analyzer.similarity_matrix is not None:
+        with profiler.stage("save_artifacts"):
+            save_artifacts(
+                config['artifacts_dir'], source_doc_processed, corpus_docs,
+                analyzer.similarity_matrix, analyzer.doc_offsets, config['embedding_model']
+            )
 
     # 5. Generate Report
-    if findings:
-        generate_report(config, source_doc_processed, findings)
-    else:
-        print("No significant similarities found based on the configured threshold.")
+    with profiler.stage("report") as stage:
+        if findings:
+            generate_report(config, source_doc_processed, findings)
+            stage.count(findings=len(findings))
+        else:
+            print("No significant similarities found based on the configured threshold.")
+
+    # 6. Save the run profile next to the report
+    profile_path = os.path.join(config['output_dir'], "run_profile.json")
+    profiler.save(profile_path)
+    profiler.report()
+    print(f"Run profile saved to {profile_path}")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Semantic similarity pipeline.")
+    parser.add_argument(
+        "--batch",
+        type=str,
+        help="Directory of source PDFs, or a manifest (.txt with one path per line, or a .json list), to analyze in one run."
+    )
+    parser.add_argument(
+        "--rescore",
+        action="store_true",
+        help="Re-apply the threshold and findings settings to the last run's saved artifacts and regenerate the report."
+    )
+    args = parser.parse_args()
+
     config = load_config('configs/config.yaml')
-    if not os.path.exists(config['input_doc_path']):
+    http_cache = http_cache_from_config(config)
+    set_default_http_cache(http_cache)
+    if args.rescore:
+        rescore(config)
+    elif args.batch:
+        run_batch(config, collect_source_paths(args.batch))
+    elif not os.path.exists(config['input_doc_path']):
         print(f"Error: Input file not found at '{config['input_doc_path']}'.")
         print("Please add a PDF file to that location or update 'configs/config.yaml'.")
     else:
         run_pipeline()
+    if http_cache is not None:
+        http_cache.report()
\ No newline at end of file
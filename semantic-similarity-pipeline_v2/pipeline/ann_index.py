@@ -0,0 +1,202 @@
+# pipeline/ann_index.py
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalizes rows so that inner product equals cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+def corpus_fingerprint(corpus_docs: List[Dict[str, Any]], model_name: str) -> str:
+    """Identifies a corpus and embedding model, so a stale index is rebuilt rather than reused."""
+    digest = hashlib.sha1(model_name.encode('utf-8'))
+    for doc in corpus_docs:
+        digest.update(str(doc['path']).encode('utf-8'))
+        for sentence in doc.get('sentences') or []:
+            digest.update(b'\0')
+            digest.update(sentence.encode('utf-8'))
+        digest.update(b'\1')
+    return digest.hexdigest()
+
+def _spherical_kmeans(vectors: np.ndarray, nlist: int, iterations: int, seed: int, chunk: int = 65536) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = _assign(vectors, centroids, chunk)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, vectors)
+        empty = np.bincount(assignment, minlength=nlist) == 0
+        # Re-seed empty lists from random points instead of leaving dead centroids.
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+        centroids = normalize(sums)
+    return centroids
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 65536) -> np.ndarray:
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk):
+        assignment[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+    return assignment
+
+class SentenceIndex:
+    """
+    Approximate nearest-neighbour index over normalized corpus sentence embeddings.
+
+    Two methods are supported:
+    - 'ivf': an inverted-file index in plain numpy. Vectors are clustered with spherical
+      k-means and stored grouped by list, so a query only scans the `nprobe` closest
+      lists. The arrays are saved as .npy files and loaded with mmap.
+    - 'hnsw': a faiss HNSW graph (requires faiss-cpu).
+
+    Each indexed row records which document and sentence it came from; the documents
+    are stored alongside the index so results can be turned back into findings.
+    """
+    def __init__(self, method: str, docs: List[Dict[str, Any]], rows: np.ndarray, fingerprint: str = "",
+                 nprobe: int = 16, vectors: Optional[np.ndarray] = None, centroids: Optional[np.ndarray] = None,
+                 list_offsets: Optional[np.ndarray] = None, list_ids: Optional[np.ndarray] = None, faiss_index=None):
+        self.method = method
+        self.docs = docs
+        self.rows = rows
+        self.fingerprint = fingerprint
+        self.nprobe = nprobe
+        self.vectors = vectors
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+        self.faiss_index = faiss_index
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def build(cls, embeddings: np.ndarray, docs: List[Dict[str, Any]], rows: np.ndarray, method: str = 'ivf',
+              nlist: Optional[int] = None, nprobe: int = 16, hnsw_m: int = 32, fingerprint: str = "",
+              kmeans_iterations: int = 10, seed: int = 0) -> 'SentenceIndex':
+        """
+        Builds an index.
+
+        Args:
+            embeddings (np.ndarray): Corpus sentence embeddings, one row per sentence.
+            docs (List[Dict[str, Any]]): Documents with 'title', 'path' and 'sentences'.
+            rows (np.ndarray): (doc index, sentence index) for every embedding row.
+            method (str): 'ivf' or 'hnsw'.
+            nlist (Optional[int]): Number of IVF lists; defaults to about sqrt(N).
+            nprobe (int): IVF lists scanned per query.
+            hnsw_m (int): HNSW graph degree.
+            fingerprint (str): Identifier of the corpus the index was built from.
+
+        Returns:
+            The built SentenceIndex.
+        """
+        vectors = normalize(embeddings)
+        docs = [{'title': d['title'], 'path': d['path'], 'sentences': d.get('sentences') or []} for d in docs]
+        rows = np.asarray(rows, dtype=np.int64).reshape(-1, 2)
+
+        if method == 'hnsw':
+            if faiss is None:
+                raise ImportError("The 'hnsw' ANN method requires faiss-cpu (pip install faiss-cpu).")
+            index = faiss.IndexHNSWFlat(vectors.shape[1], hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            index.add(vectors)
+            return cls('hnsw', docs, rows, fingerprint, nprobe, faiss_index=index)
+
+        if method != 'ivf':
+            raise ValueError(f"Unknown ANN method '{method}'. Use 'ivf' or 'hnsw'.")
+        nlist = nlist or max(1, int(np.sqrt(len(vectors))))
+        nlist = min(nlist, len(vectors))
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(vectors), 256 * nlist)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = _spherical_kmeans(sample, nlist, kmeans_iterations, seed)
+        assignment = _assign(vectors, centroids)
+        order = np.argsort(assignment, kind='stable')
+        list_offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=nlist))])
+        return cls('ivf', docs, rows, fingerprint, nprobe, vectors=vectors[order], centroids=centroids,
+                   list_offsets=list_offsets, list_ids=order)
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        if self.method == 'hnsw':
+            faiss.write_index(self.faiss_index, os.path.join(directory, 'hnsw.faiss'))
+        else:
+            np.save(os.path.join(directory, 'vectors.npy'), self.vectors)
+            np.save(os.path.join(directory, 'centroids.npy'), self.centroids)
+            np.save(os.path.join(directory, 'list_offsets.npy'), self.list_offsets)
+            np.save(os.path.join(directory, 'list_ids.npy'), self.list_ids)
+        np.save(os.path.join(directory, 'rows.npy'), self.rows)
+        with open(os.path.join(directory, 'docs.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.docs, f, ensure_ascii=False)
+        with open(os.path.join(directory, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump({'method': self.method, 'fingerprint': self.fingerprint, 'nprobe': self.nprobe, 'size': len(self)}, f)
+
+    @classmethod
+    def load(cls, directory: str) -> 'SentenceIndex':
+        """Loads a saved index; the large arrays are memory-mapped rather than read into RAM."""
+        with open(os.path.join(directory, 'index.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(os.path.join(directory, 'docs.json'), 'r', encoding='utf-8') as f:
+            docs = json.load(f)
+        rows = np.load(os.path.join(directory, 'rows.npy'), mmap_mode='r')
+        if meta['method'] == 'hnsw':
+            if faiss is None:
+                raise ImportError("This index was built with faiss HNSW; install faiss-cpu to load it.")
+            index = faiss.read_index(os.path.join(directory, 'hnsw.faiss'))
+            return cls('hnsw', docs, rows, meta['fingerprint'], meta['nprobe'], faiss_index=index)
+        return cls(
+            'ivf', docs, rows, meta['fingerprint'], meta['nprobe'],
+            vectors=np.load(os.path.join(directory, 'vectors.npy'), mmap_mode='r'),
+            centroids=np.load(os.path.join(directory, 'centroids.npy')),
+            list_offsets=np.load(os.path.join(directory, 'list_offsets.npy')),
+            list_ids=np.load(os.path.join(directory, 'list_ids.npy'), mmap_mode='r')
+        )
+
+    @staticmethod
+    def read_fingerprint(directory: str) -> Optional[str]:
+        path = os.path.join(directory, 'index.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('fingerprint')
+
+    def search(self, queries: np.ndarray, k: int, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Finds the `k` nearest indexed sentences for each query.
+
+        Args:
+            queries (np.ndarray): Query embeddings, one row per query.
+            k (int): Neighbours to return per query.
+            nprobe (Optional[int]): IVF lists to scan; defaults to the index setting.
+
+        Returns:
+            (scores, ids), both of shape (queries, k), best first. Missing neighbours have id -1.
+        """
+        queries = normalize(queries)
+        if self.method == 'hnsw':
+            self.faiss_index.hnsw.efSearch = max(self.faiss_index.hnsw.efSearch, 2 * k)
+            scores, ids = self.faiss_index.search(queries, k)
+            return scores, ids.astype(np.int64)
+
+        nprobe = min(nprobe or self.nprobe, len(self.centroids))
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+        for q, lists in enumerate(probes):
+            candidates = np.concatenate([np.arange(self.list_offsets[l], self.list_offsets[l + 1]) for l in lists])
+            if len(candidates) == 0:
+                continue
+            candidate_scores = np.asarray(self.vectors[candidates]) @ queries[q]
+            top = min(k, len(candidates))
+            best = np.argpartition(-candidate_scores, top - 1)[:top]
+            best = best[np.argsort(-candidate_scores[best], kind='stable')]
+            scores[q, :top] = candidate_scores[best]
+            ids[q, :top] = np.asarray(self.list_ids[candidates[best]])
+        return scores, ids
@@ -2,10 +2,13 @@
 
 import arxiv
 import os
-from typing import List
+from typing import List, Optional
 import logging
 
-def search_arxiv_papers(query: str, max_results: int) -> List[arxiv.Result]:
+from arxiv_common.async_fetcher import fetch_results
+from arxiv_common.metadata_store import MetadataStore, search_with_store
+
+def search_arxiv_papers(query: str, max_results: int, store: Optional[MetadataStore] = None, offline: bool = False) -> List[arxiv.Result]:
     """
     Searches arXiv for a given query and returns the result objects containing
     metadata like title and abstract.
@@ -13,17 +16,20 @@ def search_arxiv_papers(query: str, max_results: int) -> List[arxiv.Result]:
     Args:
         query (str): The search query (e.g., a paper title).
         max_results (int): The maximum number of papers to download.
+        store (Optional[MetadataStore]): Local metadata store. When given, the query is
+            answered locally and only papers updated since the last sync are fetched.
+        offline (bool): Answer from the local store without touching the network.
 
     Returns:
         A list of arxiv.Result objects.
     """
     print(f"\nSearching arXiv for query: '{query}'...")
-    search = arxiv.Search(
-        query=query,
-        max_results=max_results,
-        sort_by=arxiv.SortCriterion.Relevance
-    )
-
-    results = list(search.results())
+    if store is not None:
+        results = search_with_store(store, query, max_results, offline=offline)
+    elif offline:
+        raise ValueError("Offline mode requires a local metadata store ('metadata_store_path').")
+    else:
+        # Pages are streamed by the rate-limited async fetcher, sorted by relevance.
+        results = fetch_results(query, max_results)
     print(f"Found {len(results)} relevant papers on arXiv.")
     return results
\ No newline at end of file
@@ -0,0 +1,217 @@
+# pipeline/batch.py
+
+import glob
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from pipeline.arxiv_fetcher import search_arxiv_papers
+from pipeline.data_loader import load_source_document
+from pipeline.ingest import load_corpus_documents
+from arxiv_common.metadata_store import MetadataStore
+from pipeline.reporting import generate_report
+from pipeline.similarity_analyzer import SimilarityAnalyzer
+from arxiv_common.profiling import RunProfiler
+from utils.text_utils import split_into_sentences
+
+def collect_source_paths(batch_input: str) -> List[str]:
+    """
+    Resolves the batch input into a list of source PDF paths.
+
+    Args:
+        batch_input (str): A directory of PDFs, or a manifest file: a .txt file with one
+            path per line or a .json file holding a list of paths. Relative manifest
+            entries are resolved against the manifest's directory.
+
+    Returns:
+        The source document paths, in order.
+    """
+    if os.path.isdir(batch_input):
+        return sorted(glob.glob(os.path.join(batch_input, "*.pdf")))
+
+    base_dir = os.path.dirname(os.path.abspath(batch_input))
+    with open(batch_input, 'r', encoding='utf-8') as f:
+        if batch_input.lower().endswith('.json'):
+            entries = json.load(f)
+        else:
+            entries = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+    return [entry if os.path.isabs(entry) else os.path.join(base_dir, entry) for entry in entries]
+
+def _normalize_query(title: str) -> str:
+    return re.sub(r'\s+', ' ', title).strip().lower()
+
+def _build_arxiv_corpus(config: Dict[str, Any], source_docs: List[Dict[str, Any]]):
+    """
+    Runs one arXiv search per distinct source title and merges the results.
+
+    Returns:
+        The union corpus and, for each source, the set of corpus paths its own query returned.
+    """
+    store = MetadataStore(config['metadata_store_path']) if config.get('metadata_store_path') else None
+    queries = {}
+    for doc in source_docs:
+        queries.setdefault(_normalize_query(doc['title']), doc['title'])
+    print(f"{len(source_docs)} source documents need {len(queries)} distinct arXiv queries.")
+
+    corpus_docs, seen_ids, paths_by_query = [], {}, {}
+    for key, query in queries.items():
+        results = search_arxiv_papers(
+            query=query,
+            max_results=config['max_arxiv_results'],
+            store=store,
+            offline=config.get('offline_mode', False)
+        )
+        paths = set()
+        for result in results:
+            short_id = result.get_short_id()
+            if short_id not in seen_ids:
+                seen_ids[short_id] = result.pdf_url
+                corpus_docs.append({
+                    "title": result.title,
+                    "abstract": result.summary,
+                    "sentences": split_into_sentences(result.summary),
+                    "path": result.pdf_url,
+                    "arxiv_id": short_id
+                })
+            paths.add(seen_ids[short_id])
+        paths_by_query[key] = paths
+
+    own_paths = [paths_by_query[_normalize_query(doc['title'])] for doc in source_docs]
+    return corpus_docs, own_paths
+
+def _is_self_match(source_doc: Dict[str, Any], corpus_doc: Dict[str, Any]) -> bool:
+    if 'arxiv_id' in corpus_doc:
+        return corpus_doc['arxiv_id'] in source_doc['path']
+    return os.path.abspath(corpus_doc['path']) == os.path.abspath(source_doc['path'])
+
+def _output_dirs(output_dir: str, source_docs: List[Dict[str, Any]]) -> List[str]:
+    dirs, used = [], set()
+    for doc in source_docs:
+        stem = os.path.splitext(os.path.basename(doc['path']))[0]
+        name, suffix = stem, 2
+        while name in used:
+            name, suffix = f"{stem}_{suffix}", suffix + 1
+        used.add(name)
+        dirs.append(os.path.join(output_dir, name))
+    return dirs
+
+def run_batch(config: Dict[str, Any], source_paths: List[str], analyzer: Optional[SimilarityAnalyzer] = None) -> List[Dict[str, Any]]:
+    """
+    Analyzes many source documents in one run.
+
+    The embedding model is loaded once, overlapping arXiv queries are issued once, the
+    union corpus is embedded once and all sources are scored against it together. Each
+    source gets its own findings JSON and PDF report under `output_dir/<source name>/`,
+    and a summary of the whole batch is written to `output_dir/batch_summary.json`, with
+    per-stage timings in `output_dir/run_profile.json`.
+
+    With `batch_corpus_scope: 'own'` (the default) a source is only matched against the
+    papers its own arXiv query returned, as in a single run; 'union' matches it against
+    the whole batch corpus.
+
+    Args:
+        config (Dict[str, Any]): The configuration dictionary.
+        source_paths (List[str]): Paths of the source PDFs.
+        analyzer (Optional[SimilarityAnalyzer]): An analyzer to reuse; one is created if omitted.
+
+    Returns:
+        The per-source summary entries.
+    """
+    profiler = RunProfiler("semantic-similarity-pipeline batch")
+    profiler.annotate(
+        embedding_model=config['embedding_model'],
+        pdf_backend=config.get('pdf_backend', 'pymupdf')
+    )
+    summary, source_docs = [], []
+    with profiler.stage("load_sources") as stage:
+        for path in source_paths:
+            try:
+                source_docs.append(load_source_document(
+                    path,
+                    parse_cache_dir=config.get('parse_cache_dir'),
+                    pdf_backend=config.get('pdf_backend', 'pymupdf')
+                ))
+            except (ValueError, RuntimeError, OSError) as e:
+                print(f"Skipping {path}: {e}")
+                summary.append({"path": path, "error": str(e)})
+        stage.count(documents=len(source_docs), sentences=sum(len(doc['sentences']) for doc in source_docs))
+    if not source_docs:
+        print("No source documents could be loaded.")
+        return summary
+
+    scope = config.get('batch_corpus_scope', 'own')
+    with profiler.stage("build_corpus") as stage:
+        if config.get('use_arxiv_corpus', False):
+            corpus_docs, own_paths = _build_arxiv_corpus(config, source_docs)
+        else:
+            corpus_dir = config.get('corpus_dir', 'data/corpus/')
+            corpus_docs = load_corpus_documents(
+                sorted(glob.glob(os.path.join(corpus_dir, "*.pdf"))),
+                workers=config.get('ingest_workers'),
+                skip_errors=True,
+                parse_cache_dir=config.get('parse_cache_dir'),
+                pdf_backend=config.get('pdf_backend', 'pymupdf')
+            )
+            own_paths = [None] * len(source_docs)
+        stage.count(papers=len(corpus_docs), sentences=sum(len(doc['sentences']) for doc in corpus_docs))
+    print(f"Batch corpus holds {len(corpus_docs)} unique documents.")
+
+    owns_analyzer = analyzer is None
+    with profiler.stage("load_model"):
+        analyzer = analyzer or SimilarityAnalyzer(config)
+    profiler.annotate(corpus_encode_mode=analyzer.corpus_encode_mode)
+    # Each source leaves out its own paper and, in 'own' scope, the papers its own query
+    # did not return; they are masked before findings are selected.
+    excluded_docs = [
+        [
+            d for d, corpus_doc in enumerate(corpus_docs)
+            if (scope != 'union' and allowed is not None and corpus_doc['path'] not in allowed)
+            or _is_self_match(source_doc, corpus_doc)
+        ]
+        for source_doc, allowed in zip(source_docs, own_paths)
+    ]
+    with profiler.stage("similarity") as stage:
+        encoded_before, batches_before = analyzer.encoded_sentences, analyzer.encode_batches
+        all_findings = analyzer.find_similar_sentences_batch(source_docs, corpus_docs, excluded_docs)
+        stage.count(
+            encoded_sentences=analyzer.encoded_sentences - encoded_before,
+            encode_batches=analyzer.encode_batches - batches_before,
+            findings=sum(len(findings) for findings in all_findings)
+        )
+    if owns_analyzer:
+        analyzer.close()
+
+    output_dir = config['output_dir']
+    with profiler.stage("reports") as stage:
+        for source_doc, findings, source_output_dir in zip(source_docs, all_findings, _output_dirs(output_dir, source_docs)):
+            os.makedirs(source_output_dir, exist_ok=True)
+            with open(os.path.join(source_output_dir, "findings.json"), 'w', encoding='utf-8') as f:
+                json.dump(findings, f, indent=4, ensure_ascii=False)
+
+            report_path = None
+            if findings:
+                generate_report({**config, 'output_dir': source_output_dir}, source_doc, findings)
+                report_path = os.path.join(source_output_dir, "similarity_report.pdf")
+
+            summary.append({
+                "path": source_doc['path'],
+                "title": source_doc['title'],
+                "num_sentences": len(source_doc['sentences']),
+                "num_findings": len(findings),
+                "num_similar_sources": len({f['source_paper_path'] for f in findings}),
+                "max_similarity": max((f['similarity_score'] for f in findings), default=0.0),
+                "findings_path": os.path.join(source_output_dir, "findings.json"),
+                "report_path": report_path
+            })
+        stage.count(reports=sum(1 for entry in summary if entry.get('report_path')))
+
+    summary_path = os.path.join(output_dir, "batch_summary.json")
+    os.makedirs(output_dir, exist_ok=True)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=4, ensure_ascii=False)
+    flagged = sum(1 for entry in summary if entry.get('num_findings'))
+    print(f"Batch complete: {flagged} of {len(source_paths)} documents have similar content. Summary saved to {summary_path}")
+    profiler.save(os.path.join(output_dir, "run_profile.json"))
+    profiler.report()
+    return summary
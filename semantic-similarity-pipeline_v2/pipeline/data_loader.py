@@ -1,27 +1,48 @@
 # pipeline/data_loader.py
 
 import yaml
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from utils.text_utils import extract_text_from_pdf, split_into_sentences
+from arxiv_common.parse_cache import ParseCache
+
+# Bump this whenever the PDF backends, extract_text_from_pdf or split_into_sentences change
+# behaviour, so entries written by the old heuristics are no longer served. Each backend
+# gets its own subdirectory, since their extracted text differs.
+PARSER_VERSION = "first-page-1"
 
 def load_config(config_path: str) -> Dict[str, Any]:
     """Loads the YAML configuration file."""
     with open(config_path, 'r') as f:
         return yaml.safe_load(f)
 
-def load_source_document(doc_path: str) -> Dict[str, Any]:
+def load_source_document(doc_path: str, parse_cache_dir: Optional[str] = None, pdf_backend: str = "pymupdf") -> Dict[str, Any]:
     """
     Loads the source document and prepares it for analysis.
     
     Args:
         doc_path (str): Path to the source PDF.
+        parse_cache_dir (Optional[str]): Directory of the parsed-PDF cache. When given,
+            a PDF whose contents were parsed before is not parsed again.
+        pdf_backend (str): The PDF text extractor, 'pymupdf' or 'pypdf'.
 
     Returns:
         A dictionary with the paper's title, abstract, and sentences.
     """
+    cache = ParseCache(parse_cache_dir, PARSER_VERSION, variant=pdf_backend) if parse_cache_dir else None
+    cached = cache.get(doc_path) if cache else None
+    if cached is not None:
+        return {
+            "title": cached["title"],
+            "abstract": cached["abstract"],
+            "sentences": cached["sentences"],
+            "path": doc_path
+        }
+
     print(f"Loading and processing source document: {doc_path}")
-    title, abstract = extract_text_from_pdf(doc_path)
+    title, abstract = extract_text_from_pdf(doc_path, backend=pdf_backend)
     sentences = split_into_sentences(abstract)
+    if cache:
+        cache.put(doc_path, {"title": title, "abstract": abstract, "sentences": sentences})
     
     return {
         "title": title,
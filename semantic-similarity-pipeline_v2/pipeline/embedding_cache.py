@@ -0,0 +1,158 @@
+# pipeline/embedding_cache.py
+
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+class EmbeddingCache:
+    """
+    Persistent on-disk store of sentence embeddings.
+
+    Each (embedding model, pooling mode) pair gets its own directory holding a
+    float32 matrix (`embeddings.f32`, appended to as new sentences are encoded and
+    read back through a memory map) and a sidecar index (`index.json`) that maps the
+    hash of a normalized sentence to its row in the matrix.
+
+    Vectors reach the matrix before the index is rewritten, which happens once every
+    `flush_every` new rows and on `save()`. Rows the index does not know about (left by
+    a process that died in between) are truncated away on load, so row ids always
+    match file offsets.
+    """
+    MATRIX_FILE = "embeddings.f32"
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: str, model_name: str, pooling_mode: str, dim: int, flush_every: int = 4096):
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.directory = os.path.join(cache_dir, f"{slug}__{pooling_mode}")
+        self.model_name = model_name
+        self.pooling_mode = pooling_mode
+        self.dim = dim
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self._rows: Dict[str, int] = {}
+        self._unsaved = 0
+        self._matrix: Optional[np.memmap] = None
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def key(sentence: str) -> str:
+        """Hashes a sentence after collapsing whitespace, so re-wrapped text still hits."""
+        normalized = re.sub(r'\s+', ' ', sentence).strip()
+        return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _load_index(self):
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        if not os.path.exists(index_path):
+            # Rows appended before the first index write are unreachable; drop them.
+            self._check_matrix()
+            return
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('dim') != self.dim:
+            # A different model revision wrote this directory; start over rather
+            # than hand back vectors of the wrong shape.
+            print(f"Embedding cache at {self.directory} has dim {index.get('dim')}, expected {self.dim}. Ignoring it.")
+            self._reset_files()
+            return
+        self._rows = index['rows']
+        self._check_matrix()
+
+    def _check_matrix(self):
+        """Truncates the matrix to the rows the index knows, dropping entries the file lacks."""
+        matrix_path = os.path.join(self.directory, self.MATRIX_FILE)
+        row_bytes = self.dim * np.dtype(np.float32).itemsize
+        size = os.path.getsize(matrix_path) if os.path.exists(matrix_path) else 0
+        on_disk = size // row_bytes
+        if on_disk < len(self._rows):
+            print(f"Embedding cache at {self.directory} is missing {len(self._rows) - on_disk} rows. Dropping them.")
+            self._rows = {key: row for key, row in self._rows.items() if row < on_disk}
+            self.save()
+        expected = len(self._rows) * row_bytes
+        if size != expected:
+            print(f"Embedding cache at {self.directory} has {(size - expected) / row_bytes:.0f} unindexed rows. Truncating them.")
+            with open(matrix_path, 'r+b') as f:
+                f.truncate(expected)
+
+    def _reset_files(self):
+        for name in (self.MATRIX_FILE, self.INDEX_FILE):
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _open_matrix(self) -> Optional[np.memmap]:
+        if self._matrix is None and self._rows:
+            self._matrix = np.memmap(
+                os.path.join(self.directory, self.MATRIX_FILE),
+                dtype=np.float32,
+                mode='r',
+                shape=(len(self._rows), self.dim)
+            )
+        return self._matrix
+
+    def lookup(self, keys: List[str]) -> Tuple[Dict[int, np.ndarray], List[int]]:
+        """
+        Looks up a batch of sentence keys.
+
+        Args:
+            keys (List[str]): Keys produced by `EmbeddingCache.key`.
+
+        Returns:
+            A tuple of (position -> cached vector) for the hits and the list of
+            positions that still need to be encoded.
+        """
+        matrix = self._open_matrix()
+        found, missing = {}, []
+        for pos, key in enumerate(keys):
+            row = self._rows.get(key)
+            if row is None:
+                missing.append(pos)
+            else:
+                found[pos] = np.asarray(matrix[row])
+        self.hits += len(found)
+        self.misses += len(missing)
+        return found, missing
+
+    def add(self, keys: List[str], embeddings: np.ndarray):
+        """
+        Appends newly encoded vectors to the matrix and records their rows. The index is
+        written once `flush_every` rows are pending; call `save()` when done encoding.
+        """
+        # A key repeated within `keys` is written once, so every row stays at its own position.
+        new = {}
+        for key, vec in zip(keys, embeddings):
+            if key not in self._rows and key not in new:
+                new[key] = vec
+        if not new:
+            return
+        with open(os.path.join(self.directory, self.MATRIX_FILE), 'ab') as f:
+            for key, vec in new.items():
+                f.write(np.ascontiguousarray(vec, dtype=np.float32).tobytes())
+                self._rows[key] = len(self._rows)
+        # The mapped view has a fixed shape; re-open it on the next lookup.
+        self._matrix = None
+        self._unsaved += len(new)
+        if self._unsaved >= self.flush_every:
+            self.save()
+
+    def save(self):
+        """Writes the sidecar index atomically so a crash never leaves it half-written."""
+        self._unsaved = 0
+        index_path = os.path.join(self.directory, self.INDEX_FILE)
+        tmp_path = index_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "model": self.model_name,
+                "pooling_mode": self.pooling_mode,
+                "dim": self.dim,
+                "rows": self._rows
+            }, f)
+        os.replace(tmp_path, index_path)
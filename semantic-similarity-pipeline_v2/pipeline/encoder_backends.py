@@ -0,0 +1,260 @@
+# pipeline/encoder_backends.py
+
+import copy
+import inspect
+import os
+import re
+from typing import Dict, List, Optional, Type
+
+import numpy as np
+import torch
+from sentence_transformers import SentenceTransformer, models
+
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+# Short, varied sentences used to check a backend against the PyTorch model it was built from.
+PARITY_SENTENCES = [
+    "We propose a transformer model for continuous sign language recognition.",
+    "The results show a significant improvement over previous methods.",
+    "Data were collected from 120 participants over six months.",
+    "In this paper, we study the convergence of stochastic gradient descent on non-convex objectives, "
+    "and we derive bounds that hold under weaker smoothness assumptions than prior work.",
+    "Abstract",
+]
+
+class EncoderBackend:
+    """
+    Interface of a sentence-encoder backend.
+
+    A backend is built from a loaded SentenceTransformer (including the custom pooling set
+    up by `SimilarityAnalyzer._load_model`) and offers the same `encode` and
+    `get_sentence_embedding_dimension` methods, so it can stand in for the model.
+    Subclasses set `name`; register them with `register_backend` to make them selectable
+    through the `encoder_backend` config key.
+    """
+    name = ""
+
+    def __init__(self, model: SentenceTransformer, model_name: str, cache_dir: Optional[str] = None):
+        self.model = model
+
+    @classmethod
+    def is_installed(cls) -> bool:
+        return True
+
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False, convert_to_numpy: bool = True,
+               convert_to_tensor: bool = False, device: Optional[str] = None, **kwargs):
+        raise NotImplementedError
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+_BACKENDS: Dict[str, Type[EncoderBackend]] = {}
+
+def register_backend(backend_cls: Type[EncoderBackend]) -> Type[EncoderBackend]:
+    """Registers an EncoderBackend subclass under its `name`; usable as a class decorator."""
+    _BACKENDS[backend_cls.name] = backend_cls
+    return backend_cls
+
+def available_backends() -> Dict[str, bool]:
+    """Maps every registered backend name to whether its libraries are installed."""
+    return {name: backend_cls.is_installed() for name, backend_cls in _BACKENDS.items()}
+
+def get_backend(name: str, model: SentenceTransformer, model_name: str, cache_dir: Optional[str] = None) -> EncoderBackend:
+    """
+    Builds the backend registered as `name` around a loaded model.
+
+    Args:
+        name (str): The backend name: 'torch', 'torch_int8' or 'onnx'.
+        model (SentenceTransformer): The loaded PyTorch model.
+        model_name (str): The model's name, used to key exported files.
+        cache_dir (Optional[str]): Where backends that export the model keep the result.
+
+    Returns:
+        EncoderBackend: The backend.
+    """
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown encoder backend '{name}'. Available backends: {', '.join(sorted(_BACKENDS))}.")
+    return _BACKENDS[name](model, model_name, cache_dir)
+
+def _to_output(embeddings: np.ndarray, single: bool, convert_to_tensor: bool, device: Optional[str]):
+    if single:
+        embeddings = embeddings[0]
+    if convert_to_tensor:
+        return torch.from_numpy(embeddings).to(device or 'cpu')
+    return embeddings
+
+def check_parity(reference: SentenceTransformer, backend: EncoderBackend, sentences: List[str] = PARITY_SENTENCES) -> Dict[str, float]:
+    """
+    Compares a backend's embeddings with the PyTorch model's on the same sentences.
+
+    Returns:
+        A dictionary with the lowest and mean cosine similarity between matching
+        embeddings and the largest absolute element difference.
+    """
+    expected = np.asarray(reference.encode(sentences, convert_to_numpy=True), dtype=np.float32)
+    actual = np.asarray(backend.encode(sentences, convert_to_numpy=True), dtype=np.float32)
+    cosines = (expected * actual).sum(axis=1) / (
+        np.linalg.norm(expected, axis=1) * np.linalg.norm(actual, axis=1) + 1e-12
+    )
+    return {
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean()),
+        "max_abs_error": float(np.abs(expected - actual).max()),
+    }
+
+@register_backend
+class TorchBackend(EncoderBackend):
+    """The PyTorch model itself (`SentenceTransformer.encode`)."""
+    name = "torch"
+
+    def encode(self, sentences, **kwargs):
+        return self.model.encode(sentences, **kwargs)
+
+@register_backend
+class TorchInt8Backend(EncoderBackend):
+    """
+    PyTorch dynamic quantization: the weights of every Linear layer are stored as int8
+    and activations are quantized on the fly. Pooling and normalization modules are left
+    untouched. CPU only.
+    """
+    name = "torch_int8"
+
+    def __init__(self, model: SentenceTransformer, model_name: str, cache_dir: Optional[str] = None):
+        self.model = torch.ao.quantization.quantize_dynamic(
+            copy.deepcopy(model).to('cpu'), {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    def encode(self, sentences, convert_to_tensor: bool = False, device: Optional[str] = None, **kwargs):
+        embeddings = self.model.encode(sentences, convert_to_tensor=convert_to_tensor, device='cpu', **kwargs)
+        return embeddings.to(device) if convert_to_tensor and device else embeddings
+
+def _pooling_mode(pooling: models.Pooling) -> str:
+    config = pooling.get_config_dict()
+    if isinstance(config.get('pooling_mode'), str):
+        return config['pooling_mode']
+    # Older sentence-transformers describe the pooling with one flag per mode.
+    for mode in ('cls', 'mean', 'max'):
+        key = 'pooling_mode_cls_token' if mode == 'cls' else f'pooling_mode_{mode}_tokens'
+        if config.get(key):
+            return mode
+    return 'unknown'
+
+@register_backend
+class OnnxBackend(EncoderBackend):
+    """
+    ONNX Runtime inference. The transformer is exported once to
+    `<cache_dir>/<model>/model.onnx`; tokenization (lower-casing when the model's
+    `do_lower_case` is set), pooling (CLS, mean or max, as configured in the model) and
+    normalization (a Normalize module, or `normalize_embeddings=True`) are applied around
+    the ONNX session. Requires onnxruntime, plus onnx for the export.
+    """
+    name = "onnx"
+
+    def __init__(self, model: SentenceTransformer, model_name: str, cache_dir: Optional[str] = None):
+        if onnxruntime is None:
+            raise ImportError("The 'onnx' encoder backend requires onnxruntime (pip install onnxruntime onnx).")
+        modules = list(model)
+        if not modules or not isinstance(modules[0], models.Transformer):
+            raise ValueError("The 'onnx' encoder backend needs a model whose first module is a Transformer.")
+        self.transformer = modules[0]
+        self.pooling_mode, self.normalize = None, False
+        for module in modules[1:]:
+            if isinstance(module, models.Pooling):
+                self.pooling_mode = _pooling_mode(module)
+            elif isinstance(module, models.Normalize):
+                self.normalize = True
+            else:
+                raise ValueError(f"The 'onnx' encoder backend does not support the {type(module).__name__} module.")
+        if self.pooling_mode not in ('cls', 'mean', 'max'):
+            raise ValueError(f"The 'onnx' encoder backend does not support '{self.pooling_mode}' pooling.")
+
+        self.tokenizer = model.tokenizer
+        self.max_seq_length = self.transformer.max_seq_length
+        self.do_lower_case = bool(getattr(self.transformer, 'do_lower_case', False))
+        self.dim = model.get_sentence_embedding_dimension()
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        path = os.path.join(cache_dir or os.path.join('data', 'cache', 'onnx'), slug, "model.onnx")
+        if not os.path.exists(path):
+            self._export(path)
+        self.session = onnxruntime.InferenceSession(path, providers=['CPUExecutionProvider'])
+        self.input_names = [node.name for node in self.session.get_inputs()]
+
+    def _export(self, path: str):
+        auto_model = copy.deepcopy(self.transformer.auto_model).to('cpu').eval()
+        input_names = [name for name in self.tokenizer.model_input_names
+                       if name in ('input_ids', 'attention_mask', 'token_type_ids')]
+
+        class TokenEmbeddings(torch.nn.Module):
+            def __init__(self, auto_model):
+                super().__init__()
+                self.auto_model = auto_model
+
+            def forward(self, *inputs):
+                return self.auto_model(**dict(zip(input_names, inputs)), return_dict=True).last_hidden_state
+
+        features = self.tokenizer(["onnx export"], return_tensors='pt')
+        dynamic_axes = {name: {0: 'batch', 1: 'tokens'} for name in input_names + ['token_embeddings']}
+        # torch >= 2.5 may default to the dynamo exporter, which handles dynamic_axes
+        # differently; older versions only have the TorchScript exporter and no flag.
+        options = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        print(f"Exporting the encoder to ONNX at {path}...")
+        # Export to a temporary file and move it into place, so an interrupted export
+        # never leaves a partial model.onnx that later runs would load.
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with torch.no_grad():
+                torch.onnx.export(
+                    TokenEmbeddings(auto_model), tuple(features[name] for name in input_names), tmp_path,
+                    input_names=input_names, output_names=['token_embeddings'], dynamic_axes=dynamic_axes,
+                    opset_version=17, **options
+                )
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _pool(self, token_embeddings: np.ndarray, attention_mask: np.ndarray, normalize: bool = False) -> np.ndarray:
+        if self.pooling_mode == 'cls':
+            pooled = token_embeddings[:, 0]
+        elif self.pooling_mode == 'mean':
+            mask = attention_mask[:, :, None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        else:
+            pooled = np.where(attention_mask[:, :, None] > 0, token_embeddings, -1e9).max(axis=1)
+        if self.normalize or normalize:
+            pooled = pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.astype(np.float32)
+
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False, convert_to_numpy: bool = True,
+               convert_to_tensor: bool = False, device: Optional[str] = None, normalize_embeddings: bool = False,
+               **kwargs):
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        embeddings = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        # Like SentenceTransformer.encode, batch sentences of similar length together.
+        order = sorted(range(len(sentences)), key=lambda k: len(sentences[k]), reverse=True)
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            # The same text preparation as models.Transformer.tokenize.
+            texts = [str(sentences[k]).strip() for k in rows]
+            if self.do_lower_case:
+                texts = [text.lower() for text in texts]
+            features = self.tokenizer(
+                texts, padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors='np'
+            )
+            inputs = {name: features[name].astype(np.int64) for name in self.input_names}
+            token_embeddings = self.session.run(None, inputs)[0]
+            embeddings[rows] = self._pool(token_embeddings, features['attention_mask'], normalize_embeddings)
+        return _to_output(embeddings, single, convert_to_tensor, device)
+
+    @classmethod
+    def is_installed(cls) -> bool:
+        return onnxruntime is not None
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
@@ -0,0 +1,111 @@
+# pipeline/ingest.py
+
+import os
+import time
+from collections import deque
+from functools import partial
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from pipeline.data_loader import load_source_document
+
+def _load_in_worker(path: str, parse_cache_dir: Optional[str] = None,
+                    pdf_backend: str = "pymupdf") -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    # Exceptions are returned rather than raised so that one bad PDF does not take
+    # down the whole pool; the parent decides whether to skip or re-raise.
+    try:
+        return path, load_source_document(path, parse_cache_dir=parse_cache_dir, pdf_backend=pdf_backend), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+class _Progress:
+    def __init__(self, total: int, every: int):
+        self.total = total
+        self.every = every
+        self.done = 0
+        self.failed = 0
+        self.start = time.perf_counter()
+
+    def update(self, failed: bool):
+        self.done += 1
+        self.failed += int(failed)
+        if self.done % self.every == 0 or self.done == self.total:
+            elapsed = time.perf_counter() - self.start
+            print(f"Ingested {self.done}/{self.total} PDFs ({self.failed} failed) "
+                  f"in {elapsed:.1f}s, {self.done / max(elapsed, 1e-9):.1f} docs/sec.")
+
+def iter_corpus_documents(
+    paths: List[str],
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    ordered: bool = True,
+    skip_errors: bool = False,
+    progress_every: int = 50,
+    parse_cache_dir: Optional[str] = None,
+    pdf_backend: str = "pymupdf",
+) -> Iterator[Dict[str, Any]]:
+    """
+    Loads corpus PDFs in a process pool and yields the processed documents.
+
+    Every document is produced by `load_source_document`, so the dictionaries are the
+    same as a serial loop would return. At most `max_in_flight` documents are queued or
+    waiting to be yielded at any time, which bounds memory for very large directories.
+
+    Args:
+        paths (List[str]): PDF paths to load.
+        workers (Optional[int]): Worker processes; None or 0 uses every core, 1 loads serially in-process.
+        max_in_flight (Optional[int]): Submission window; defaults to four documents per worker.
+        ordered (bool): Yield documents in the order of `paths`; otherwise as soon as each finishes.
+        skip_errors (bool): Skip documents that fail to load instead of raising.
+        progress_every (int): Print a throughput line every this many documents.
+        parse_cache_dir (Optional[str]): Directory of the parsed-PDF cache, if any.
+        pdf_backend (str): The PDF text extractor, 'pymupdf' or 'pypdf'.
+
+    Yields:
+        Dict[str, Any]: Documents with 'title', 'abstract', 'sentences' and 'path'.
+    """
+    workers = workers or os.cpu_count() or 1
+    load = partial(_load_in_worker, parse_cache_dir=parse_cache_dir, pdf_backend=pdf_backend)
+    progress = _Progress(len(paths), progress_every)
+
+    def finish(path, doc, error):
+        progress.update(error is not None)
+        if error is not None and not skip_errors:
+            raise ValueError(f"Could not load {path}: {error}")
+        if error is not None:
+            print(f"Skipping {path}: {error}")
+        return doc
+
+    if workers == 1 or len(paths) <= 1:
+        for path in paths:
+            doc = finish(*load(path))
+            if doc is not None:
+                yield doc
+        return
+
+    max_in_flight = max_in_flight or 4 * workers
+    pending = deque(paths)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        while pending or in_flight:
+            while pending and len(in_flight) < max_in_flight:
+                in_flight.append(pool.submit(load, pending.popleft()))
+
+            if ordered:
+                doc = finish(*in_flight.popleft().result())
+                if doc is not None:
+                    yield doc
+                continue
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                in_flight.remove(future)
+                doc = finish(*future.result())
+                if doc is not None:
+                    yield doc
+
+def load_corpus_documents(paths: List[str], workers: Optional[int] = None, skip_errors: bool = False,
+                          parse_cache_dir: Optional[str] = None, pdf_backend: str = "pymupdf") -> List[Dict[str, Any]]:
+    """Loads corpus PDFs in parallel and returns them in the order of `paths`."""
+    return list(iter_corpus_documents(paths, workers=workers, skip_errors=skip_errors,
+                                      parse_cache_dir=parse_cache_dir, pdf_backend=pdf_backend))
@@ -0,0 +1,119 @@
+# pipeline/quantization.py
+
+from typing import Optional
+
+import numpy as np
+import torch
+
+PRECISIONS = ('float32', 'float16', 'int8')
+
+class QuantizedEmbeddings:
+    """
+    L2-normalized corpus embeddings stored at reduced precision.
+
+    'float16' halves the memory of float32 vectors. 'int8' stores every vector as int8
+    codes plus its own float32 scale (max |x| / 127), about a quarter of the memory.
+    Scoring works block by block: `block_rows` stored vectors are widened to float32 and
+    multiplied with the float32 queries, so only one block is ever held at full precision
+    and the scores are cosine similarities up to the quantization error.
+
+    This is storage compression only: the matmul itself runs in float32, so scoring is no
+    faster than with float32 embeddings (slightly slower, for the dequantization).
+    """
+    def __init__(self, num_rows: int, dim: int, precision: str = 'int8', block_rows: int = 65536):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown embedding precision '{precision}'. Use one of {', '.join(PRECISIONS)}.")
+        self.precision = precision
+        self.dim = dim
+        self.block_rows = block_rows
+        self.codes = np.zeros((num_rows, dim), dtype=np.int8 if precision == 'int8' else np.dtype(precision))
+        self.scales: Optional[np.ndarray] = np.ones(num_rows, dtype=np.float32) if precision == 'int8' else None
+
+    @classmethod
+    def from_embeddings(cls, embeddings, precision: str = 'int8') -> "QuantizedEmbeddings":
+        """Quantizes a full (rows x dim) float32 array or tensor."""
+        quantized = cls(len(embeddings), embeddings.shape[1], precision)
+        quantized.set_rows(np.arange(len(embeddings)), embeddings)
+        return quantized
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def set_rows(self, rows: np.ndarray, embeddings):
+        """Normalizes and quantizes `embeddings` into the given rows."""
+        if isinstance(embeddings, torch.Tensor):
+            embeddings = embeddings.detach().cpu().numpy()
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+        if self.precision != 'int8':
+            self.codes[rows] = vectors.astype(self.codes.dtype)
+            return
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        self.codes[rows] = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        self.scales[rows] = scales
+
+    def dequantize(self, start: int, end: int) -> np.ndarray:
+        """Rows `start:end` as float32 vectors."""
+        block = self.codes[start:end].astype(np.float32)
+        if self.scales is not None:
+            block *= self.scales[start:end, None]
+        return block
+
+    def scores(self, queries: torch.Tensor) -> torch.Tensor:
+        """
+        Cosine similarity of every query against every stored vector.
+
+        Each block is dequantized to float32 before the matmul; see the class docstring.
+
+        Args:
+            queries (torch.Tensor): Query embeddings of shape (queries, dim).
+
+        Returns:
+            torch.Tensor: float32 scores of shape (queries, stored vectors), on the queries' device.
+        """
+        queries = torch.nn.functional.normalize(queries.to(torch.float32), dim=1)
+        scores = torch.empty((len(queries), len(self)), dtype=torch.float32, device=queries.device)
+        for start in range(0, len(self), self.block_rows):
+            end = min(start + self.block_rows, len(self))
+            block = torch.from_numpy(self.dequantize(start, end)).to(queries.device)
+            scores[:, start:end] = queries @ block.T
+        return scores
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    @property
+    def float32_nbytes(self) -> int:
+        return len(self) * self.dim * 4
+
+    def report(self):
+        saved = 1 - self.nbytes / max(self.float32_nbytes, 1)
+        print(f"Corpus embeddings stored as {self.precision}: {self.nbytes / (1024 * 1024):.1f} MB "
+              f"instead of {self.float32_nbytes / (1024 * 1024):.1f} MB float32 ({saved:.0%} saved).")
+
+def ranking_agreement(exact_scores: torch.Tensor, approx_scores: torch.Tensor, k: int = 10, tolerance: float = 1e-6):
+    """
+    Compares the rankings two score matrices produce for each query row.
+
+    Columns tied with the exact k-th best score (within `tolerance`) count as correct,
+    so ties broken differently are not reported as disagreement.
+
+    Returns:
+        A dictionary with the fraction of rows whose best column is also best under the
+        exact scores (`top1_agreement`), the mean fraction of the approximate top-k that
+        belongs to the exact top-k (`recall_at_k`) and the largest absolute score
+        difference (`max_abs_error`).
+    """
+    k = min(k, exact_scores.shape[1])
+    exact_top = torch.topk(exact_scores, k, dim=1).values
+    approx_top = torch.topk(approx_scores, k, dim=1).indices
+    # Exact scores of the columns the approximate ranking picked.
+    picked = torch.gather(exact_scores, 1, approx_top)
+    return {
+        "top1_agreement": float((picked[:, 0] >= exact_top[:, 0] - tolerance).float().mean()),
+        "recall_at_k": float((picked >= exact_top[:, -1:] - tolerance).float().mean()),
+        "max_abs_error": float((exact_scores - approx_scores).abs().max()),
+    }
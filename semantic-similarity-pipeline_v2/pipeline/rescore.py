@@ -0,0 +1,93 @@
+# pipeline/rescore.py
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import torch
+
+from pipeline.reporting import generate_report
+from pipeline.similarity_analyzer import FINDINGS_MODES, collect_findings
+
+# Bumped whenever the layout of the saved artifacts changes.
+ARTIFACTS_VERSION = 1
+
+def save_artifacts(directory: str, source_doc: Dict[str, Any], corpus_docs: List[Dict[str, Any]],
+                   similarity_matrix: torch.Tensor, doc_offsets: np.ndarray, embedding_model: str):
+    """
+    Persists what the findings are computed from, so they can be re-thresholded without
+    parsing, crawling or encoding anything.
+
+    Writes `similarity_matrix.npy` (float32, source sentences x all corpus sentences) and
+    `run.json` with the source document, the corpus documents (title, path, sentences),
+    the column offset of each document and the embedding model that produced the scores.
+    """
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "similarity_matrix.npy"),
+            similarity_matrix.detach().cpu().to(torch.float32).numpy())
+    run = {
+        "version": ARTIFACTS_VERSION,
+        "embedding_model": embedding_model,
+        "source_doc": {key: source_doc[key] for key in ("title", "abstract", "sentences", "path")},
+        "corpus_docs": [
+            {"title": doc['title'], "path": doc['path'], "sentences": doc.get('sentences') or []}
+            for doc in corpus_docs
+        ],
+        "doc_offsets": [int(offset) for offset in doc_offsets],
+    }
+    with open(os.path.join(directory, "run.json"), 'w', encoding='utf-8') as f:
+        json.dump(run, f, ensure_ascii=False)
+    print(f"Run artifacts saved to {directory} ({similarity_matrix.shape[0]} x {similarity_matrix.shape[1]} similarity matrix).")
+
+def load_artifacts(directory: str) -> Tuple[Dict[str, Any], torch.Tensor]:
+    """
+    Loads artifacts written by `save_artifacts`.
+
+    Returns:
+        A tuple of (the run.json contents with `doc_offsets` as an array, the similarity matrix).
+    """
+    run_path = os.path.join(directory, "run.json")
+    if not os.path.exists(run_path):
+        raise FileNotFoundError(f"No run artifacts found in {directory}. Run the pipeline once with 'artifacts_dir' set.")
+    with open(run_path, 'r', encoding='utf-8') as f:
+        run = json.load(f)
+    if run.get("version") != ARTIFACTS_VERSION:
+        raise ValueError(f"Run artifacts in {directory} have version {run.get('version')}, expected {ARTIFACTS_VERSION}. "
+                         "Run the pipeline again to refresh them.")
+    run["doc_offsets"] = np.asarray(run["doc_offsets"], dtype=np.int64)
+    similarity_matrix = torch.from_numpy(np.load(os.path.join(directory, "similarity_matrix.npy")))
+    return run, similarity_matrix
+
+def rescore(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Recomputes the findings and the report of the last run from its saved artifacts,
+    using the current `similarity_threshold`, `findings_mode` and `findings_top_k`.
+
+    Returns:
+        The findings, sorted by similarity score.
+    """
+    start = time.perf_counter()
+    run, similarity_matrix = load_artifacts(config['artifacts_dir'])
+    if run["embedding_model"] != config['embedding_model']:
+        print(f"Note: the saved scores come from '{run['embedding_model']}', not the configured "
+              f"'{config['embedding_model']}'; only a full run re-encodes with a different model.")
+    findings_mode = config.get('findings_mode', 'threshold')
+    if findings_mode not in FINDINGS_MODES:
+        raise ValueError(f"Unknown findings_mode '{findings_mode}'. Use one of {', '.join(FINDINGS_MODES)}.")
+
+    source_doc = run["source_doc"]
+    findings = collect_findings(
+        similarity_matrix, source_doc['sentences'], run["corpus_docs"], run["doc_offsets"],
+        findings_mode, config['similarity_threshold'], config.get('findings_top_k', 5)
+    )
+    findings.sort(key=lambda x: x['similarity_score'], reverse=True)
+    print(f"Re-scored {similarity_matrix.shape[0]} x {similarity_matrix.shape[1]} sentence pairs: "
+          f"{len(findings)} findings at threshold {config['similarity_threshold']} ({findings_mode}).")
+    if findings:
+        generate_report(config, source_doc, findings)
+    else:
+        print("No significant similarities found based on the configured threshold.")
+    print(f"Rescore finished in {time.perf_counter() - start:.2f}s.")
+    return findings
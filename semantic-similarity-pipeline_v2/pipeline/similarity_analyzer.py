@@ -3,18 +3,305 @@
 from sentence_transformers import SentenceTransformer, models
 from sentence_transformers.util import cos_sim
 from tqdm import tqdm
+import numpy as np
+import time
 import torch
 
+from pipeline.ann_index import SentenceIndex, corpus_fingerprint
+from pipeline.embedding_cache import EmbeddingCache
+from arxiv_common.encode_executor import EncodeExecutor, parallelism_from_config
+from arxiv_common.token_batching import LengthBucketedEncoder
+from pipeline.encoder_backends import check_parity, get_backend
+from pipeline.quantization import PRECISIONS, QuantizedEmbeddings
+
+def extract_findings(similarity_matrix, source_sentences, corpus_doc, threshold):
+    """
+    Collects every (source sentence, corpus sentence) pair whose score reaches the threshold.
+
+    The threshold is applied to the whole matrix in one pass and the matching indices and
+    scores are copied to the host in a single transfer, instead of indexing and syncing once
+    per cell. Findings come back in row-major order, like a nested loop over the matrix.
+
+    Args:
+        similarity_matrix (torch.Tensor): Scores of shape (source sentences, corpus sentences).
+        source_sentences (List[str]): Sentences of the source document (matrix rows).
+        corpus_doc (Dict[str, Any]): The corpus document whose sentences are the matrix columns.
+        threshold (float): Minimum score for a pair to be reported.
+
+    Returns:
+        A list of finding dictionaries.
+    """
+    rows, cols = torch.nonzero(similarity_matrix >= threshold, as_tuple=True)
+    if rows.numel() == 0:
+        return []
+    # float64 holds both the indices and the float32 scores exactly.
+    matches = torch.stack([
+        rows.to(torch.float64),
+        cols.to(torch.float64),
+        similarity_matrix[rows, cols].to(torch.float64)
+    ]).cpu().numpy()
+
+    corpus_sentences = corpus_doc['sentences']
+    return [
+        {
+            'source_sentence': source_sentences[int(i)],
+            'similar_sentence': corpus_sentences[int(j)],
+            'similarity_score': float(score),
+            'source_paper_title': corpus_doc['title'],
+            'source_paper_path': corpus_doc['path']
+        }
+        for i, j, score in zip(*matches)
+    ]
+
+def extract_corpus_findings(similarity_matrix, source_sentences, corpus_docs, doc_offsets, threshold):
+    """
+    Like `extract_findings`, but for a matrix whose columns span the sentences of many
+    corpus documents, laid out according to `doc_offsets`.
+
+    Findings are ordered by document, then source sentence, then corpus sentence, which
+    is the order a per-document scan would produce.
+
+    Args:
+        similarity_matrix (torch.Tensor): Scores of shape (source sentences, all corpus sentences).
+        source_sentences (List[str]): Sentences of the source document (matrix rows).
+        corpus_docs (List[Dict[str, Any]]): The corpus documents.
+        doc_offsets (np.ndarray): Column offset of each document's first sentence, plus the total.
+        threshold (float): Minimum score for a pair to be reported.
+
+    Returns:
+        A list of finding dictionaries.
+    """
+    rows, cols = torch.nonzero(similarity_matrix >= threshold, as_tuple=True)
+    if rows.numel() == 0:
+        return []
+    rows, cols, scores = torch.stack([
+        rows.to(torch.float64),
+        cols.to(torch.float64),
+        similarity_matrix[rows, cols].to(torch.float64)
+    ]).cpu().numpy()
+    rows, cols = rows.astype(np.int64), cols.astype(np.int64)
+
+    # Map each column back to its document; empty documents have zero-width ranges.
+    docs = np.searchsorted(doc_offsets, cols, side='right') - 1
+    order = np.lexsort((cols, rows, docs))
+
+    findings = []
+    for k in order:
+        corpus_doc = corpus_docs[docs[k]]
+        findings.append({
+            'source_sentence': source_sentences[rows[k]],
+            'similar_sentence': corpus_doc['sentences'][cols[k] - doc_offsets[docs[k]]],
+            'similarity_score': float(scores[k]),
+            'source_paper_title': corpus_doc['title'],
+            'source_paper_path': corpus_doc['path']
+        })
+    return findings
+
+def flatten_corpus(corpus_docs):
+    """
+    Lists every corpus sentence in document order.
+
+    Returns:
+        A tuple of (sentences, doc_offsets), where the sentences of document `d` are
+        `sentences[doc_offsets[d]:doc_offsets[d + 1]]`.
+    """
+    sentences = []
+    doc_offsets = [0]
+    for corpus_doc in corpus_docs:
+        sentences.extend(corpus_doc.get('sentences') or [])
+        doc_offsets.append(len(sentences))
+    return sentences, np.asarray(doc_offsets, dtype=np.int64)
+
+FINDINGS_MODES = ('threshold', 'top_k_per_sentence', 'top_k_per_paper')
+
+def top_k_columns(similarity_matrix, doc_offsets, k, per_paper=False):
+    """
+    Selects the k best corpus columns for every source sentence directly on the matrix.
+
+    With `per_paper`, the k best papers are selected instead (a paper scores its best
+    sentence) and each contributes the column of that sentence, so one paper cannot fill
+    all k slots.
+
+    Args:
+        similarity_matrix (torch.Tensor): Scores of shape (source sentences, corpus sentences).
+        doc_offsets (np.ndarray): Column offset of each document's first sentence, plus the total.
+        k (int): Winners kept per source sentence.
+        per_paper (bool): Select the best papers rather than the best sentences.
+
+    Returns:
+        A tuple of (scores, columns) tensors of shape (source sentences, min(k, candidates)),
+        best first.
+    """
+    if not per_paper:
+        return torch.topk(similarity_matrix, min(k, similarity_matrix.shape[1]), dim=1)
+
+    num_rows = similarity_matrix.shape[0]
+    lengths = torch.as_tensor(np.diff(doc_offsets), device=similarity_matrix.device)
+    doc_ids = torch.repeat_interleave(torch.arange(len(lengths), device=similarity_matrix.device), lengths)
+    per_paper_scores = torch.full(
+        (num_rows, len(lengths)), float('-inf'), dtype=similarity_matrix.dtype, device=similarity_matrix.device
+    ).scatter_reduce(1, doc_ids.expand(num_rows, -1), similarity_matrix, reduce='amax')
+    scores, docs = torch.topk(per_paper_scores, min(k, int((lengths > 0).sum())), dim=1)
+
+    # Locate the best sentence of each winning paper; there are only rows x k of them.
+    columns = torch.empty_like(docs)
+    for i, row_docs in enumerate(docs.tolist()):
+        for j, d in enumerate(row_docs):
+            start, end = int(doc_offsets[d]), int(doc_offsets[d + 1])
+            columns[i, j] = start + int(torch.argmax(similarity_matrix[i, start:end])) if end > start else start
+    return scores, columns
+
+def merge_top_k(best, candidates, k):
+    """Merges two (scores, columns) selections row by row, keeping the k best of each row."""
+    if best is None:
+        return candidates
+    scores = torch.cat([best[0], candidates[0]], dim=1)
+    columns = torch.cat([best[1], candidates[1]], dim=1)
+    scores, order = torch.topk(scores, min(k, scores.shape[1]), dim=1)
+    return scores, torch.gather(columns, 1, order)
+
+def top_k_findings(selection, source_sentences, corpus_docs, doc_offsets, threshold):
+    """
+    Builds findings from a `top_k_columns` selection, dropping winners below the threshold.
+
+    Findings are ordered by source sentence, best match first.
+    """
+    if selection is None:
+        return []
+    scores, columns = (t.cpu().numpy() for t in selection)
+    findings = []
+    for i, (row_scores, row_columns) in enumerate(zip(scores, columns)):
+        for score, col in zip(row_scores, row_columns):
+            if score < threshold:
+                break
+            d = int(np.searchsorted(doc_offsets, col, side='right') - 1)
+            corpus_doc = corpus_docs[d]
+            findings.append({
+                'source_sentence': source_sentences[i],
+                'similar_sentence': corpus_doc['sentences'][col - doc_offsets[d]],
+                'similarity_score': float(score),
+                'source_paper_title': corpus_doc['title'],
+                'source_paper_path': corpus_doc['path']
+            })
+    return findings
+
+def select_top_k_findings(findings, k, per_paper=False):
+    """
+    Applies a top-k mode to an already collected list of findings (used for ANN results,
+    which are bounded by `ann_top_k` per source sentence anyway).
+    """
+    by_sentence = {}
+    for finding in sorted(findings, key=lambda x: x['similarity_score'], reverse=True):
+        kept = by_sentence.setdefault(finding['source_sentence'], {})
+        key = finding['source_paper_path'] if per_paper else len(kept)
+        if len(kept) < k and key not in kept:
+            kept[key] = finding
+    return [finding for kept in by_sentence.values() for finding in kept.values()]
+
+def mask_documents(similarity_matrix, doc_offsets, excluded_docs):
+    """
+    Returns a copy of `similarity_matrix` with the columns of the corpus documents in
+    `excluded_docs` (indices into the corpus) set to -inf, so that neither the threshold
+    nor a top-k selection can pick them.
+    """
+    if not excluded_docs:
+        return similarity_matrix
+    masked = similarity_matrix.clone()
+    for d in excluded_docs:
+        masked[:, int(doc_offsets[d]):int(doc_offsets[d + 1])] = float('-inf')
+    return masked
+
+def collect_findings(similarity_matrix, source_sentences, corpus_docs, doc_offsets, findings_mode, threshold, top_k):
+    """
+    Turns a (source sentences x all corpus sentences) matrix into findings according to
+    `findings_mode` ('threshold' or a top-k mode keeping `top_k` per source sentence).
+    """
+    if findings_mode == 'threshold':
+        return extract_corpus_findings(similarity_matrix, source_sentences, corpus_docs, doc_offsets, threshold)
+    selection = top_k_columns(similarity_matrix, doc_offsets, top_k, per_paper=findings_mode == 'top_k_per_paper')
+    return top_k_findings(selection, source_sentences, corpus_docs, doc_offsets, threshold)
+
 class SimilarityAnalyzer:
     """
     Handles the loading of sentence embedding models and the calculation of semantic similarity.
+
+    An already loaded `model` (anything with SentenceTransformer's `encode` and
+    `get_sentence_embedding_dimension`) can be passed in instead of loading
+    `embedding_model`, e.g. a stub encoder for benchmarks.
     """
-    def __init__(self, config):
+    def __init__(self, config, model=None):
         self.model_name = config['embedding_model']
         self.threshold = config['similarity_threshold']
+        # 'batched' encodes the whole corpus in one pass; 'per_document' encodes each document separately.
+        self.corpus_encode_mode = config.get('corpus_encode_mode', 'per_document')
+        self.encode_batch_size = config.get('encode_batch_size', 32)
+        # 'threshold' reports every pair above the threshold; the top-k modes keep only the
+        # `findings_top_k` best sentences (or papers) per source sentence.
+        self.findings_mode = config.get('findings_mode', 'threshold')
+        self.findings_top_k = config.get('findings_top_k', 5)
+        if self.findings_mode not in FINDINGS_MODES:
+            raise ValueError(f"Unknown findings_mode '{self.findings_mode}'. Use one of {', '.join(FINDINGS_MODES)}.")
+        # Precision of the corpus embeddings held for batched scoring, and how many of the
+        # best candidates per source sentence are re-scored at float32.
+        self.embedding_precision = config.get('embedding_precision', 'float32')
+        self.rerank_top_k = config.get('rerank_top_k', 50)
+        if self.embedding_precision not in PRECISIONS:
+            raise ValueError(f"Unknown embedding_precision '{self.embedding_precision}'. Use one of {', '.join(PRECISIONS)}.")
+        # Optional approximate nearest-neighbour index for large corpora.
+        self.ann_index_dir = config.get('ann_index_dir')
+        self.ann_method = config.get('ann_method', 'ivf')
+        self.ann_top_k = config.get('ann_top_k', 10)
+        self.ann_nprobe = config.get('ann_nprobe', 16)
+        # With `artifacts_dir` set, the last exact (source x corpus sentences) similarity
+        # matrix is kept so the run can be re-scored later without encoding.
+        self.keep_similarity_matrix = bool(config.get('artifacts_dir'))
+        self.similarity_matrix = None
+        self.doc_offsets = None
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
         print(f"Using device: {self.device}")
-        self.model = self._load_model()
+        self.pooling_mode = 'default'
+        self.model = model if model is not None else self._load_model()
+        # Optional faster CPU inference path ('torch_int8' or 'onnx') built from the loaded model.
+        self.encoder_backend = config.get('encoder_backend', 'torch')
+        if self.encoder_backend != 'torch':
+            self.model = self._build_backend(self.model, config.get('onnx_cache_dir'))
+        # All encoding goes through the executor, which sets the torch thread count and
+        # spreads large inputs over a process pool on many-core machines. ONNX Runtime
+        # sessions cannot be sent to worker processes and manage their own threads.
+        workers, threads = parallelism_from_config(config)
+        if self.encoder_backend == 'onnx':
+            workers = 1
+        self.executor = EncodeExecutor(self.model, workers, threads, self.device)
+        self.encoder = self.executor
+        print(f"Encoding: {self.executor.describe()}.")
+        # Optional length-bucketed batching: batch sizes are chosen per sentence length so
+        # that each batch stays within `encode_token_budget` tokens including padding.
+        self.token_budget = config.get('encode_token_budget')
+        if self.token_budget:
+            self.encoder = LengthBucketedEncoder(self.encoder, self.token_budget,
+                                                 compare_fixed=config.get('encode_padding_profile', False))
+
+        # Optional persistent embedding cache; only cache misses are sent to the encoder.
+        self.embedding_cache = None
+        self.encode_seconds = 0.0
+        # Sentences sent to the model and the encode batches they formed (for run profiles).
+        self.encoded_sentences = 0
+        self.encode_batches = 0
+        if config.get('embedding_cache_dir'):
+            # Backends other than 'torch' produce slightly different vectors, so they get
+            # their own cache directory.
+            cache_variant = self.pooling_mode if self.encoder_backend == 'torch' else f"{self.pooling_mode}-{self.encoder_backend}"
+            self.embedding_cache = EmbeddingCache(
+                config['embedding_cache_dir'],
+                self.model_name,
+                cache_variant,
+                self.model.get_sentence_embedding_dimension()
+            )
+            print(f"Using embedding cache at {self.embedding_cache.directory} ({len(self.embedding_cache)} entries).")
+
+    def close(self):
+        """Shuts down the encode worker pool; a later encode starts a new one if it needs it."""
+        self.executor.close()
 
     def _load_model(self):
         """
@@ -29,11 +316,13 @@ class SimilarityAnalyzer:
         if 'contriever' in model_name_lower:
             word_embedding_model = models.Transformer(self.model_name)
             # Contriever uses mean pooling
+            self.pooling_mode = 'mean'
             pooling_model = models.Pooling(word_embedding_model.get_word_embedding_dimension(), pooling_mode='mean')
             model = SentenceTransformer(modules=[word_embedding_model, pooling_model], device=self.device)
         elif 'simcse' in model_name_lower:
             word_embedding_model = models.Transformer(self.model_name)
             # SimCSE uses the embedding of the [CLS] token
+            self.pooling_mode = 'cls'
             pooling_model = models.Pooling(word_embedding_model.get_word_embedding_dimension(), pooling_mode='cls')
             model = SentenceTransformer(modules=[word_embedding_model, pooling_model], device=self.device)
         else:
@@ -42,47 +331,376 @@ class SimilarityAnalyzer:
         print("Model loaded successfully.")
         return model
 
-    def find_similar_sentences(self, source_doc, corpus_docs):
+    def _build_backend(self, model, cache_dir):
+        """Builds the configured encoder backend from the PyTorch model and checks it against the model."""
+        if self.device != 'cpu':
+            print(f"Note: the '{self.encoder_backend}' encoder backend runs on the CPU.")
+        backend = get_backend(self.encoder_backend, model, self.model_name, cache_dir)
+        parity = check_parity(model, backend)
+        print(f"Encoder backend '{self.encoder_backend}': cosine to PyTorch embeddings "
+              f"min {parity['min_cosine']:.4f}, mean {parity['mean_cosine']:.4f}.")
+        if parity['min_cosine'] < 0.99:
+            print(f"Warning: the '{self.encoder_backend}' backend deviates noticeably from the PyTorch model.")
+        return backend
+
+    def _encode(self, sentences, show_progress_bar=False, batch_size=32):
         """
-        Finds sentences in the corpus that are similar to sentences in the source document.
+        Encodes sentences into a tensor on `self.device`, serving what it can from the
+        embedding cache and sending only the misses to the model.
         """
-        print("Encoding sentences from the source document...")
-        source_embeddings = self.model.encode(
-            source_doc['sentences'], 
-            convert_to_tensor=True, 
-            device=self.device,
-            show_progress_bar=True
+        if self.embedding_cache is None:
+            start = time.perf_counter()
+            embeddings = self.encoder.encode(
+                sentences,
+                convert_to_tensor=True,
+                device=self.device,
+                batch_size=batch_size,
+                show_progress_bar=show_progress_bar
+            )
+            self.encode_seconds += time.perf_counter() - start
+            self._count_encoded(len(sentences), batch_size)
+            return embeddings
+
+        keys = [EmbeddingCache.key(sentence) for sentence in sentences]
+        found, missing = self.embedding_cache.lookup(keys)
+        embeddings = np.empty((len(sentences), self.embedding_cache.dim), dtype=np.float32)
+        for pos, vector in found.items():
+            embeddings[pos] = vector
+
+        if missing:
+            # Identical sentences inside one batch only need to be encoded once.
+            unique_keys = list(dict.fromkeys(keys[pos] for pos in missing))
+            first_pos = {}
+            for pos in missing:
+                first_pos.setdefault(keys[pos], pos)
+            start = time.perf_counter()
+            encoded = self.encoder.encode(
+                [sentences[first_pos[key]] for key in unique_keys],
+                convert_to_numpy=True,
+                device=self.device,
+                batch_size=batch_size,
+                show_progress_bar=show_progress_bar
+            )
+            self.encode_seconds += time.perf_counter() - start
+            self._count_encoded(len(unique_keys), batch_size)
+            self.embedding_cache.add(unique_keys, encoded)
+            vectors = dict(zip(unique_keys, encoded))
+            for pos in missing:
+                embeddings[pos] = vectors[keys[pos]]
+
+        return torch.from_numpy(embeddings).to(self.device)
+
+    def _count_encoded(self, num_sentences, batch_size):
+        self.encoded_sentences += num_sentences
+        if self.token_budget:
+            self.encode_batches += self.encoder.last_num_batches
+        else:
+            self.encode_batches += -(-num_sentences // batch_size)
+
+    def report_cache_stats(self):
+        """Saves the embedding-cache index and prints hit/miss counters and an estimate of the encoder time saved."""
+        if self.embedding_cache is None:
+            return
+        self.embedding_cache.save()
+        hits, misses = self.embedding_cache.hits, self.embedding_cache.misses
+        total = hits + misses
+        if total == 0:
+            return
+        print(f"Embedding cache: {hits} hits, {misses} misses ({hits / total:.1%} hit rate).")
+        if misses:
+            saved = hits * self.encode_seconds / misses
+            print(f"Estimated encoder time saved: {saved:.1f}s (spent {self.encode_seconds:.1f}s encoding misses).")
+
+    def report_padding(self):
+        """Prints how much of the encoded tokens were padding, with and without length bucketing."""
+        if self.token_budget:
+            self.encoder.report()
+
+    def encode_corpus(self, corpus_docs):
+        """
+        Encodes every corpus sentence in a single pass.
+
+        All sentences are flattened into one list and sorted by length so that each
+        fixed-size batch holds sentences of similar length, then the embeddings are put
+        back in corpus order.
+
+        Args:
+            corpus_docs (List[Dict[str, Any]]): The corpus documents.
+
+        Returns:
+            A tuple of (embeddings tensor, doc_offsets), where the sentences of document
+            `d` occupy rows `doc_offsets[d]:doc_offsets[d + 1]`.
+        """
+        sentences, doc_offsets = flatten_corpus(corpus_docs)
+        if not sentences:
+            return None, doc_offsets
+
+        order = sorted(range(len(sentences)), key=lambda k: len(sentences[k]), reverse=True)
+        start = time.perf_counter()
+        sorted_embeddings = self._encode(
+            [sentences[k] for k in order],
+            show_progress_bar=True,
+            batch_size=self.encode_batch_size
+        )
+        embeddings = torch.empty_like(sorted_embeddings)
+        embeddings[torch.as_tensor(order, device=sorted_embeddings.device)] = sorted_embeddings
+        elapsed = time.perf_counter() - start
+        print(f"Encoded {len(sentences)} corpus sentences from {len(corpus_docs)} documents "
+              f"in {elapsed:.1f}s ({len(sentences) / max(elapsed, 1e-9):.0f} sentences/sec).")
+        return embeddings, doc_offsets
+
+    def _collect_findings(self, similarity_matrix, source_sentences, corpus_docs, doc_offsets):
+        return collect_findings(similarity_matrix, source_sentences, corpus_docs, doc_offsets,
+                                self.findings_mode, self.threshold, self.findings_top_k)
+
+    def encode_corpus_quantized(self, corpus_docs, chunk_sentences=8192):
+        """
+        Like `encode_corpus`, but stores the embeddings at `embedding_precision`.
+
+        Sentences are encoded `chunk_sentences` at a time (in length order) and each chunk
+        is quantized straight away, so full-precision vectors are only ever held for one
+        chunk.
+
+        Returns:
+            A tuple of (QuantizedEmbeddings or None, doc_offsets, flattened sentences).
+        """
+        sentences, doc_offsets = flatten_corpus(corpus_docs)
+        if not sentences:
+            return None, doc_offsets, sentences
+
+        order = np.array(sorted(range(len(sentences)), key=lambda k: len(sentences[k]), reverse=True), dtype=np.int64)
+        quantized = QuantizedEmbeddings(len(sentences), self.model.get_sentence_embedding_dimension(), self.embedding_precision)
+        start = time.perf_counter()
+        for chunk_start in range(0, len(order), chunk_sentences):
+            rows = order[chunk_start:chunk_start + chunk_sentences]
+            quantized.set_rows(rows, self._encode([sentences[k] for k in rows], batch_size=self.encode_batch_size))
+        elapsed = time.perf_counter() - start
+        print(f"Encoded {len(sentences)} corpus sentences from {len(corpus_docs)} documents "
+              f"in {elapsed:.1f}s ({len(sentences) / max(elapsed, 1e-9):.0f} sentences/sec).")
+        quantized.report()
+        return quantized, doc_offsets, sentences
+
+    def _rerank(self, similarity_matrix, source_embeddings, corpus_sentences):
+        """
+        Replaces the quantized scores of each source sentence's `rerank_top_k` best
+        candidates with float32 cosine similarities, in place, and reports how much the
+        ranking changed. The candidates' vectors come from the embedding cache when it is
+        enabled and are re-encoded otherwise.
+        """
+        k = min(self.rerank_top_k, similarity_matrix.shape[1])
+        approx, columns = torch.topk(similarity_matrix, k, dim=1)
+        unique_columns, inverse = torch.unique(columns, return_inverse=True)
+        exact_vectors = self._encode(
+            [corpus_sentences[c] for c in unique_columns.tolist()], batch_size=self.encode_batch_size
         )
+        exact = cos_sim(source_embeddings, exact_vectors.to(source_embeddings.device))
+        exact = torch.gather(exact, 1, inverse).to(similarity_matrix.dtype)
+        similarity_matrix.scatter_(1, columns, exact)
 
+        # The quantized ranking's winner is still the best (or tied) after re-scoring.
+        kept = (exact[:, 0] >= exact.max(dim=1).values - 1e-6).float().mean()
+        print(f"Re-ranked the top {k} candidates at float32: best match unchanged for {float(kept):.1%} "
+              f"of source sentences, largest score correction {float((exact - approx).abs().max()):.4f}.")
+
+    def _score_corpus(self, source_embeddings, corpus_docs):
+        """
+        Scores the source sentences against every corpus sentence in one pass.
+
+        Returns:
+            A tuple of (similarity matrix or None for an empty corpus, doc_offsets).
+        """
+        if self.embedding_precision == 'float32':
+            corpus_embeddings, doc_offsets = self.encode_corpus(corpus_docs)
+            if corpus_embeddings is None:
+                return None, doc_offsets
+            # One matrix multiply scores every source sentence against the whole corpus.
+            return cos_sim(source_embeddings, corpus_embeddings), doc_offsets
+
+        quantized, doc_offsets, sentences = self.encode_corpus_quantized(corpus_docs)
+        if quantized is None:
+            return None, doc_offsets
+        similarity_matrix = quantized.scores(source_embeddings)
+        if self.rerank_top_k:
+            self._rerank(similarity_matrix, source_embeddings, sentences)
+        return similarity_matrix, doc_offsets
+
+    def _find_per_document(self, source_doc, corpus_docs, source_embeddings):
         findings = []
-        print("\nAnalyzing corpus documents for similarity...")
-        for corpus_doc in tqdm(corpus_docs, desc="Comparing Documents"):
+        # Top-k modes keep a running selection of (source sentences x k) winners instead
+        # of collecting every pair above the threshold.
+        selection = None
+        matrices = []
+        doc_offsets = np.cumsum([0] + [len(doc.get('sentences') or []) for doc in corpus_docs])
+        for d, corpus_doc in enumerate(tqdm(corpus_docs, desc="Comparing Documents")):
             if not corpus_doc.get('sentences'):
                 continue
 
-            corpus_embeddings = self.model.encode(
-                corpus_doc['sentences'], 
-                convert_to_tensor=True, 
-                device=self.device,
-                show_progress_bar=False # Disable inner progress bar
-            )
+            corpus_embeddings = self._encode(corpus_doc['sentences'])
 
             # Calculate cosine similarity between all source and corpus sentences
             similarity_matrix = cos_sim(source_embeddings, corpus_embeddings)
+            if self.keep_similarity_matrix:
+                matrices.append(similarity_matrix.cpu())
+
+            if self.findings_mode == 'threshold':
+                # Find pairs above the threshold
+                findings.extend(extract_findings(similarity_matrix, source_doc['sentences'], corpus_doc, self.threshold))
+                continue
+            scores, columns = top_k_columns(
+                similarity_matrix, np.array([0, similarity_matrix.shape[1]]), self.findings_top_k,
+                per_paper=self.findings_mode == 'top_k_per_paper'
+            )
+            selection = merge_top_k(selection, (scores, columns + int(doc_offsets[d])), self.findings_top_k)
+
+        if matrices:
+            self.similarity_matrix, self.doc_offsets = torch.cat(matrices, dim=1), doc_offsets
+        if self.findings_mode != 'threshold':
+            findings = top_k_findings(selection, source_doc['sentences'], corpus_docs, doc_offsets, self.threshold)
+        return findings
+
+    def _find_in_batched_corpus(self, source_doc, corpus_docs, source_embeddings):
+        similarity_matrix, doc_offsets = self._score_corpus(source_embeddings, corpus_docs)
+        if similarity_matrix is None:
+            return []
+        if self.keep_similarity_matrix:
+            self.similarity_matrix, self.doc_offsets = similarity_matrix.cpu(), doc_offsets
+        return self._collect_findings(similarity_matrix, source_doc['sentences'], corpus_docs, doc_offsets)
+
+    def _get_ann_index(self, corpus_docs):
+        """Loads the persisted ANN index for this corpus, building and saving it if it is missing or stale."""
+        fingerprint = corpus_fingerprint(corpus_docs, self.model_name)
+        if SentenceIndex.read_fingerprint(self.ann_index_dir) == fingerprint:
+            print(f"Loading ANN index from {self.ann_index_dir}...")
+            return SentenceIndex.load(self.ann_index_dir)
+
+        corpus_embeddings, doc_offsets = self.encode_corpus(corpus_docs)
+        if corpus_embeddings is None:
+            return None
+        doc_ids = np.repeat(np.arange(len(corpus_docs)), np.diff(doc_offsets))
+        sentence_ids = np.arange(doc_offsets[-1]) - doc_offsets[doc_ids]
+        print(f"Building '{self.ann_method}' ANN index over {doc_offsets[-1]} sentences...")
+        index = SentenceIndex.build(
+            corpus_embeddings.cpu().numpy(),
+            corpus_docs,
+            np.stack([doc_ids, sentence_ids], axis=1),
+            method=self.ann_method,
+            nprobe=self.ann_nprobe,
+            fingerprint=fingerprint
+        )
+        index.save(self.ann_index_dir)
+        print(f"ANN index saved to {self.ann_index_dir}.")
+        return index
+
+    def _find_with_ann_index(self, source_doc, index, source_embeddings, excluded_paths=None):
+        if index is None:
+            return []
+        top_k = self.ann_top_k
+        if self.findings_mode == 'top_k_per_sentence':
+            top_k = max(top_k, self.findings_top_k)
+        # Excluded documents are still in the index, so over-fetch by their sentence count
+        # and drop them before truncating each row to its `top_k` neighbours.
+        excluded_docs = {d for d, doc in enumerate(index.docs) if excluded_paths and doc['path'] in excluded_paths}
+        excluded_sentences = sum(len(index.docs[d].get('sentences') or []) for d in excluded_docs)
+        scores, ids = index.search(source_embeddings.cpu().numpy(), min(top_k + excluded_sentences, len(index)))
+
+        findings = []
+        for i, (row_scores, row_ids) in enumerate(zip(scores, ids)):
+            kept = 0
+            for score, idx in zip(row_scores, row_ids):
+                if idx < 0 or kept == top_k:
+                    break
+                doc_id, sentence_id = index.rows[idx]
+                if doc_id in excluded_docs:
+                    continue
+                kept += 1
+                if score < self.threshold:
+                    continue
+                corpus_doc = index.docs[doc_id]
+                findings.append({
+                    'source_sentence': source_doc['sentences'][i],
+                    'similar_sentence': corpus_doc['sentences'][sentence_id],
+                    'similarity_score': float(score),
+                    'source_paper_title': corpus_doc['title'],
+                    'source_paper_path': corpus_doc['path']
+                })
+        if self.findings_mode != 'threshold':
+            findings = select_top_k_findings(findings, self.findings_top_k, per_paper=self.findings_mode == 'top_k_per_paper')
+        return findings
+
+    def find_similar_sentences_batch(self, source_docs, corpus_docs, excluded_docs=None):
+        """
+        Scores several source documents against one shared corpus.
+
+        The corpus is encoded once and all source sentences are stacked, so a single
+        matrix multiply produces every score; the rows are then split back per source.
+        Documents a source must not be matched against (its own paper, or papers outside
+        its own query) are masked out of its rows before findings are selected, so they
+        never take a top-k slot.
+
+        Args:
+            source_docs (List[Dict[str, Any]]): The processed source documents.
+            corpus_docs (List[Dict[str, Any]]): The shared corpus documents.
+            excluded_docs (Optional[List[Iterable[int]]]): For each source, the indices of
+                the corpus documents to leave out.
+
+        Returns:
+            One list of findings per source document, each sorted by similarity score.
+        """
+        source_sentences = [sentence for doc in source_docs for sentence in doc['sentences']]
+        if not source_sentences:
+            return [[] for _ in source_docs]
+        print(f"Encoding {len(source_sentences)} sentences from {len(source_docs)} source documents...")
+        source_embeddings = self._encode(source_sentences, show_progress_bar=True, batch_size=self.encode_batch_size)
+        source_offsets = np.cumsum([0] + [len(doc['sentences']) for doc in source_docs])
+        excluded_docs = excluded_docs or [()] * len(source_docs)
+
+        if self.ann_index_dir:
+            # Fingerprint, load (or build) the index once and search it for every source.
+            index = self._get_ann_index(corpus_docs)
+            results = [
+                self._find_with_ann_index(
+                    doc, index, source_embeddings[source_offsets[k]:source_offsets[k + 1]],
+                    excluded_paths={corpus_docs[d]['path'] for d in excluded_docs[k]}
+                )
+                for k, doc in enumerate(source_docs)
+            ]
+        else:
+            similarity_matrix, doc_offsets = self._score_corpus(source_embeddings, corpus_docs)
+            if similarity_matrix is None:
+                return [[] for _ in source_docs]
+            results = [
+                self._collect_findings(
+                    mask_documents(similarity_matrix[source_offsets[k]:source_offsets[k + 1]], doc_offsets, excluded_docs[k]),
+                    doc['sentences'], corpus_docs, doc_offsets
+                )
+                for k, doc in enumerate(source_docs)
+            ]
+
+        for findings in results:
+            findings.sort(key=lambda x: x['similarity_score'], reverse=True)
+        self.report_cache_stats()
+        self.report_padding()
+        return results
+
+    def find_similar_sentences(self, source_doc, corpus_docs):
+        """
+        Finds sentences in the corpus that are similar to sentences in the source document.
+        """
+        print("Encoding sentences from the source document...")
+        source_embeddings = self._encode(source_doc['sentences'], show_progress_bar=True)
+
+        print("\nAnalyzing corpus documents for similarity...")
+        if self.ann_index_dir:
+            if self.keep_similarity_matrix:
+                print("Note: ANN search does not score every sentence pair, so no similarity matrix is kept for re-scoring.")
+            findings = self._find_with_ann_index(source_doc, self._get_ann_index(corpus_docs), source_embeddings)
+        elif self.corpus_encode_mode == 'batched':
+            findings = self._find_in_batched_corpus(source_doc, corpus_docs, source_embeddings)
+        else:
+            findings = self._find_per_document(source_doc, corpus_docs, source_embeddings)
 
-            # Find pairs above the threshold
-            for i in range(len(source_doc['sentences'])):
-                for j in range(len(corpus_doc['sentences'])):
-                    score = similarity_matrix[i][j].item()
-                    if score >= self.threshold:
-                        findings.append({
-                            'source_sentence': source_doc['sentences'][i],
-                            'similar_sentence': corpus_doc['sentences'][j],
-                            'similarity_score': score,
-                            'source_paper_title': corpus_doc['title'],
-                            'source_paper_path': corpus_doc['path']
-                        })
-        
         # Sort findings by similarity score in descending order
         findings.sort(key=lambda x: x['similarity_score'], reverse=True)
+        self.report_cache_stats()
+        self.report_padding()
         return findings
\ No newline at end of file
@@ -0,0 +1,74 @@
+# tests/test_batch_scope.py
+#
+# Batch mode must report, for every source, the same top-k findings as a single run
+# over that source's own corpus: the source's own paper and papers outside its query
+# are excluded before the top-k selection, not after it.
+#
+# Run from the project root:
+#     python -m pytest tests
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pipeline.batch fetches its corpus through the arxiv package.
+pytest.importorskip("arxiv")
+
+from arxiv_common.synthetic import StubEncoder, SyntheticCorpus
+from pipeline import batch
+from pipeline.similarity_analyzer import SimilarityAnalyzer
+
+def make_config(tmp_path, findings_mode):
+    return {
+        "embedding_model": "stub",
+        "similarity_threshold": 0.3,
+        "corpus_encode_mode": "batched",
+        "findings_mode": findings_mode,
+        "findings_top_k": 3,
+        "use_arxiv_corpus": True,
+        "batch_corpus_scope": "own",
+        "output_dir": str(tmp_path),
+    }
+
+def scores_by_sentence(findings):
+    # Scores per source sentence; which of several equally scored papers wins is not fixed.
+    result = {}
+    for finding in findings:
+        result.setdefault(finding['source_sentence'], []).append(round(finding['similarity_score'], 5))
+    return {sentence: sorted(scores) for sentence, scores in result.items()}
+
+@pytest.mark.parametrize("findings_mode", ["top_k_per_sentence", "top_k_per_paper"])
+def test_batch_matches_single_runs(tmp_path, monkeypatch, findings_mode):
+    corpus = SyntheticCorpus(200, sentences_per_paper=8, source_sentences=12, overlap=0.1)
+    corpus_docs = corpus.corpus_docs
+    # The second source is a corpus paper itself: its best matches are its own sentences.
+    first = dict(corpus.source_doc, path="sources/first.pdf")
+    second = dict(corpus_docs[5], path=corpus_docs[5]['path'])
+    sources = {first['path']: first, second['path']: second}
+    # Each source's own query returned a different part of the corpus; the papers
+    # planted with the first source's sentences are outside its own scope.
+    own_paths = [
+        {doc['path'] for d, doc in enumerate(corpus_docs) if d % 3 != 0},
+        {doc['path'] for d, doc in enumerate(corpus_docs) if d < 120},
+    ]
+
+    monkeypatch.setattr(batch, "load_source_document", lambda path, **kwargs: sources[path])
+    monkeypatch.setattr(batch, "_build_arxiv_corpus", lambda config, source_docs: (corpus_docs, own_paths))
+    monkeypatch.setattr(batch, "_is_self_match", lambda source_doc, corpus_doc: corpus_doc['path'] == source_doc['path'])
+    reported = []
+    monkeypatch.setattr(batch, "generate_report", lambda config, source_doc, findings: reported.append(findings))
+
+    config = make_config(tmp_path, findings_mode)
+    model = StubEncoder(128)
+    batch.run_batch(config, list(sources), SimilarityAnalyzer(config, model=model))
+    assert len(reported) == 2
+
+    for source, allowed, batch_findings in zip([first, second], own_paths, reported):
+        own_corpus = [doc for doc in corpus_docs if doc['path'] in allowed and doc['path'] != source['path']]
+        single = SimilarityAnalyzer(config, model=model).find_similar_sentences(source, own_corpus)
+        assert single
+        assert all(f['source_paper_path'] in allowed and f['source_paper_path'] != source['path'] for f in batch_findings)
+        assert scores_by_sentence(batch_findings) == scores_by_sentence(single)
@@ -1,8 +1,8 @@
 # utils/text_utils.py
 
-import fitz  # PyMuPDF
 import nltk
 from typing import List, Tuple
+from arxiv_common.pdf_backends import get_backend
 
 def download_nltk_data():
     """Downloads the necessary NLTK data."""
@@ -12,19 +12,24 @@ def download_nltk_data():
         print("Downloading NLTK 'punkt' model...")
         nltk.download('punkt')
 
-def extract_text_from_pdf(pdf_path: str) -> Tuple[str, str]:
+def extract_text_from_pdf(pdf_path: str, backend: str = "pymupdf") -> Tuple[str, str]:
     """
     Extracts the title and abstract from the first page of a PDF.
     This function assumes a standard academic paper format.
     
     Args:
         pdf_path (str): The path to the input PDF file.
+        backend (str): The PDF backend registered in arxiv_common.pdf_backends ('pymupdf' or 'pypdf').
 
     Returns:
         A tuple containing the title and the abstract.
     """
-    doc = fitz.open(pdf_path)
-    first_page_text = doc[0].get_text("text")
+    # Only the first page is needed, so the page iterator is closed right after it.
+    pages = get_backend(backend).iter_pages(pdf_path)
+    try:
+        first_page_text = next(pages, "")
+    finally:
+        pages.close()
     
     # These are heuristic rules and might need adjustment for different paper formats.
     lines = first_page_text.split('\n')
@@ -42,7 +47,6 @@ def extract_text_from_pdf(pdf_path: str) -> Tuple[str, str]:
     abstract_lines = lines[abstract_start_index + 1:]
     abstract = " ".join(line.strip() for line in abstract_lines if line.strip()).replace("Abstract", "").strip()
     
-    doc.close()
     return title, abstract
 
 def split_into_sentences(text: str) -> List[str]: